@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Token bucket rate limiter."""
+
+    def __init__(self, rate, burst):
+        """
+        Initialize bucket.
+
+        Args:
+            rate (float): Tokens added per second
+            burst (float): Bucket capacity
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost=1.0, now=None):
+        """
+        Try to take tokens from the bucket.
+
+        Args:
+            cost (float): Number of tokens needed
+            now (float, optional): Current monotonic time
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until enough tokens are available
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Admission control for ingestion requests.
+
+    A global token bucket caps the total ingestion rate and per-client buckets stop
+    a single client from starving the others. Any limit set to None is disabled.
+    """
+
+    def __init__(self, global_rate=None, global_burst=None, client_rate=None, client_burst=None,
+                 max_clients=10000):
+        """
+        Initialize admission controller.
+
+        Args:
+            global_rate (float, optional): Ingestion requests per second across all clients
+            global_burst (float, optional): Global burst size. Defaults to one second of `global_rate`.
+            client_rate (float, optional): Ingestion requests per second per client
+            client_burst (float, optional): Per-client burst size. Defaults to one second of `client_rate`.
+            max_clients (int): Number of per-client buckets kept; least recently seen clients are dropped
+        """
+        self.global_bucket = None
+        if global_rate:
+            self.global_bucket = TokenBucket(global_rate, global_burst or max(global_rate, 1.0))
+
+        self.client_rate = client_rate
+        self.client_burst = client_burst or (max(client_rate, 1.0) if client_rate else None)
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def admit(self, client_id, cost=1.0):
+        """
+        Decide whether to accept a request.
+
+        Args:
+            client_id (str): Identifier of the calling client
+            cost (float): Tokens consumed by the request
+
+        Returns:
+            float: 0 if admitted, otherwise the suggested Retry-After in seconds
+        """
+        if self.global_bucket is None and not self.client_rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            bucket = None
+            if self.client_rate:
+                bucket = self._clients.get(client_id)
+                if bucket is None:
+                    bucket = self._clients[client_id] = TokenBucket(self.client_rate, self.client_burst)
+                    if len(self._clients) > self.max_clients:
+                        self._clients.popitem(last=False)
+                else:
+                    self._clients.move_to_end(client_id)
+
+                wait = bucket.take(cost, now)
+                if wait:
+                    return wait
+
+            if self.global_bucket is not None:
+                wait = self.global_bucket.take(cost, now)
+                if wait:
+                    # Give the client its tokens back, the request was not served
+                    if bucket is not None:
+                        bucket.tokens = min(bucket.burst, bucket.tokens + cost)
+                    return wait
+
+        return 0.0
@@ -0,0 +1,225 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .client import MLTrackerClient
+
+
+class AsyncMLTrackerClient:
+    """
+    Asyncio client for an MLTracker server.
+
+    It has the same methods as `MLTrackerClient`, as coroutines. Requests run on a
+    thread pool sharing one pooled HTTP session, so at most `max_concurrency`
+    requests are in flight at once. The bulk helpers `get_metrics_many` and
+    `get_runs_many` fetch many runs concurrently and yield results as they complete.
+    """
+
+    def __init__(self, base_url, api_key=None, max_concurrency=16, client=None, **client_kwargs):
+        """
+        Initialize client.
+
+        Args:
+            base_url (str): Base URL of the MLTracker server
+            api_key (str, optional): API key for authentication
+            max_concurrency (int): Maximum number of requests in flight
+            client (MLTrackerClient, optional): Synchronous client to use instead of a new one
+            **client_kwargs: Passed to `MLTrackerClient`
+        """
+        client_kwargs.setdefault('pool_size', max_concurrency)
+        self.client = client or MLTrackerClient(base_url, api_key=api_key, **client_kwargs)
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="mltracker-async")
+
+    async def _call(self, method, *args, **kwargs):
+        """Run a synchronous client method on the request pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def warm_cache(self, project_name, **kwargs):
+        """See `MLTrackerClient.warm_cache`."""
+        return await self._call(self.client.warm_cache, project_name, **kwargs)
+
+    async def invalidate(self, project_name=None, run_name=None):
+        """See `MLTrackerClient.invalidate`."""
+        return await self._call(self.client.invalidate, project_name, run_name)
+
+    async def list_projects(self):
+        """See `MLTrackerClient.list_projects`."""
+        return await self._call(self.client.list_projects)
+
+    async def list_runs(self, project_name, **kwargs):
+        """See `MLTrackerClient.list_runs`."""
+        return await self._call(self.client.list_runs, project_name, **kwargs)
+
+    async def get_run(self, project_name, run_name):
+        """See `MLTrackerClient.get_run`."""
+        return await self._call(self.client.get_run, project_name, run_name)
+
+    async def get_summary(self, project_name, run_name):
+        """See `MLTrackerClient.get_summary`."""
+        return await self._call(self.client.get_summary, project_name, run_name)
+
+    async def create_run(self, project_name, run_name, **kwargs):
+        """See `MLTrackerClient.create_run`."""
+        return await self._call(self.client.create_run, project_name, run_name, **kwargs)
+
+    async def log_metrics(self, project_name, run_name, metrics, **kwargs):
+        """See `MLTrackerClient.log_metrics`."""
+        return await self._call(self.client.log_metrics, project_name, run_name, metrics, **kwargs)
+
+    async def finish_run(self, project_name, run_name, **kwargs):
+        """See `MLTrackerClient.finish_run`."""
+        return await self._call(self.client.finish_run, project_name, run_name, **kwargs)
+
+    async def get_metrics(self, project_name, run_name, **kwargs):
+        """See `MLTrackerClient.get_metrics`."""
+        return await self._call(self.client.get_metrics, project_name, run_name, **kwargs)
+
+    async def tail_metrics(self, project_name, run_name, keys=None, since=None, poll_interval=2.0, page_size=None):
+        """
+        Async generator following a run; see `MLTrackerClient.tail_metrics`.
+
+        Waiting between polls does not hold a request slot or a thread.
+        """
+        cursor = since
+        while True:
+            metrics, cursor, has_more = await self.get_metrics(project_name, run_name, keys=keys, since=cursor,
+                                                               limit=page_size, return_cursor=True)
+            if metrics:
+                yield metrics, cursor
+            if not has_more:
+                await asyncio.sleep(poll_interval)
+
+    async def get_system_metrics(self, project_name, run_name, **kwargs):
+        """See `MLTrackerClient.get_system_metrics`."""
+        return await self._call(self.client.get_system_metrics, project_name, run_name, **kwargs)
+
+    async def compare_runs(self, project_name, **kwargs):
+        """See `MLTrackerClient.compare_runs`."""
+        return await self._call(self.client.compare_runs, project_name, **kwargs)
+
+    async def get_artifacts(self, project_name, run_name):
+        """See `MLTrackerClient.get_artifacts`."""
+        return await self._call(self.client.get_artifacts, project_name, run_name)
+
+    async def download_artifact(self, project_name, run_name, artifact_name, **kwargs):
+        """See `MLTrackerClient.download_artifact`."""
+        return await self._call(self.client.download_artifact, project_name, run_name, artifact_name, **kwargs)
+
+    async def upload_artifact(self, project_name, run_name, file_path, **kwargs):
+        """See `MLTrackerClient.upload_artifact`."""
+        return await self._call(self.client.upload_artifact, project_name, run_name, file_path, **kwargs)
+
+    async def stream_metrics(self, project_name, run_name, **kwargs):
+        """
+        Async generator over a live metric stream; see `MLTrackerClient.stream_metrics`.
+
+        The stream is read by a thread of its own, so it does not take one of the
+        `max_concurrency` request slots for its whole lifetime. Closing the generator
+        signals that thread, which closes the stream itself once the next event or
+        keep-alive arrives.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def deliver(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # The loop is closed; nobody reads the stream anymore
+                stop.set()
+
+        def read():
+            # The generator is only ever resumed and closed on this thread
+            events = self.client.stream_metrics(project_name, run_name, keep_alive=True, **kwargs)
+            try:
+                for event in events:
+                    if stop.is_set():
+                        return
+                    if event is not None:
+                        deliver((event, None))
+                deliver((None, None))
+            except Exception as e:
+                deliver((None, e))
+            finally:
+                events.close()
+
+        threading.Thread(target=read, name="mltracker-stream", daemon=True).start()
+        try:
+            while True:
+                event, error = await queue.get()
+                if error is not None:
+                    raise error
+                if event is None:
+                    return
+                yield event
+        finally:
+            stop.set()
+
+    async def _many(self, method, runs, return_exceptions, **kwargs):
+        """Call `method(project, run, **kwargs)` for many runs, yielding results as they complete."""
+        runs = iter(runs)
+        pending = {}
+
+        def submit():
+            # Keep a bounded window of tasks so huge selections do not queue everything at once
+            for project_name, run_name in runs:
+                task = asyncio.ensure_future(self._call(method, project_name, run_name, **kwargs))
+                pending[task] = (project_name, run_name)
+                if len(pending) >= 2 * self.max_concurrency:
+                    break
+
+        submit()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    project_name, run_name = pending.pop(task)
+                    error = task.exception()
+                    if error is not None and not return_exceptions:
+                        raise error
+                    yield project_name, run_name, error if error is not None else task.result()
+                submit()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_metrics_many(self, runs, return_exceptions=False, **kwargs):
+        """
+        Fetch the metrics of many runs concurrently.
+
+        Args:
+            runs (iterable): (project name, run name) pairs
+            return_exceptions (bool): Yield a run's exception as its result instead of raising it
+            **kwargs: Passed to `MLTrackerClient.get_metrics`, e.g. `keys` or `max_points`
+
+        Returns:
+            Async generator of (project name, run name, metrics) tuples, in completion order
+        """
+        return self._many(self.client.get_metrics, runs, return_exceptions, **kwargs)
+
+    def get_runs_many(self, runs, return_exceptions=False):
+        """
+        Fetch the information of many runs concurrently.
+
+        Args:
+            runs (iterable): (project name, run name) pairs
+            return_exceptions (bool): Yield a run's exception as its result instead of raising it
+
+        Returns:
+            Async generator of (project name, run name, run information) tuples, in completion order
+        """
+        return self._many(self.client.get_run, runs, return_exceptions)
+
+    def close(self):
+        """Stop the request pool and close the pooled connections."""
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
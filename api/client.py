@@ -1,25 +1,222 @@
 import requests
 import json
 import os
+import time
+import random
+import hashlib
+import gzip
+import copy
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ..utils.encoding import available_mimetypes, decode_metrics
+from ..utils.checksum import file_sha256, matches_checksum
+from .response_cache import ResponseCache
 
 class MLTrackerClient:
     """Client for interacting with a remote MLTracker server."""
     
-    def __init__(self, base_url, api_key=None):
+    # Methods that are safe to resend after a connection error or gateway failure
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+    
+    def __init__(self, base_url, api_key=None, client_id=None, max_throttle_retries=5, max_backoff=60.0,
+                 pool_size=10, timeout=(5, 60), max_retries=3, backoff_factor=0.5, session=None, cache=None):
         """
         Initialize client.
         
         Args:
             base_url (str): Base URL of the MLTracker server
             api_key (str, optional): API key for authentication
+            client_id (str, optional): Identifier used by the server for per-client rate limits
+            max_throttle_retries (int): Times a request is retried after a 429 response
+            max_backoff (float): Maximum seconds to wait before retrying a throttled request
+            pool_size (int): Number of keep-alive connections kept open to the server
+            timeout (float or tuple): Default (connect, read) timeout in seconds; None waits forever
+            max_retries (int): Times an idempotent request is retried after a connection
+                error or a 502/503/504 response
+            backoff_factor (float): Base of the exponential backoff between those retries
+            session (requests.Session, optional): Session to use instead of a new pooled one
+            cache (ResponseCache or bool, optional): Cache for run listings, run information and
+                artifact registries. True creates an in-memory cache with default settings.
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
+        self.max_throttle_retries = max_throttle_retries
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.session = session or self._create_session(pool_size, max_retries, backoff_factor)
+        self.cache = ResponseCache() if cache is True else cache or None
         self.headers = {}
         
         if api_key:
             self.headers['Authorization'] = f'Bearer {api_key}'
+        if client_id:
+            self.headers['X-Client-Id'] = client_id
+    
+    def _create_session(self, pool_size, max_retries, backoff_factor):
+        """Create a session with a connection pool and retries for idempotent requests."""
+        retry_options = dict(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            status_forcelist=(502, 503, 504),
+            backoff_factor=backoff_factor,
+            raise_on_status=False,
+        )
+        try:
+            retry = Retry(allowed_methods=self.IDEMPOTENT_METHODS, **retry_options)
+        except TypeError:
+            # urllib3 < 1.26
+            retry = Retry(method_whitelist=self.IDEMPOTENT_METHODS, **retry_options)
+        
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _request(self, method, url, headers=None, **kwargs):
+        """
+        Send a request, backing off and retrying while the server answers 429.
+        
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            headers (dict, optional): Headers added to the client's default headers
+            **kwargs: Passed to `requests.Session.request`
+        
+        Returns:
+            requests.Response: The response
+        """
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+        kwargs.setdefault('timeout', self.timeout)
+        
+        for attempt in range(self.max_throttle_retries + 1):
+            response = self.session.request(method, url, headers=request_headers, **kwargs)
+            if response.status_code != 429 or attempt == self.max_throttle_retries:
+                return response
+            
+            response.close()
+            time.sleep(self._throttle_delay(response, attempt))
+        
+        return response
+    
+    def _throttle_delay(self, response, attempt):
+        """Seconds to wait after a 429: the server's Retry-After (or exponential backoff) plus jitter."""
+        try:
+            delay = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            delay = 0.5 * (2 ** attempt)
+        
+        # Jitter spreads out clients that were throttled at the same moment
+        delay = min(delay, self.max_backoff)
+        return delay + random.uniform(0, delay)
+    
+    def _get_json(self, url, params=None, immutable=None, keep_headers=()):
+        """
+        GET a JSON resource through the response cache, if there is one.
+        
+        Args:
+            url (str): Resource URL
+            params (dict, optional): Query parameters
+            immutable (callable, optional): Called with the body; True marks the entry as
+                never needing revalidation
+            keep_headers (tuple): Response headers stored with the entry
+        
+        Returns:
+            tuple: (body, headers)
+        """
+        if self.cache is None:
+            response = self._request('GET', url, params=params)
+            response.raise_for_status()
+            return response.json(), response.headers
+        
+        key = requests.Request('GET', url, params=params).prepare().url
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            return copy.deepcopy(entry['body']), entry['headers']
+        
+        headers = {'If-None-Match': entry['etag']} if entry is not None and entry['etag'] else None
+        response = self._request('GET', url, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key, entry)
+            return copy.deepcopy(entry['body']), entry['headers']
+        response.raise_for_status()
+        
+        body = response.json()
+        self.cache.set(key, body, etag=response.headers.get('ETag'),
+                       headers={h: response.headers[h] for h in keep_headers if h in response.headers},
+                       immutable=bool(immutable and immutable(body)))
+        return copy.deepcopy(body), response.headers
+    
+    def _run_completed(self, project_name, run_name):
+        """Check whether the cache knows a run as completed."""
+        entry = self.cache.get(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}")
+        return entry is not None and entry['immutable']
+    
+    def warm_cache(self, project_name, max_workers=8):
+        """
+        Fill the cache with the information and artifact registries of every run of a project.
+        
+        Args:
+            project_name (str): Project name
+            max_workers (int): Number of parallel requests
+        
+        Returns:
+            int: Number of runs cached
+        """
+        if self.cache is None:
+            raise ValueError("The client was created without a cache")
+        
+        runs, cursor = self.list_runs(project_name, return_cursor=True)
+        while cursor:
+            page, cursor = self.list_runs(project_name, cursor=cursor, return_cursor=True)
+            runs.extend(page)
+        
+        def fetch(run):
+            self.get_run(project_name, run['name'])
+            try:
+                self.get_artifacts(project_name, run['name'])
+            except requests.HTTPError as e:
+                # Runs without artifacts have no registry
+                if e.response is None or e.response.status_code != 404:
+                    raise
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(fetch, runs))
+        return len(runs)
+    
+    def invalidate(self, project_name=None, run_name=None):
+        """
+        Drop cached responses.
+        
+        Args:
+            project_name (str, optional): Project name. None clears the whole cache.
+            run_name (str, optional): Run name. None drops everything of the project.
+        """
+        if self.cache is None:
+            return
+        if project_name is None:
+            self.cache.invalidate()
+        elif run_name is None:
+            self.cache.invalidate(f"{self.base_url}/api/projects/{project_name}")
+        else:
+            self.cache.invalidate(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}")
+            self.cache.invalidate(f"{self.base_url}/api/projects/{project_name}/runs", include_children=False)
     
     def list_projects(self):
         """
@@ -28,54 +225,385 @@ class MLTrackerClient:
         Returns:
             list: List of project names
         """
-        response = requests.get(f"{self.base_url}/api/projects", headers=self.headers)
+        projects, _ = self._get_json(f"{self.base_url}/api/projects")
+        return projects
+    
+    def list_runs(self, project_name, filters=None, sort_by=None, limit=None, cursor=None, return_cursor=False,
+                  include_summary=False):
+        """
+        List runs for a project.
+        
+        Args:
+            project_name (str): Project name
+            filters (list, optional): Filter expressions such as 'status=running',
+                'tags contains baseline', 'config.lr < 0.01' or 'summary.val_loss < 0.3'
+            sort_by (str, optional): Field to sort by, e.g. 'start_time'; prefix with '-' for descending
+            limit (int, optional): Maximum number of runs to return
+            cursor (str, optional): Cursor from a previous call, to fetch the next page
+            return_cursor (bool): Whether to also return the cursor of the next page
+                (None on the last page)
+            include_summary (bool): Include each run's per-metric summary, e.g. for a
+                leaderboard sorted by 'summary.val_loss.min'
+        
+        Returns:
+            list: List of run information, or a (runs, cursor) tuple if return_cursor is True
+        """
+        params = {'sort_by': sort_by, 'limit': limit, 'cursor': cursor}
+        params = {k: v for k, v in params.items() if v is not None}
+        if include_summary:
+            params['summary'] = 'true'
+        if filters:
+            params['filter'] = [filters] if isinstance(filters, str) else list(filters)
+        
+        runs, headers = self._get_json(f"{self.base_url}/api/projects/{project_name}/runs", params=params,
+                                       keep_headers=('X-Next-Cursor', 'X-Total-Count'))
+        
+        if return_cursor:
+            return runs, headers.get('X-Next-Cursor')
+        return runs
+    
+    def get_run(self, project_name, run_name):
+        """
+        Get run information.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+        
+        Returns:
+            dict: Run information
+        """
+        # Completed runs do not change any more
+        run, _ = self._get_json(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}",
+                                immutable=lambda run: (run.get('info') or {}).get('status') == 'completed')
+        return run
+    
+    def get_summary(self, project_name, run_name):
+        """
+        Get a run's per-metric summary without downloading its metrics.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+        
+        Returns:
+            dict: Mapping of metric key to 'last', 'last_step', 'min', 'min_step', 'max',
+                'max_step', 'count', 'mean' and 'variance'
+        """
+        summary, _ = self._get_json(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/summary",
+                                    immutable=lambda _: self._run_completed(project_name, run_name))
+        return summary
+    
+    def create_run(self, project_name, run_name, config=None, tags=None, run_id=None, start_time=None):
+        """
+        Create a run on the server.
+        
+        Creating a run again with the same `run_id` returns the existing run, so the
+        call can be retried safely.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            config (dict, optional): Configuration parameters for the run
+            tags (list, optional): List of tags for the run
+            run_id (str, optional): Unique run ID
+            start_time (str, optional): ISO start time. Defaults to the server time.
+        
+        Returns:
+            dict: Run information
+        """
+        response = self._request('POST', f"{self.base_url}/api/projects/{project_name}/runs/{run_name}", json={
+            'config': config or {},
+            'tags': tags or [],
+            'run_id': run_id,
+            'start_time': start_time,
+        })
         response.raise_for_status()
+        self.invalidate(project_name, run_name)
         return response.json()
     
-    def list_runs(self, project_name):
+    def log_metrics(self, project_name, run_name, metrics, compress_threshold=1024, sequence=None, client_id=None,
+                    skipped_sequence=None):
         """
-        List all runs for a project.
+        Send metrics to the server.
         
         Args:
             project_name (str): Project name
+            run_name (str): Run name
+            metrics (dict): Mapping of metric key to a value or a list of points
+                ({'value', 'step', 'timestamp'})
+            compress_threshold (int): Bodies of at least this many bytes are gzip-compressed;
+                None disables compression
+            sequence (int, optional): Batch sequence number. Numbered batches are written
+                before the server responds, and a batch at or below the last number already
+                written for this client ID is skipped, so resending is safe. Requires a
+                client ID, which must belong to a single sender (e.g. one spool).
+            client_id (str, optional): Client ID for this request, overriding the client's own
+            skipped_sequence (int, optional): Last number this client gave up on without
+                sending it. Batches are only written in order: if batches between the last
+                one written and this one are missing and were not given up on, the server
+                answers 409 with its `last_sequence`, and the batch can be resent once the
+                missing ones are.
         
         Returns:
-            list: List of run information
+            dict: Server response; `duplicate` tells whether a numbered batch was skipped
         """
-        response = requests.get(f"{self.base_url}/api/projects/{project_name}/runs", headers=self.headers)
+        body = json.dumps(metrics).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if sequence is not None:
+            headers['X-Sequence'] = str(sequence)
+        if skipped_sequence is not None:
+            headers['X-Sequence-Skipped'] = str(skipped_sequence)
+        if client_id is not None:
+            headers['X-Client-Id'] = client_id
+        if compress_threshold is not None and len(body) >= compress_threshold:
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        
+        response = self._request('POST', f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/log",
+                                 headers=headers, data=body)
         response.raise_for_status()
         return response.json()
     
-    def get_run(self, project_name, run_name):
+    def finish_run(self, project_name, run_name, status='completed', end_time=None, duration=None):
         """
-        Get run information.
+        Mark a run as finished.
         
         Args:
             project_name (str): Project name
             run_name (str): Run name
+            status (str): Final run status
+            end_time (str, optional): ISO end time. Defaults to the server time.
+            duration (float, optional): Run duration in seconds
         
         Returns:
-            dict: Run information
+            dict: Updated run information
         """
-        response = requests.get(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}", headers=self.headers)
+        response = self._request('POST', f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/finish",
+                                 json={'status': status, 'end_time': end_time, 'duration': duration})
         response.raise_for_status()
+        self.invalidate(project_name, run_name)
         return response.json()
     
-    def get_metrics(self, project_name, run_name):
+    def get_metrics(self, project_name, run_name, keys=None, min_step=None, max_step=None,
+                    start_time=None, end_time=None, since=None, limit=None, max_points=None,
+                    downsample=None, as_arrays=False, return_cursor=False):
         """
         Get run metrics.
         
         Args:
             project_name (str): Project name
             run_name (str): Run name
+            keys (list, optional): Metric names or glob patterns to fetch
+            min_step (int, optional): Minimum step (inclusive)
+            max_step (int, optional): Maximum step (inclusive)
+            start_time (float, optional): Minimum timestamp (inclusive)
+            end_time (float, optional): Maximum timestamp (inclusive)
+            since (str, optional): Cursor from a previous call; only newer points are returned
+            limit (int, optional): Maximum number of points to return
+            max_points (int, optional): Downsample each series on the server to at most this many points
+            downsample (str, optional): Downsampling method: 'lttb' (default), 'minmax' or 'mean'
+            as_arrays (bool): Request a binary columnar encoding and return NumPy arrays
+                ({key: {'step', 'value', 'timestamp'}}) instead of lists of point dicts
+            return_cursor (bool): Whether to also return the next cursor and a flag
+                telling whether more points are pending
         
         Returns:
-            dict: Run metrics
+            dict: Run metrics, or a (metrics, cursor, has_more) tuple if return_cursor is True
         """
-        response = requests.get(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/metrics", headers=self.headers)
+        params = {
+            'min_step': min_step,
+            'max_step': max_step,
+            'start_time': start_time,
+            'end_time': end_time,
+            'since': since,
+            'limit': limit,
+            'max_points': max_points,
+            'downsample': downsample,
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        if keys:
+            params['keys'] = ','.join([keys] if isinstance(keys, str) else keys)
+        
+        headers = {}
+        if as_arrays:
+            mimetypes = available_mimetypes()
+            headers['Accept'] = ', '.join(
+                [f"{m};q={1.0 - i * 0.1:.1f}" for i, m in enumerate(mimetypes)] + ['application/json;q=0.1'])
+        
+        response = self._request('GET', f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/metrics",
+                                 headers=headers, params=params)
+        response.raise_for_status()
+        
+        if as_arrays:
+            metrics = decode_metrics(response.content, response.headers.get('Content-Type'))
+        else:
+            metrics = response.json()
+        
+        if return_cursor:
+            has_more = response.headers.get('X-Has-More') == 'true'
+            return metrics, response.headers.get('X-Next-Cursor'), has_more
+        return metrics
+    
+    def tail_metrics(self, project_name, run_name, keys=None, since=None, poll_interval=2.0, page_size=None):
+        """
+        Follow a run, yielding only the metric points logged since the previous poll.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            keys (list, optional): Metric names or glob patterns to follow
+            since (str, optional): Cursor to resume from. Defaults to the start of the run.
+            poll_interval (float): Seconds to wait when no new points are available
+            page_size (int, optional): Maximum number of points per request
+        
+        Yields:
+            tuple: (new metric points, cursor to resume from)
+        """
+        cursor = since
+        while True:
+            metrics, cursor, has_more = self.get_metrics(project_name, run_name, keys=keys, since=cursor,
+                                                         limit=page_size, return_cursor=True)
+            if metrics:
+                yield metrics, cursor
+            if not has_more:
+                time.sleep(poll_interval)
+    
+    def stream_metrics(self, project_name, run_name, keys=None, last_event_id=None, keep_alive=False):
+        """
+        Stream metric points of a run as they are logged (Server-Sent Events).
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            keys (list, optional): Metric names or glob patterns to follow
+            last_event_id (int, optional): Resume after this event id
+            keep_alive (bool): Also yield None for every keep-alive the server sends while
+                the run is quiet (every 15 seconds), so the caller gets a chance to stop
+        
+        Yields:
+            tuple: (event id, new metric points). The points are None when the server
+                dropped points this subscriber had not read yet; refetch them with
+                `get_metrics` before continuing.
+        """
+        headers = {'Accept': 'text/event-stream'}
+        if last_event_id is not None:
+            headers['Last-Event-ID'] = str(last_event_id)
+        
+        params = {}
+        if keys:
+            params['keys'] = ','.join([keys] if isinstance(keys, str) else keys)
+        
+        with self._request('GET', f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/stream",
+                           headers=headers, params=params, stream=True) as response:
+            response.raise_for_status()
+            
+            event_id, event, data = None, 'message', []
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if not line:
+                    # A blank line terminates an event
+                    if event == 'metrics' and data:
+                        yield event_id, json.loads('\n'.join(data))
+                    elif event == 'reset':
+                        yield event_id, None
+                    event, data = 'message', []
+                    continue
+                
+                if line.startswith(':'):
+                    if keep_alive:
+                        yield None
+                    continue
+                
+                field, _, value = line.partition(':')
+                value = value[1:] if value.startswith(' ') else value
+                if field == 'id':
+                    event_id = int(value)
+                elif field == 'event':
+                    event = value
+                elif field == 'data':
+                    data.append(value)
+    
+    def get_system_metrics(self, project_name, run_name, keys=None, since=None, return_cursor=False):
+        """
+        Get the system metrics recorded by a run's SystemMonitor.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            keys (list, optional): Field names or glob patterns to fetch, e.g. ['memory_*'];
+                'timestamp' and 'step' are always included
+            since (int, optional): Cursor from a previous call; only newer rows are returned
+            return_cursor (bool): Whether to also return the next cursor
+        
+        Returns:
+            dict: Mapping of field name to a list with one entry (a list for per-core and
+                per-GPU fields) per logging window, with None for values that could not be
+                read; or a (metrics, cursor) tuple if return_cursor is True
+        """
+        params = {}
+        if keys:
+            params['keys'] = ','.join([keys] if isinstance(keys, str) else keys)
+        if since is not None:
+            params['since'] = since
+        
+        metrics, headers = self._get_json(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/system",
+                                          params=params, keep_headers=('X-Next-Cursor',))
+        if return_cursor:
+            return metrics, int(headers.get('X-Next-Cursor', 0))
+        return metrics
+    
+    def log_system_metrics(self, project_name, run_name, rows, n_cores, n_gpus=0):
+        """
+        Append rows to a run's system metrics stream; used by SystemMonitor for remote runs.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            rows (list): Rows of JSON values (see `system_row_json`)
+            n_cores (int): Number of logical CPU cores of the monitored host
+            n_gpus (int): Number of GPUs of the monitored host
+        
+        Returns:
+            dict: Server response
+        """
+        response = self._request('POST', f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/system",
+                                 json={'n_cores': n_cores, 'n_gpus': n_gpus, 'rows': rows})
         response.raise_for_status()
         return response.json()
     
+    def compare_runs(self, project_name, keys=None, runs=None, filters=None, align='step',
+                     percentiles=None, points=None):
+        """
+        Compare metrics across runs, aggregated on the server.
+        
+        Args:
+            project_name (str): Project name
+            keys (list, optional): Metric names or glob patterns to compare
+            runs (list, optional): Names of the runs to compare
+            filters (list, optional): Filter expressions selecting the runs when `runs` is not given;
+                neither selects every run of the project
+            align (str): Align series on 'step' or 'time' (seconds since each run's first point)
+            percentiles (list, optional): Percentile bands to compute, 0-100
+            points (int, optional): Maximum number of points per aggregated curve
+        
+        Returns:
+            dict: Aggregated curves per key under 'metrics', with 'x', 'count', 'mean', 'std',
+                'min', 'max' and one 'p<N>' list per percentile
+        """
+        params = {'align': align, 'points': points}
+        params = {k: v for k, v in params.items() if v is not None}
+        if keys:
+            params['keys'] = ','.join([keys] if isinstance(keys, str) else keys)
+        if runs:
+            params['runs'] = ','.join([runs] if isinstance(runs, str) else runs)
+        elif filters:
+            params['filter'] = [filters] if isinstance(filters, str) else list(filters)
+        if percentiles:
+            params['percentiles'] = ','.join(f"{p:g}" for p in percentiles)
+        
+        result, _ = self._get_json(f"{self.base_url}/api/projects/{project_name}/compare", params=params)
+        return result
+    
     def get_artifacts(self, project_name, run_name):
         """
         Get run artifacts.
@@ -87,26 +615,37 @@ class MLTrackerClient:
         Returns:
             dict: Run artifacts
         """
-        response = requests.get(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/artifacts", headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        artifacts, _ = self._get_json(
+            f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/artifacts",
+            immutable=lambda _: self._run_completed(project_name, run_name))
+        return artifacts
     
-    def download_artifact(self, project_name, run_name, artifact_name, destination=None):
+    def download_artifact(self, project_name, run_name, artifact_name, destination=None,
+                          chunk_size=8 * 1024 * 1024, max_workers=4, verify=True):
         """
         Download an artifact.
         
+        Large files are fetched with parallel Range requests written at their offsets
+        into a preallocated file. The download is checked against the server's SHA-256
+        checksum, and a local file that already has that checksum is not downloaded again.
+        
         Args:
             project_name (str): Project name
             run_name (str): Run name
             artifact_name (str): Artifact name
             destination (str, optional): Destination path
+            chunk_size (int): Size of each ranged request when downloading in parallel
+            max_workers (int): Number of parallel ranged requests. 1 streams the file
+                over a single connection.
+            verify (bool): Verify the checksum of the downloaded file
         
         Returns:
             str: Path to the downloaded artifact
+        
+        Raises:
+            IOError: If the downloaded file does not match the server's checksum
         """
-        response = requests.get(f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/artifacts/{artifact_name}", 
-                               headers=self.headers, stream=True)
-        response.raise_for_status()
+        url = f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/artifacts/{artifact_name}"
         
         # Create destination path
         if destination is None:
@@ -114,9 +653,131 @@ class MLTrackerClient:
         
         destination_path = os.path.join(destination, artifact_name)
         
-        # Download the artifact
+        response = self._request('HEAD', url)
+        response.raise_for_status()
+        size = int(response.headers.get('Content-Length', 0))
+        sha256 = response.headers.get('X-Checksum-Sha256')
+        
+        if matches_checksum(destination_path, sha256, size):
+            return destination_path
+        
+        # Download next to the destination so a failed download never leaves a partial file behind
+        part_path = destination_path + '.part'
+        try:
+            if max_workers > 1 and response.headers.get('Accept-Ranges') == 'bytes' and size > chunk_size:
+                self._download_ranges(url, part_path, size, chunk_size, max_workers)
+                actual = file_sha256(part_path) if verify and sha256 else None
+            else:
+                actual = self._download_stream(url, part_path)
+            
+            if verify and sha256 and actual != sha256.lower():
+                raise IOError(f"Checksum mismatch for artifact '{artifact_name}': expected {sha256}, got {actual}")
+            os.replace(part_path, destination_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        
+        return destination_path
+    
+    def _download_stream(self, url, destination_path):
+        """Download a file over a single connection, returning its SHA-256."""
+        response = self._request('GET', url, stream=True)
+        response.raise_for_status()
+        
+        digest = hashlib.sha256()
         with open(destination_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
                 f.write(chunk)
+                digest.update(chunk)
         
-        return destination_path
+        return digest.hexdigest()
+    
+    def _download_ranges(self, url, destination_path, size, chunk_size, max_workers):
+        """Download a file with parallel Range requests into a preallocated file."""
+        with open(destination_path, 'wb') as f:
+            f.truncate(size)
+        
+        def fetch(start):
+            end = min(start + chunk_size, size) - 1
+            response = self._request('GET', url, headers={'Range': f"bytes={start}-{end}"}, stream=True)
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise IOError(f"Server ignored the range request for bytes {start}-{end}")
+            
+            with open(destination_path, 'r+b') as f:
+                f.seek(start)
+                for block in response.iter_content(chunk_size=1024 * 1024):
+                    f.write(block)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(fetch, range(0, size, chunk_size)))
+    
+    def upload_artifact(self, project_name, run_name, file_path, name=None, metadata=None,
+                        chunk_size=8 * 1024 * 1024, max_workers=4, upload_id=None):
+        """
+        Upload an artifact with the resumable chunked upload protocol.
+        
+        The file is sent in chunks, in parallel, and committed once every chunk has
+        arrived; the server verifies the SHA-256 checksum before registering it. If an
+        upload fails, call again with the same `upload_id` to send only the missing chunks.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            file_path (str): Path to the file to upload
+            name (str, optional): Artifact name. Defaults to the file name.
+            metadata (dict, optional): Additional metadata about the artifact
+            chunk_size (int): Chunk size in bytes
+            max_workers (int): Number of chunks uploaded in parallel
+            upload_id (str, optional): ID of an interrupted upload to resume
+        
+        Returns:
+            dict: Commit response including the verified `sha256`
+        """
+        uploads_url = f"{self.base_url}/api/projects/{project_name}/runs/{run_name}/uploads"
+        size = os.path.getsize(file_path)
+        
+        if upload_id is None:
+            response = self._request('POST', uploads_url, json={
+                'name': name or os.path.basename(file_path),
+                'filename': os.path.basename(file_path),
+                'size': size,
+                'sha256': file_sha256(file_path),
+                'metadata': metadata or {},
+            })
+        else:
+            response = self._request('GET', f"{uploads_url}/{upload_id}")
+        response.raise_for_status()
+        state = response.json()
+        upload_id = state['upload_id']
+        
+        # Split the missing ranges into chunks
+        chunks = []
+        for start, end in state['missing']:
+            for offset in range(start, end, chunk_size):
+                chunks.append((offset, min(offset + chunk_size, end)))
+        
+        def send(chunk):
+            start, end = chunk
+            with open(file_path, 'rb') as f:
+                f.seek(start)
+                data = f.read(end - start)
+            
+            headers = {
+                'Content-Range': f"bytes {start}-{end - 1}/{size}",
+                'X-Chunk-Sha256': hashlib.sha256(data).hexdigest(),
+            }
+            response = self._request('PUT', f"{uploads_url}/{upload_id}", headers=headers, data=data)
+            response.raise_for_status()
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(send, chunks))
+        except requests.RequestException as e:
+            raise IOError(f"Upload {upload_id} interrupted, resume it with upload_id='{upload_id}': {e}") from e
+        
+        response = self._request('POST', f"{uploads_url}/{upload_id}/commit")
+        response.raise_for_status()
+        self.invalidate(project_name, run_name)
+        return response.json()
@@ -0,0 +1,180 @@
+import hashlib
+from flask import Response, g, jsonify, request
+from ..utils.metrics_query import parse_keys, parse_metric_query, query_metrics
+from ..utils.downsample import parse_downsample_args, downsample_metrics
+from ..utils.encoding import encode_metrics
+from ..utils.compare import parse_compare_args
+from ..utils.streaming import format_sse
+from ..utils.system_stream import load_system_metrics, system_metrics_json
+
+# Handlers shared by the API server and the dashboard. They work on the current
+# Flask request and return the response to send.
+
+
+def check_not_modified(watcher, endpoints):
+    """
+    Answer a GET request with 304 if the watched data it reads is unchanged.
+
+    The ETag is derived from the watcher's generation counters, so it is known
+    before reading any file. It is kept in `g.generation_etag` for the response.
+
+    Args:
+        watcher (ChangeWatcher): Storage directory watcher, or None; requests are
+            always handled while it is not running
+        endpoints (set): Endpoints whose responses only change when the watcher
+            reports a change; they take `project_name` and optionally `run_name`
+
+    Returns:
+        Response: 304 response, or None if the request has to be handled
+    """
+    # Generation counters only follow changes while the watcher thread runs
+    if watcher is None or not watcher.running:
+        return None
+    if request.method != 'GET' or request.endpoint not in endpoints:
+        return None
+
+    args = request.view_args or {}
+    generation = watcher.generation(args['project_name'], args.get('run_name'))
+    variant = '|'.join((request.full_path, request.headers.get('Accept', ''),
+                        request.headers.get('Accept-Encoding', '')))
+    digest = hashlib.sha1(variant.encode('utf-8')).hexdigest()[:16]
+    g.generation_etag = f'"{watcher.epoch}-{generation}-{digest}"'
+    if g.generation_etag in request.if_none_match:
+        response = Response(status=304)
+        response.headers['ETag'] = g.generation_etag
+        return response
+    return None
+
+
+def metrics_response(project_name, run_name, load_metrics, downsample_cache):
+    """
+    Select, downsample and encode a run's metrics as requested.
+
+    Args:
+        project_name (str): Name of the project
+        run_name (str): Name of the run
+        load_metrics (callable): Called with no arguments to get the run's metrics
+        downsample_cache (LRUCache): Cache of downsampled series
+
+    Returns:
+        Response: Metrics in the negotiated format, or a 400 error
+    """
+    try:
+        query = parse_metric_query(request.args)
+        max_points, method = parse_downsample_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    metrics = load_metrics()
+
+    versions = {key: len(points) for key, points in metrics.items()}
+    metrics, cursor, has_more = query_metrics(metrics, **query)
+
+    if max_points:
+        cache_prefix = (project_name, run_name) + tuple(query[k] for k in sorted(query) if k != 'keys')
+        metrics = downsample_metrics(metrics, max_points, method, cache=downsample_cache,
+                                     cache_prefix=cache_prefix, versions=versions)
+
+    # Negotiate compressed JSON or a binary columnar format
+    body, mimetype, encoding = encode_metrics(metrics, request.accept_mimetypes, request.accept_encodings)
+    response = Response(body, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    response.headers['X-Next-Cursor'] = cursor
+    response.headers['X-Has-More'] = 'true' if has_more else 'false'
+    return response
+
+
+def compare_response(project_dir, comparer, run_index):
+    """
+    Compare a project's runs as requested.
+
+    Args:
+        project_dir (Path): Project directory
+        comparer (RunComparer): Comparer of the project's runs
+        run_index (RunIndex): Index used to select runs by filter
+
+    Returns:
+        Response: Comparison result, or a 400/404 error
+    """
+    project_name = project_dir.name
+    try:
+        args = parse_compare_args(request.args)
+        if args['runs'] is None:
+            records, _, _ = run_index.query(project_name, filters=args['filters'])
+            args['runs'] = [r['name'] for r in records]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    missing = [name for name in args['runs'] if not (project_dir / name).is_dir()]
+    if missing:
+        return jsonify({"error": f"Runs not found: {', '.join(missing)}"}), 404
+
+    result = comparer.compare(project_name, args['runs'], keys=args['keys'], align=args['align'],
+                              percentiles=args['percentiles'], points=args['points'])
+    response = jsonify(result)
+    response.set_etag(result['selection'])
+    return response.make_conditional(request)
+
+
+def stream_response(hub, project_name, run_name):
+    """
+    Stream a run's new metric points as server-sent events.
+
+    Args:
+        hub (MetricHub): Hub the run's points are published to
+        project_name (str): Name of the project
+        run_name (str): Name of the run
+
+    Returns:
+        Response: Event stream, resumed after the request's Last-Event-ID, or a 400 error
+    """
+    keys = parse_keys(request.args)
+    last_event_id = request.headers.get('Last-Event-ID')
+    try:
+        last_seq = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    def generate():
+        with hub.subscribe(project_name, run_name, keys=keys, last_seq=last_seq) as subscription:
+            yield "retry: 2000\n\n"
+            while True:
+                events = subscription.next(timeout=15.0)
+                # Comment lines keep proxies from closing idle streams
+                yield format_sse(events) if events else ": keep-alive\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def system_metrics_response(run_dir):
+    """
+    Return a run's system metrics stream as requested.
+
+    Supported parameters are `keys` (field names or glob patterns) and `since`
+    (a row count from the X-Next-Cursor header of an earlier response).
+
+    Args:
+        run_dir (Path): Run directory
+
+    Returns:
+        Response: Columns of the stream, or a 400/404 error
+    """
+    try:
+        since = int(request.args.get('since', 0))
+        if since < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "since must be a non-negative integer"}), 400
+
+    columns = load_system_metrics(run_dir)
+    if columns is None:
+        return jsonify({"error": "System metrics not found"}), 404
+
+    response = jsonify(system_metrics_json(columns, keys=parse_keys(request.args), since=since))
+    response.headers['X-Next-Cursor'] = str(len(columns['timestamp']))
+    return response
@@ -0,0 +1,467 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import requests
+from .client import MLTrackerClient
+from .spool import Spool, SpoolFull
+from ..utils.metrics_query import select_keys
+from ..utils.system_stream import system_row_json
+
+
+class RemoteSystemWriter:
+    """
+    Sends the rows of a SystemMonitor watching a RemoteExperiment to the server.
+
+    Rows that cannot be sent, e.g. while the server is unreachable, are kept (up
+    to `max_rows`, dropping the oldest) and sent together with the next row.
+    """
+
+    def __init__(self, client, project_name, run_name, n_cores, n_gpus=0, max_rows=1000):
+        """
+        Initialize writer.
+
+        Args:
+            client (MLTrackerClient): Client of the server
+            project_name (str): Name of the project
+            run_name (str): Name of the run
+            n_cores (int): Number of logical CPU cores
+            n_gpus (int): Number of GPUs
+            max_rows (int): Maximum number of unsent rows kept
+        """
+        self.client = client
+        self.project_name = project_name
+        self.run_name = run_name
+        self.n_cores = n_cores
+        self.n_gpus = n_gpus
+        self._rows = deque(maxlen=max_rows)
+        self._lock = threading.Lock()
+
+    def write(self, sample):
+        """
+        Send one row, along with the rows that could not be sent before.
+
+        Args:
+            sample (dict): Field values
+        """
+        with self._lock:
+            self._rows.append(system_row_json(sample))
+            self._send()
+
+    def _send(self):
+        """Send the kept rows. Must hold the lock."""
+        rows = list(self._rows)
+        try:
+            self.client.log_system_metrics(self.project_name, self.run_name, rows, self.n_cores, self.n_gpus)
+        except requests.RequestException:
+            return
+        self._rows.clear()
+
+    def close(self):
+        """Make a last attempt to send the kept rows."""
+        with self._lock:
+            if self._rows:
+                self._send()
+            if self._rows:
+                print(f"MLTracker: {len(self._rows)} system metrics rows of '{self.run_name}' could not be sent")
+
+
+class RemoteExperiment:
+    """
+    Experiment that sends its data to an MLTracker server.
+
+    It has the same `log`, `log_artifact` and `finish` API as `Experiment`, but
+    logged points are buffered in memory and shipped in compressed batches by a
+    background thread, and artifacts are uploaded in the background, so the
+    training loop never waits on the network.
+
+    With a `spool_dir`, batches are written through an on-disk spool before they
+    are sent, so points logged while the server is unreachable survive until it
+    comes back, or until the run is resumed after a crash with the same run name.
+    Each spooled batch carries a sequence number and the server skips batches it
+    already wrote, so replays never duplicate points. The server only writes a
+    batch once every earlier batch of the spool was written or given up on, so
+    two processes must never share a spool directory.
+    """
+
+    def __init__(self, project_name, run_name=None, config=None, tags=None, base_url="http://127.0.0.1:5000",
+                 api_key=None, client=None, flush_interval=1.0, max_batch_points=10000, upload_workers=2,
+                 spool_dir=None, spool_max_bytes=256 * 1024 * 1024, spool_overflow='drop_oldest'):
+        """
+        Initialize a new remote experiment run.
+
+        Args:
+            project_name (str): Name of the project
+            run_name (str, optional): Name of the run. Defaults to auto-generated name.
+            config (dict, optional): Configuration parameters for the run.
+            tags (list, optional): List of tags for the run.
+            base_url (str): Base URL of the MLTracker server
+            api_key (str, optional): API key for authentication
+            client (MLTrackerClient, optional): Client to use instead of a new one
+            flush_interval (float): Seconds between background flushes
+            max_batch_points (int): Buffered points that trigger an early flush; also
+                the largest number of points sent in one request
+            upload_workers (int): Number of artifacts uploaded in parallel
+            spool_dir (str, optional): Directory of the on-disk spool. None keeps unsent
+                points in memory only.
+            spool_max_bytes (int): Maximum size of unsent data in the spool
+            spool_overflow (str): What happens when the spool is full: 'drop_oldest',
+                'drop_newest' or 'block' (new points stay in memory until spooled
+                batches are sent; `log` never waits)
+        """
+        self.project_name = project_name
+        self.run_id = str(uuid.uuid4())[:8]
+        self.run_name = run_name or f"run_{self.run_id}"
+        self.start_time = datetime.now()
+        self.config = config or {}
+        self.tags = tags or []
+        self.metrics = {}
+        self.artifacts = {}
+
+        self.spool = None
+        if spool_dir is not None:
+            self.spool = Spool(Path(spool_dir) / project_name / self.run_name, max_bytes=spool_max_bytes,
+                               overflow=spool_overflow)
+            self._restore_run_info()
+
+        self.client = client or MLTrackerClient(base_url, api_key=api_key, client_id=f"{project_name}/{self.run_name}")
+        self.flush_interval = flush_interval
+        self.max_batch_points = max_batch_points
+        self._step = 0
+        self._lock = threading.Lock()
+
+        # Points waiting to be sent, per metric key
+        self._buffer = {}
+        self._buffered = 0
+        self._created = False
+        self._wake = threading.Event()
+        self._idle = threading.Condition(self._lock)
+        self._sending = False
+        self._stopping = False
+
+        self._uploads = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="mltracker-upload")
+        self._thread = threading.Thread(target=self._run, name="mltracker-remote-flush")
+        self._thread.daemon = True
+        self._thread.start()
+
+        if self.spool is not None and self.spool.pending_bytes():
+            print(f"MLTracker: Replaying {self.spool.pending_bytes()} spooled bytes of '{self.run_name}'")
+            self._wake.set()
+
+        print(f"MLTracker: Remote experiment '{self.run_name}' initialized in project '{project_name}'")
+
+    def _restore_run_info(self):
+        """Reuse the run ID and start time of an earlier process that spooled this run."""
+        path = self.spool.directory / "run.json"
+        try:
+            with open(path, 'r') as f:
+                info = json.load(f)
+            self.run_id = info['run_id']
+            self.start_time = datetime.fromisoformat(info['start_time'])
+        except (OSError, ValueError, KeyError):
+            with open(path, 'w') as f:
+                json.dump({'run_id': self.run_id, 'start_time': self.start_time.isoformat()}, f)
+
+    def log(self, metrics, step=None):
+        """
+        Log metrics at a specific step.
+
+        The points are buffered and sent to the server in the background.
+
+        Args:
+            metrics (dict): Dictionary of metric names and values
+            step (int, optional): Step number. If None, uses auto-incrementing counter.
+        """
+        with self._lock:
+            timestamp = time.time()
+            step = step if step is not None else self._step
+
+            for key, value in metrics.items():
+                # Convert to float if possible, otherwise store as string
+                try:
+                    value = float(value)
+                except (ValueError, TypeError):
+                    value = str(value)
+
+                point = {'value': value, 'step': step, 'timestamp': timestamp}
+                self.metrics.setdefault(key, []).append(point)
+                self._buffer.setdefault(key, []).append(point)
+                self._buffered += 1
+
+            # Auto-increment step if using internal counter
+            if step == self._step:
+                self._step += 1
+
+            if self._buffered >= self.max_batch_points:
+                self._wake.set()
+
+    def log_artifact(self, name, file_path, metadata=None):
+        """
+        Log an artifact file.
+
+        The file is uploaded in the background; it must not be modified until the
+        returned future is done.
+
+        Args:
+            name (str): Name of the artifact
+            file_path (str): Path to the artifact file
+            metadata (dict, optional): Additional metadata about the artifact
+
+        Returns:
+            concurrent.futures.Future: Resolves to the server's commit response
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"Artifact file not found: {file_path}")
+
+        self.artifacts[name] = {
+            'name': name,
+            'original_path': str(file_path),
+            'size_bytes': os.path.getsize(file_path),
+            'timestamp': time.time(),
+            'metadata': metadata or {}
+        }
+        return self._uploads.submit(self._upload, name, str(file_path), metadata)
+
+    def _upload(self, name, file_path, metadata):
+        """Upload an artifact once the run exists on the server."""
+        self._ensure_run()
+        return self.client.upload_artifact(self.project_name, self.run_name, file_path,
+                                           name=name, metadata=metadata)
+
+    @property
+    def step(self):
+        """Step recorded by the next `log` call without an explicit step."""
+        return self._step
+
+    def metrics_snapshot(self, keys=None):
+        """See `Experiment.metrics_snapshot`."""
+        with self._lock:
+            return {key: list(self.metrics[key]) for key in select_keys(self.metrics, keys)}
+
+    def system_writer(self, n_cores, n_gpus=0):
+        """
+        Open a writer sending system metrics rows to the run on the server; used by SystemMonitor.
+
+        Args:
+            n_cores (int): Number of logical CPU cores
+            n_gpus (int): Number of GPUs
+
+        Returns:
+            RemoteSystemWriter: The writer
+        """
+        return RemoteSystemWriter(self.client, self.project_name, self.run_name, n_cores, n_gpus)
+
+    def _ensure_run(self):
+        """Create the run on the server if that has not happened yet."""
+        if self._created:
+            return
+        self.client.create_run(self.project_name, self.run_name, config=self.config, tags=self.tags,
+                               run_id=self.run_id, start_time=self.start_time.isoformat())
+        self._created = True
+
+    def _take_batch(self):
+        """Remove up to `max_batch_points` points from the buffer. Must hold the lock."""
+        batch, count = {}, 0
+        for key in list(self._buffer):
+            points = self._buffer[key]
+            take = points[:self.max_batch_points - count]
+            batch[key] = take
+            count += len(take)
+            if len(take) == len(points):
+                del self._buffer[key]
+            else:
+                self._buffer[key] = points[len(take):]
+            if count >= self.max_batch_points:
+                break
+        self._buffered -= count
+        return batch
+
+    def _requeue(self, batch):
+        """Put a batch that could not be sent back in front of the buffer. Must hold the lock."""
+        for key, points in batch.items():
+            self._buffer[key] = points + self._buffer.get(key, [])
+            self._buffered += len(points)
+
+    def _is_rejected(self, error):
+        """Check whether the server refused a request for good, so retrying would not help."""
+        response = getattr(error, 'response', None)
+        # 409: a numbered batch arrived out of order and is sent again later
+        return response is not None and response.status_code < 500 and response.status_code not in (409, 429)
+
+    def _send_pending(self):
+        """
+        Send buffered (and spooled) points.
+
+        Returns:
+            bool: False if sending failed and should be retried later
+        """
+        with self._lock:
+            self._sending = True
+        try:
+            if self.spool is None:
+                return self._send_buffer()
+            while True:
+                # The spool only makes room once replayed batches are acknowledged, and
+                # that happens on this thread, so a full spool must not be waited on
+                spooled = self._spool_buffer()
+                if not self._replay_spool():
+                    return False
+                if spooled:
+                    return True
+        finally:
+            with self._lock:
+                self._sending = False
+                self._idle.notify_all()
+
+    def _send_buffer(self):
+        """Send buffered points straight to the server until the buffer is empty."""
+        while True:
+            with self._lock:
+                if not self._buffer:
+                    return True
+                batch = self._take_batch()
+
+            try:
+                self._ensure_run()
+                self.client.log_metrics(self.project_name, self.run_name, batch)
+            except requests.RequestException as e:
+                if self._is_rejected(e):
+                    print(f"MLTracker: Dropping {sum(len(p) for p in batch.values())} points rejected by the server: {e}")
+                    continue
+                with self._lock:
+                    self._requeue(batch)
+                print(f"MLTracker: Failed to send metrics, will retry: {e}")
+                return False
+
+    def _spool_buffer(self):
+        """
+        Move buffered points to the spool.
+
+        Returns:
+            bool: False if a blocking spool is full and points are left in the buffer
+        """
+        while True:
+            with self._lock:
+                if not self._buffer:
+                    return True
+                batch = self._take_batch()
+            try:
+                seq = self.spool.append(batch, timeout=0)
+            except SpoolFull:
+                with self._lock:
+                    self._requeue(batch)
+                return False
+            if seq is None:
+                print(f"MLTracker: Spool full, dropped {sum(len(p) for p in batch.values())} points")
+
+    def _replay_spool(self):
+        """Send spooled batches in order until the spool is drained."""
+        while True:
+            records = self.spool.peek(1)
+            if not records:
+                return True
+            seq, batch, position = records[0]
+
+            try:
+                self._ensure_run()
+                # Tell the server which missing batches were dropped or rejected, so it
+                # doesn't wait for them
+                skipped = min(self.spool.skipped_seq, seq - 1)
+                self.client.log_metrics(self.project_name, self.run_name, batch, sequence=seq,
+                                        client_id=self.spool.writer_id, skipped_sequence=skipped)
+            except requests.RequestException as e:
+                if not self._is_rejected(e):
+                    print(f"MLTracker: Failed to send metrics, will retry: {e}")
+                    return False
+                print(f"MLTracker: Dropping spooled batch {seq} rejected by the server: {e}")
+                self.spool.ack(position, skipped=True)
+                continue
+            self.spool.ack(position)
+
+    def _has_pending(self):
+        """Check for points that were not sent yet. Must hold the lock."""
+        return bool(self._buffer) or (self.spool is not None and self.spool.pending_bytes() > 0)
+
+    def _run(self):
+        """Flush loop that runs in a separate thread."""
+        delay = self.flush_interval
+        while not self._stopping:
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._send_pending():
+                delay = self.flush_interval
+            else:
+                # Back off while the server is unreachable
+                delay = min(delay * 2, 60.0)
+
+        # Last attempt for points logged after the final flush
+        self._send_pending()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every buffered point has been sent.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait
+
+        Returns:
+            bool: True if the buffer was emptied
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._wake.set()
+        with self._lock:
+            while self._sending or self._has_pending():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(0.1 if remaining is None else min(remaining, 0.1))
+                if not self._sending and self._has_pending():
+                    self._wake.set()
+        return True
+
+    def finish(self, timeout=60.0):
+        """
+        End the experiment run: send remaining data and record final metadata.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for buffered points.
+                None waits until they are sent.
+        """
+        end_time = datetime.now()
+        duration = (end_time - self.start_time).total_seconds()
+
+        sent = self.flush(timeout)
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._uploads.shutdown(wait=True)
+
+        if not sent and self.spool is not None:
+            print(f"MLTracker: Unsent data of '{self.run_name}' is kept in {self.spool.directory} "
+                  f"and sent when the run is resumed")
+        elif not sent:
+            print(f"MLTracker: {self._buffered} points of '{self.run_name}' could not be sent")
+        if self.spool is not None and not self._thread.is_alive():
+            self.spool.close()
+
+        try:
+            self._ensure_run()
+            self.client.finish_run(self.project_name, self.run_name, end_time=end_time.isoformat(),
+                                   duration=duration)
+        except requests.RequestException as e:
+            print(f"MLTracker: Failed to finish run '{self.run_name}': {e}")
+            return
+
+        print(f"MLTracker: Experiment '{self.run_name}' completed in {duration:.2f} seconds")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.finish()
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from urllib.parse import quote
+from ..utils.cache import LRUCache
+
+
+class ResponseCache:
+    """
+    Client-side cache of JSON responses keyed by URL.
+
+    Entries live in memory and, with a `cache_dir`, on disk so they survive between
+    sessions. On disk, entries are grouped in directories that mirror their URL
+    paths, so invalidating a URL and everything below it removes one directory
+    without reading any entry. An entry younger than `ttl` is used as is; an older
+    one is revalidated with its ETag. Immutable entries, such as those of completed runs, are never
+    revalidated.
+    """
+
+    def __init__(self, ttl=30.0, cache_dir=None, max_entries=4096):
+        """
+        Initialize cache.
+
+        Args:
+            ttl (float): Seconds an entry is used without revalidation
+            cache_dir (str, optional): Directory for the on-disk cache. Entries are kept
+                in its `responses` subdirectory, the only one the cache ever deletes.
+                None keeps entries in memory only.
+            max_entries (int): Maximum number of entries kept in memory
+        """
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._memory = LRUCache(max_entries=max_entries)
+        if self.cache_dir is not None:
+            self._root = self.cache_dir / "responses"
+            os.makedirs(self._root, exist_ok=True)
+
+    def _url_dir(self, url):
+        """Directory holding the entries of a URL (without query string) and, below it, of its children."""
+        parts = []
+        for segment in url.split('://', 1)[-1].split('/'):
+            part = quote(segment, safe='')
+            # Never empty or starting with '.', so no part is '.', '..' or '.entries'
+            if not part or part.startswith('.'):
+                part = '%' + part
+            parts.append(part)
+        return self._root.joinpath(*parts)
+
+    def _disk_path(self, key):
+        url = key.split('?', 1)[0]
+        return self._url_dir(url) / ".entries" / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, key):
+        """
+        Look up an entry.
+
+        Args:
+            key (str): Request URL including its query string
+
+        Returns:
+            dict: Entry with 'body', 'etag', 'headers', 'stored_at' and 'immutable', or None
+        """
+        entry = self._memory.get(key)
+        if entry is None and self.cache_dir is not None:
+            try:
+                with open(self._disk_path(key), 'r') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if entry.get('key') != key:
+                return None
+            self._memory.set(key, entry)
+        return entry
+
+    def is_fresh(self, entry):
+        """Check whether an entry can be used without asking the server."""
+        return entry['immutable'] or time.time() - entry['stored_at'] < self.ttl
+
+    def set(self, key, body, etag=None, headers=None, immutable=False):
+        """
+        Store a response.
+
+        Args:
+            key (str): Request URL including its query string
+            body: Parsed JSON body
+            etag (str, optional): ETag of the response
+            headers (dict, optional): Response headers to keep
+            immutable (bool): Never revalidate this entry
+        """
+        entry = {
+            'key': key,
+            'body': body,
+            'etag': etag,
+            'headers': headers or {},
+            'stored_at': time.time(),
+            'immutable': immutable,
+        }
+        self._memory.set(key, entry)
+
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            try:
+                os.makedirs(path.parent, exist_ok=True)
+                with open(tmp_path, 'w') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass
+
+    def touch(self, key, entry):
+        """Mark an entry as revalidated now."""
+        entry['stored_at'] = time.time()
+        self.set(key, entry['body'], entry['etag'], entry['headers'], entry['immutable'])
+
+    def invalidate(self, prefix=None, include_children=True):
+        """
+        Remove entries.
+
+        Args:
+            prefix (str, optional): Remove only entries of this URL, with any query string.
+                None clears the cache.
+            include_children (bool): Also remove entries of URLs below `prefix`
+        """
+        def matches(key):
+            if not key.startswith(prefix):
+                return False
+            rest = key[len(prefix):]
+            return not rest or rest[0] == '?' or (include_children and rest[0] == '/')
+
+        self._memory.invalidate(None if prefix is None else matches)
+
+        if self.cache_dir is None:
+            return
+        if prefix is None:
+            target = self._root
+        elif include_children:
+            target = self._url_dir(prefix)
+        else:
+            target = self._url_dir(prefix) / ".entries"
+        shutil.rmtree(target, ignore_errors=True)
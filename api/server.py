@@ -1,14 +1,36 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify, send_file
 import os
+import gzip
 import json
+import math
+import queue
 from pathlib import Path
 from werkzeug.utils import secure_filename
+import re
 import threading
+import time
+from datetime import datetime
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from ..utils.cache import LRUCache
+from ..utils.streaming import default_hub
+from ..utils.watcher import ChangeWatcher
+from ..utils.compare import RunComparer
+from ..utils.summary import load_summary
+from ..utils.system_stream import SystemMetricsWriter
+from .writer import MetricWriter, SequenceConflict
+from .uploads import UploadManager
+from ..utils.checksum import file_sha256
+from ..storage.index import RunIndex, parse_run_query
+from .observability import MetricsRegistry, PROMETHEUS_CONTENT_TYPE
+from .admission import AdmissionController
+from .handlers import (check_not_modified, metrics_response, compare_response, stream_response,
+                       system_metrics_response)
 
 class MLTrackerServer:
     """Server for exposing MLTracker functionality via a REST API."""
     
-    def __init__(self, storage_dir="./mltracker_data", host="127.0.0.1", port=5000, api_key=None):
+    def __init__(self, storage_dir="./mltracker_data", host="127.0.0.1", port=5000, api_key=None, hub=None,
+                 admission=None, max_ingest_queue=10000, watch=True):
         """
         Initialize server.
         
@@ -17,6 +39,15 @@ class MLTrackerServer:
             host (str): Host to run the server on
             port (int): Port to run the server on
             api_key (str, optional): API key for authentication
+            hub (MetricHub, optional): Hub used for live metric streams. Defaults to the
+                process-wide hub that local experiments publish to.
+            admission (AdmissionController, optional): Global and per-client rate limits
+                for ingestion (POST/PUT) requests. Defaults to no rate limits.
+            max_ingest_queue (int): Maximum number of metric batches waiting to be written;
+                further log requests are answered with 429
+            watch (bool): Watch the storage directory for changes while the server runs, so
+                cached data and ETags follow changes made by other processes without
+                re-reading unchanged files, and their new points reach live streams
         """
         self.storage_dir = Path(storage_dir)
         self.host = host
@@ -24,8 +55,144 @@ class MLTrackerServer:
         self.api_key = api_key
         self.app = Flask(__name__)
         self.thread = None
+        self._downsample_cache = LRUCache(max_entries=1024)
+        self.hub = hub or default_hub
+        self.admission = admission or AdmissionController()
+        self.writer = MetricWriter(self.storage_dir, hub=self.hub, on_flush=self._on_writer_flush,
+                                   max_queue=max_ingest_queue)
+        self.uploads = UploadManager(self.storage_dir)
+        self.watcher = ChangeWatcher(self.storage_dir, hub=self.hub) if watch else None
+        self.run_index = RunIndex(self.storage_dir, watcher=self.watcher)
+        self._metrics_cache = LRUCache(max_entries=32)
+        self.comparer = RunComparer(self._compare_load_metrics, self._metrics_version)
+        self._artifacts_lock = threading.Lock()
+        # System metrics streams sent by remote SystemMonitors, per run
+        self._system_writers = {}
+        self._system_lock = threading.Lock()
+        self._checksums = LRUCache(max_entries=4096)
+        self._setup_telemetry()
         self._setup_routes()
     
+    def _setup_telemetry(self):
+        """Register the server's internal metrics, exposed at /metrics."""
+        self.telemetry = MetricsRegistry()
+        t = self.telemetry
+        
+        self._requests_total = t.counter('mltracker_http_requests_total', 'HTTP requests handled',
+                                         ('route', 'method', 'status'))
+        self._request_seconds = t.histogram('mltracker_http_request_duration_seconds', 'HTTP request latency',
+                                            ('route', 'method'))
+        self._bytes_in = t.counter('mltracker_http_request_bytes_total', 'HTTP request body bytes', ('route',))
+        self._bytes_out = t.counter('mltracker_http_response_bytes_total', 'HTTP response body bytes', ('route',))
+        self._storage_read_seconds = t.histogram('mltracker_storage_read_seconds',
+                                                 'Time spent reading and parsing stored files', ('file',))
+        self._storage_write_seconds = t.histogram('mltracker_storage_write_seconds',
+                                                  'Time spent serializing and writing stored files', ('file',))
+        self._writer_points = t.counter('mltracker_writer_points_total', 'Metric points written by the writer')
+        self._throttled_total = t.counter('mltracker_http_throttled_total', 'Ingestion requests rejected with 429',
+                                          ('reason',))
+        
+        t.callback('mltracker_writer_queue_depth', 'Metric batches waiting to be written',
+                   lambda: self.writer.queue.qsize())
+        t.callback('mltracker_stream_subscribers', 'Active live metric stream subscribers',
+                   self.hub.subscriber_count)
+        t.callback('mltracker_cache_hits_total', 'Cache hits', lambda: {
+            ('downsample',): self._downsample_cache.hits,
+            ('metrics',): self._metrics_cache.hits,
+            ('run_index',): self.run_index.cache_stats()[0],
+            ('compare',): self.comparer.cache_stats()[0],
+        }, ('cache',), kind='counter')
+        t.callback('mltracker_cache_misses_total', 'Cache misses', lambda: {
+            ('downsample',): self._downsample_cache.misses,
+            ('metrics',): self._metrics_cache.misses,
+            ('run_index',): self.run_index.cache_stats()[1],
+            ('compare',): self.comparer.cache_stats()[1],
+        }, ('cache',), kind='counter')
+    
+    def _on_writer_flush(self, project_name, run_name, seconds, points):
+        """Record a metrics file write done by the background writer."""
+        self._storage_write_seconds.observe(seconds, ('metrics.json',))
+        self._writer_points.inc(points)
+        self._touch(project_name, run_name, 'metrics.json')
+    
+    def _touch(self, project_name, run_name, filename=None):
+        """Report a change this server made to a run's files."""
+        if self.watcher is not None:
+            self.watcher.touch(project_name, run_name, filename)
+        else:
+            self.run_index.invalidate(project_name, run_name)
+    
+    def _load_metrics(self, project_name, run_name, metrics_path):
+        """Read a run's metrics, reusing the parsed file while the run is unchanged."""
+        key = (project_name, run_name, self._metrics_version(project_name, run_name))
+        metrics = self._metrics_cache.get(key)
+        if metrics is None:
+            metrics = self._read_json(metrics_path)
+            self._metrics_cache.set(key, metrics)
+        return metrics
+    
+    def _metrics_version(self, project_name, run_name):
+        """Value that changes whenever a run's metrics change."""
+        # Generation counters only follow changes while the watcher thread runs
+        if self.watcher is not None and self.watcher.running:
+            return (self.watcher.epoch, self.watcher.generation(project_name, run_name))
+        try:
+            st = os.stat(self.storage_dir / project_name / run_name / "metrics.json")
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _compare_load_metrics(self, project_name, run_name):
+        """Load a run's metrics for a comparison; runs without metrics compare as empty."""
+        metrics_path = self.storage_dir / project_name / run_name / "metrics.json"
+        if not metrics_path.exists():
+            return {}
+        return self._load_metrics(project_name, run_name, metrics_path)
+    
+    def _throttled(self, retry_after, reason):
+        """Build a 429 response asking the client to retry later."""
+        self._throttled_total.inc(1, (reason,))
+        response = jsonify({"error": "Too many requests", "retry_after": retry_after})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+    
+    def _request_json(self):
+        """
+        Parse the JSON request body, decompressing it if it was sent gzip-encoded.
+        
+        Raises:
+            ValueError: If the body is not valid (compressed) JSON
+        """
+        body = request.get_data()
+        encoding = request.headers.get('Content-Encoding', '').lower()
+        if encoding == 'gzip':
+            try:
+                body = gzip.decompress(body)
+            except OSError as e:
+                raise ValueError(f"Invalid gzip body: {e}")
+        elif encoding and encoding != 'identity':
+            raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+        
+        if not body:
+            return None
+        return json.loads(body)
+    
+    def _write_json(self, path, data):
+        """Write a JSON file atomically, recording how long it took."""
+        path = Path(path)
+        with self._storage_write_seconds.time((path.name,)):
+            tmp_path = path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+    
+    def _read_json(self, path):
+        """Read a stored JSON file, recording how long it took."""
+        with self._storage_read_seconds.time((Path(path).name,)):
+            with open(path, 'r') as f:
+                return json.load(f)
+    
     def _check_auth(self):
         """Check API key authentication."""
         if not self.api_key:
@@ -43,14 +210,108 @@ class MLTrackerServer:
         except:
             return False
     
+    def _register_artifact(self, project_name, run_name, artifact_name, artifact):
+        """Add an artifact record to a run's artifacts registry."""
+        artifacts_path = self.storage_dir / project_name / run_name / "artifacts.json"
+        
+        with self._artifacts_lock:
+            if artifacts_path.exists():
+                artifacts = self._read_json(artifacts_path)
+            else:
+                artifacts = {}
+            
+            artifacts[artifact_name] = artifact
+            
+            with self._storage_write_seconds.time(('artifacts.json',)):
+                with open(artifacts_path, 'w') as f:
+                    json.dump(artifacts, f, indent=2)
+        
+        self._touch(project_name, run_name, 'artifacts.json')
+    
+    def _artifact_checksum(self, file_path, artifact):
+        """Get an artifact's SHA-256, hashing files logged without one once per version."""
+        st = os.stat(file_path)
+        if artifact.get('sha256') and artifact.get('size_bytes') == st.st_size:
+            return artifact['sha256']
+        
+        key = (file_path, st.st_mtime_ns, st.st_size)
+        sha256 = self._checksums.get(key)
+        if sha256 is None:
+            sha256 = file_sha256(file_path)
+            self._checksums.set(key, sha256)
+        return sha256
+    
+    def _write_system_rows(self, project_name, run_name, n_cores, n_gpus, rows):
+        """Append rows to a run's system metrics stream, reopening it if the host changed."""
+        with self._system_lock:
+            key = (project_name, run_name)
+            writer = self._system_writers.get(key)
+            if writer is None or writer.shape != (n_cores, n_gpus):
+                if writer is not None:
+                    writer.close()
+                writer = SystemMetricsWriter(self.storage_dir / project_name / run_name, n_cores, n_gpus)
+                self._system_writers[key] = writer
+            for row in rows:
+                writer.write(row)
+    
     def _setup_routes(self):
         """Set up Flask routes."""
         
+        # Responses of these routes only change when the watcher reports a change
+        self._generation_endpoints = {'list_runs', 'get_run', 'get_metrics', 'get_summary', 'get_artifacts'}
+        
+        @self.app.before_request
+        def start_timer():
+            g.request_start = time.perf_counter()
+        
+        @self.app.after_request
+        def record_request(response):
+            route = request.url_rule.rule if request.url_rule else '<unmatched>'
+            elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+            self._requests_total.inc(1, (route, request.method, str(response.status_code)))
+            self._request_seconds.observe(elapsed, (route, request.method))
+            self._bytes_in.inc(request.content_length or 0, (route,))
+            self._bytes_out.inc(response.content_length or 0, (route,))
+            return response
+        
+        @self.app.after_request
+        def add_etag(response):
+            # Lets clients revalidate cached JSON with If-None-Match and get a 304 back
+            if (request.method == 'GET' and response.status_code == 200 and not response.direct_passthrough
+                    and not response.is_streamed and 'ETag' not in response.headers):
+                etag = g.get('generation_etag')
+                if etag:
+                    response.headers['ETag'] = etag
+                else:
+                    response.add_etag()
+                response.make_conditional(request)
+            return response
+        
         @self.app.before_request
         def check_auth():
             if not self._check_auth():
                 return jsonify({"error": "Unauthorized"}), 401
         
+        @self.app.before_request
+        def not_modified():
+            # Unchanged runs are answered without touching the disk
+            return check_not_modified(self.watcher, self._generation_endpoints)
+        
+        @self.app.before_request
+        def admit_ingestion():
+            # Only writes are rate limited so reads stay responsive during ingestion storms
+            if request.method not in ('POST', 'PUT'):
+                return None
+            
+            client_id = request.headers.get('X-Client-Id') or request.remote_addr
+            retry_after = self.admission.admit(client_id)
+            if retry_after:
+                return self._throttled(retry_after, 'rate_limit')
+        
+        @self.app.route('/metrics', methods=['GET'])
+        def telemetry():
+            return Response(self.telemetry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+        
         @self.app.route('/api/projects', methods=['GET'])
         def list_projects():
             projects = []
@@ -61,25 +322,23 @@ class MLTrackerServer:
         
         @self.app.route('/api/projects/<project_name>/runs', methods=['GET'])
         def list_runs(project_name):
-            runs = []
-            project_dir = self.storage_dir / project_name
-            if not project_dir.exists():
-                return jsonify([])
+            try:
+                query = parse_run_query(request.args)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
             
-            for path in project_dir.glob("*"):
-                if path.is_dir():
-                    run_name = path.name
-                    run_info_path = path / "run_info.json"
-                    
-                    if run_info_path.exists():
-                        with open(run_info_path, 'r') as f:
-                            run_info = json.load(f)
-                        runs.append({
-                            "name": run_name,
-                            "info": run_info
-                        })
-            
-            return jsonify(runs)
+            # Directories without run info are not listed
+            records, cursor, total = self.run_index.query(project_name, require_info=True, **query)
+            runs = [{"name": r["name"], "info": r["info"]} for r in records]
+            if request.args.get('summary') in ('1', 'true'):
+                for run, record in zip(runs, records):
+                    run["summary"] = record["summary"]
+            
+            response = jsonify(runs)
+            response.headers['X-Total-Count'] = str(total)
+            if cursor:
+                response.headers['X-Next-Cursor'] = cursor
+            return response
         
         @self.app.route('/api/projects/<project_name>/runs/<run_name>', methods=['GET'])
         def get_run(project_name, run_name):
@@ -89,13 +348,11 @@ class MLTrackerServer:
             if not run_info_path.exists():
                 return jsonify({"error": "Run not found"}), 404
             
-            with open(run_info_path, 'r') as f:
-                run_info = json.load(f)
+            run_info = self._read_json(run_info_path)
             
             config = {}
             if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
+                config = self._read_json(config_path)
             
             return jsonify({
                 "name": run_name,
@@ -103,6 +360,80 @@ class MLTrackerServer:
                 "config": config
             })
         
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/summary', methods=['GET'])
+        def get_summary(project_name, run_name):
+            run_dir = self.storage_dir / project_name / run_name
+            if not run_dir.is_dir():
+                return jsonify({"error": "Run not found"}), 404
+            
+            return jsonify(load_summary(run_dir) or {})
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>', methods=['POST'])
+        def create_run(project_name, run_name):
+            try:
+                data = self._request_json() or {}
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            run_dir = self.storage_dir / project_name / run_name
+            run_info_path = run_dir / "run_info.json"
+            
+            with self._artifacts_lock:
+                if run_info_path.exists():
+                    run_info = self._read_json(run_info_path)
+                    # A retried create of the same run is not a conflict
+                    if data.get('run_id') and run_info.get('run_id') == data['run_id']:
+                        return jsonify({"name": run_name, "info": run_info})
+                    return jsonify({"error": "Run already exists"}), 409
+                
+                os.makedirs(run_dir / "artifacts", exist_ok=True)
+                run_info = {
+                    'run_id': data.get('run_id'),
+                    'run_name': run_name,
+                    'project': project_name,
+                    'start_time': data.get('start_time') or datetime.now().isoformat(),
+                    'tags': data.get('tags') or [],
+                    'status': 'running'
+                }
+                self._write_json(run_dir / "config.json", data.get('config') or {})
+                self._write_json(run_info_path, run_info)
+            
+            self._touch(project_name, run_name)
+            return jsonify({"name": run_name, "info": run_info}), 201
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/finish', methods=['POST'])
+        def finish_run(project_name, run_name):
+            try:
+                data = self._request_json() or {}
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            run_info_path = self.storage_dir / project_name / run_name / "run_info.json"
+            
+            with self._artifacts_lock:
+                if not run_info_path.exists():
+                    return jsonify({"error": "Run not found"}), 404
+                
+                run_info = self._read_json(run_info_path)
+                end_time = data.get('end_time') or datetime.now().isoformat()
+                duration = data.get('duration')
+                if duration is None:
+                    try:
+                        duration = (datetime.fromisoformat(end_time) -
+                                    datetime.fromisoformat(run_info['start_time'])).total_seconds()
+                    except (KeyError, TypeError, ValueError):
+                        duration = None
+                
+                run_info.update({
+                    'end_time': end_time,
+                    'duration': duration,
+                    'status': data.get('status', 'completed')
+                })
+                self._write_json(run_info_path, run_info)
+            
+            self._touch(project_name, run_name, 'run_info.json')
+            return jsonify({"name": run_name, "info": run_info})
+        
         @self.app.route('/api/projects/<project_name>/runs/<run_name>/metrics', methods=['GET'])
         def get_metrics(project_name, run_name):
             metrics_path = self.storage_dir / project_name / run_name / "metrics.json"
@@ -110,10 +441,17 @@ class MLTrackerServer:
             if not metrics_path.exists():
                 return jsonify({"error": "Metrics not found"}), 404
             
-            with open(metrics_path, 'r') as f:
-                metrics = json.load(f)
+            return metrics_response(project_name, run_name,
+                                    lambda: self._load_metrics(project_name, run_name, metrics_path),
+                                    self._downsample_cache)
+        
+        @self.app.route('/api/projects/<project_name>/compare', methods=['GET'])
+        def compare_runs(project_name):
+            project_dir = self.storage_dir / project_name
+            if not project_dir.is_dir():
+                return jsonify({"error": "Project not found"}), 404
             
-            return jsonify(metrics)
+            return compare_response(project_dir, self.comparer, self.run_index)
         
         @self.app.route('/api/projects/<project_name>/runs/<run_name>/artifacts', methods=['GET'])
         def get_artifacts(project_name, run_name):
@@ -122,8 +460,7 @@ class MLTrackerServer:
             if not artifacts_path.exists():
                 return jsonify({"error": "Artifacts not found"}), 404
             
-            with open(artifacts_path, 'r') as f:
-                artifacts = json.load(f)
+            artifacts = self._read_json(artifacts_path)
             
             return jsonify(artifacts)
         
@@ -134,42 +471,98 @@ class MLTrackerServer:
             if not artifacts_path.exists():
                 return jsonify({"error": "Artifacts not found"}), 404
             
-            with open(artifacts_path, 'r') as f:
-                artifacts = json.load(f)
+            artifacts = self._read_json(artifacts_path)
             
             if artifact_name not in artifacts:
                 return jsonify({"error": "Artifact not found"}), 404
             
             artifact = artifacts[artifact_name]
-            file_path = artifact['path']
+            file_path = os.path.abspath(artifact['path'])
+            if not os.path.isfile(file_path):
+                return jsonify({"error": "Artifact file not found"}), 404
             
-            return send_file(file_path, as_attachment=True)
+            # Conditional responses serve Range requests with 206 Partial Content
+            response = send_file(file_path, as_attachment=True, conditional=True)
+            # Lets clients verify downloads and skip files they already have
+            response.headers['X-Checksum-Sha256'] = self._artifact_checksum(file_path, artifact)
+            return response
         
         @self.app.route('/api/projects/<project_name>/runs/<run_name>/log', methods=['POST'])
         def log_metrics(project_name, run_name):
-            metrics = request.json
+            # Batches may be gzip-compressed and carry lists of points per key
+            try:
+                metrics = self._request_json()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
             
             if not metrics:
                 return jsonify({"error": "No metrics provided"}), 400
+            if not isinstance(metrics, dict):
+                return jsonify({"error": "Metrics must be an object of metric keys"}), 400
             
-            metrics_path = self.storage_dir / project_name / run_name / "metrics.json"
+            # Batches replayed from a client spool carry a sequence number; they are
+            # acknowledged only once written so the client can discard them. Numbers must
+            # be consecutive, except for batches the client declares skipped.
+            sequence = request.headers.get('X-Sequence')
+            if sequence is not None:
+                client_id = request.headers.get('X-Client-Id')
+                try:
+                    seq = int(sequence)
+                    skipped = int(request.headers.get('X-Sequence-Skipped', 0))
+                except ValueError:
+                    return jsonify({"error": "Invalid X-Sequence or X-Sequence-Skipped"}), 400
+                if not client_id:
+                    return jsonify({"error": "X-Sequence requires X-Client-Id"}), 400
+                if skipped >= seq:
+                    return jsonify({"error": "X-Sequence-Skipped must be below X-Sequence"}), 400
+                sequence = (client_id, seq, skipped)
             
-            if metrics_path.exists():
-                with open(metrics_path, 'r') as f:
-                    existing_metrics = json.load(f)
-            else:
-                existing_metrics = {}
+            # Appends are done by the background writer, which also feeds live streams
+            try:
+                future = self.writer.submit(project_name, run_name, metrics, sequence=sequence)
+            except queue.Full:
+                return self._throttled(1.0, 'queue_full')
             
-            # Update existing metrics with new ones
-            for key, value in metrics.items():
-                if key not in existing_metrics:
-                    existing_metrics[key] = []
-                existing_metrics[key].append(value)
+            if sequence is None:
+                return jsonify({"message": "Metrics accepted"}), 202
             
-            with open(metrics_path, 'w') as f:
-                json.dump(existing_metrics, f, indent=2)
+            try:
+                written = future.result(timeout=30)
+            except FutureTimeoutError:
+                return self._throttled(1.0, 'write_timeout')
+            except SequenceConflict as e:
+                return jsonify({"error": str(e), "last_sequence": e.last}), 409
+            except Exception as e:
+                return jsonify({"error": f"Failed to write metrics: {e}"}), 500
+            return jsonify({"message": "Metrics written" if written else "Duplicate batch skipped",
+                            "duplicate": not written})
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/stream', methods=['GET'])
+        def stream_metrics(project_name, run_name):
+            return stream_response(self.hub, project_name, run_name)
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/system', methods=['GET'])
+        def get_system_metrics(project_name, run_name):
+            return system_metrics_response(self.storage_dir / project_name / run_name)
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/system', methods=['POST'])
+        def log_system_metrics(project_name, run_name):
+            try:
+                data = self._request_json()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            if not isinstance(data, dict) or not isinstance(data.get('rows'), list):
+                return jsonify({"error": "Expected an object with a list of rows"}), 400
+            n_cores, n_gpus = data.get('n_cores'), data.get('n_gpus', 0)
+            if not isinstance(n_cores, int) or not isinstance(n_gpus, int) or n_cores < 1 or n_gpus < 0:
+                return jsonify({"error": "n_cores and n_gpus must be the host's core and GPU counts"}), 400
             
-            return jsonify({"message": "Metrics logged successfully"})
+            try:
+                self._write_system_rows(project_name, run_name, n_cores, n_gpus, data['rows'])
+            except (ValueError, TypeError, AttributeError) as e:
+                return jsonify({"error": f"Invalid system metrics row: {e}"}), 400
+            return jsonify({"message": "System metrics written", "rows": len(data['rows'])})
         
         @self.app.route('/api/projects/<project_name>/runs/<run_name>/artifact', methods=['POST'])
         def log_artifact(project_name, run_name):
@@ -190,25 +583,81 @@ class MLTrackerServer:
                 file_path = artifact_dir / filename
                 file.save(file_path)
                 
-                artifacts_path = self.storage_dir / project_name / run_name / "artifacts.json"
-                
-                if artifacts_path.exists():
-                    with open(artifacts_path, 'r') as f:
-                        artifacts = json.load(f)
-                else:
-                    artifacts = {}
-                
-                artifacts[artifact_name] = {
+                self._register_artifact(project_name, run_name, artifact_name, {
                     "path": str(file_path),
+                    "size_bytes": os.path.getsize(file_path),
+                    "sha256": file_sha256(file_path),
                     "metadata": json.loads(metadata)
-                }
-                
-                with open(artifacts_path, 'w') as f:
-                    json.dump(artifacts, f, indent=2)
+                })
                 
                 return jsonify({"message": "Artifact logged successfully"})
             
             return jsonify({"error": "Failed to save artifact"}), 500
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/uploads', methods=['POST'])
+        def initiate_upload(project_name, run_name):
+            params = request.json or {}
+            
+            try:
+                state = self.uploads.initiate(
+                    project_name, run_name,
+                    name=params.get('name'),
+                    filename=params.get('filename'),
+                    size=params.get('size'),
+                    sha256=params.get('sha256'),
+                    metadata=params.get('metadata')
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            return jsonify(state), 201
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/uploads/<upload_id>', methods=['GET'])
+        def upload_status(project_name, run_name, upload_id):
+            try:
+                return jsonify(self.uploads.status(project_name, run_name, upload_id))
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/uploads/<upload_id>', methods=['PUT'])
+        def upload_chunk(project_name, run_name, upload_id):
+            # Chunks are addressed with "Content-Range: bytes <start>-<end>/<total>"
+            match = re.match(r'^bytes (\d+)-(\d+)/(\d+|\*)$', request.headers.get('Content-Range', ''))
+            if not match:
+                return jsonify({"error": "A valid Content-Range header is required"}), 400
+            
+            start, end = int(match.group(1)), int(match.group(2))
+            try:
+                state = self.uploads.write_chunk(project_name, run_name, upload_id, start, request.stream,
+                                                 end - start + 1, request.headers.get('X-Chunk-Sha256'))
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            return jsonify(state)
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/uploads/<upload_id>', methods=['DELETE'])
+        def abort_upload(project_name, run_name, upload_id):
+            try:
+                self.uploads.abort(project_name, run_name, upload_id)
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            
+            return jsonify({"message": "Upload aborted"})
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/uploads/<upload_id>/commit', methods=['POST'])
+        def commit_upload(project_name, run_name, upload_id):
+            try:
+                artifact = self.uploads.commit(project_name, run_name, upload_id)
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 409
+            
+            self._register_artifact(project_name, run_name, artifact['name'], artifact)
+            
+            return jsonify({"message": "Artifact logged successfully", "sha256": artifact['sha256']})
     
     def start(self, debug=False):
         """
@@ -217,6 +666,9 @@ class MLTrackerServer:
         Args:
             debug (bool): Whether to run in debug mode
         """
+        if self.watcher is not None:
+            self.watcher.start()
+        
         if debug:
             self.app.run(host=self.host, port=self.port, debug=debug)
         else:
@@ -228,6 +680,12 @@ class MLTrackerServer:
     
     def stop(self):
         """Stop the server."""
+        if self.watcher is not None:
+            self.watcher.stop()
+        with self._system_lock:
+            for writer in self._system_writers.values():
+                writer.close()
+            self._system_writers.clear()
         if self.thread:
             # This is a bit hacky but works for development purposes
             import requests
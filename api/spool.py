@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class SpoolFull(Exception):
+    """Raised when a record does not fit in a 'block' spool before the timeout."""
+
+
+class _Segment:
+    """An append-only spool file holding records from `first_seq` on."""
+
+    def __init__(self, path, first_seq, size):
+        self.path = path
+        self.first_seq = first_seq
+        self.size = size
+
+
+class Spool:
+    """
+    Durable on-disk queue of records waiting to be sent to a server.
+
+    Records are appended as JSON lines to segment files that roll over at
+    `segment_bytes`. Each record gets a sequence number that is never reused, so
+    the receiver can drop replayed records. The numbers are only meaningful within
+    one spool, so its `writer_id` must not be used by any other sender. A
+    checkpoint file stores the position of the last acknowledged record and the
+    last record given up on; fully acknowledged segments are deleted.
+    """
+
+    def __init__(self, directory, segment_bytes=8 * 1024 * 1024, max_bytes=256 * 1024 * 1024,
+                 overflow='drop_oldest', fsync=False):
+        """
+        Open or create a spool.
+
+        Args:
+            directory (str): Spool directory
+            segment_bytes (int): Size at which a new segment file is started
+            max_bytes (int): Maximum size of unacknowledged records
+            overflow (str): What to do when the spool is full: 'drop_oldest' discards
+                the oldest segment, 'drop_newest' discards the new record, 'block'
+                waits until records are acknowledged
+            fsync (bool): Sync every append to disk, surviving power loss as well as crashes
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow}. Expected one of {', '.join(OVERFLOW_POLICIES)}")
+
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+        self.fsync = fsync
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._file = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.writer_id = self._load_writer_id()
+        self._open()
+
+    def _load_writer_id(self):
+        """Get the ID identifying this spool's records to the server."""
+        path = self.directory / "writer_id"
+        try:
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            writer_id = uuid.uuid4().hex
+            with open(path, 'w') as f:
+                f.write(writer_id)
+            return writer_id
+
+    def _open(self):
+        """Load segments and the checkpoint, and repair a torn last record."""
+        checkpoint = {'segment': None, 'offset': 0, 'seq': 0, 'skipped': None}
+        try:
+            with open(self.directory / "checkpoint.json", 'r') as f:
+                checkpoint.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+        self._segments = []
+        for path in sorted(self.directory.glob("*.seg")):
+            first_seq = int(path.stem)
+            if checkpoint['segment'] is not None and first_seq < checkpoint['segment']:
+                os.remove(path)
+                continue
+            self._segments.append(_Segment(path, first_seq, path.stat().st_size))
+
+        self._acked_seq = checkpoint['seq']
+        # Checkpoints written before skipped records were tracked may have skipped any of them
+        self._skipped_seq = self._acked_seq if checkpoint['skipped'] is None else checkpoint['skipped']
+        self._next_seq = self._acked_seq + 1
+        if self._segments and checkpoint['segment'] == self._segments[0].first_seq:
+            self._offset = checkpoint['offset']
+        else:
+            self._offset = 0
+
+        if self._segments:
+            last = self._segments[-1]
+            last_seq, valid_size = self._scan(last)
+            if valid_size < last.size:
+                # A crash interrupted the last append
+                with open(last.path, 'r+b') as f:
+                    f.truncate(valid_size)
+                last.size = valid_size
+            self._next_seq = max(self._next_seq, last.first_seq, last_seq + 1)
+            self._file = open(last.path, 'ab')
+
+    def _scan(self, segment):
+        """Find the last complete record of a segment and the size up to its end."""
+        last_seq, valid_size = segment.first_seq - 1, 0
+        with open(segment.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    last_seq = json.loads(line)['seq']
+                except (ValueError, KeyError):
+                    break
+                valid_size += len(line)
+        return last_seq, valid_size
+
+    def _pending_bytes(self):
+        if not self._segments:
+            return 0
+        return sum(s.size for s in self._segments) - self._offset
+
+    @property
+    def skipped_seq(self):
+        """Sequence number of the last record that was dropped or acknowledged as skipped."""
+        with self._cond:
+            return self._skipped_seq
+
+    def pending_bytes(self):
+        """Get the size of records that were not acknowledged yet."""
+        with self._cond:
+            return self._pending_bytes()
+
+    def _roll(self):
+        """Start a new segment. Must hold the lock."""
+        if self._file is not None:
+            self._file.close()
+        path = self.directory / f"{self._next_seq:020d}.seg"
+        self._segments.append(_Segment(path, self._next_seq, 0))
+        self._file = open(path, 'ab')
+
+    def _drop_oldest(self):
+        """Discard the oldest segment without sending it. Must hold the lock."""
+        if len(self._segments) == 1:
+            self._roll()
+        oldest, following = self._segments[0], self._segments[1]
+        self.dropped += following.first_seq - 1 - self._acked_seq
+        self._segments.pop(0)
+        os.remove(oldest.path)
+        self._acked_seq = self._skipped_seq = following.first_seq - 1
+        self._offset = 0
+        self._write_checkpoint()
+
+    def append(self, record, timeout=None):
+        """
+        Append a record.
+
+        Args:
+            record: JSON-serializable record
+            timeout (float, optional): With the 'block' policy, maximum seconds to wait
+                for acknowledgements to make room. None waits indefinitely, so the
+                caller must not be the thread that acknowledges records.
+
+        Returns:
+            int: Sequence number of the record, or None if it was dropped because the spool is full
+
+        Raises:
+            SpoolFull: If the spool blocks and is still full after `timeout`
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            line = (json.dumps({'seq': self._next_seq, 'data': record}) + '\n').encode('utf-8')
+
+            while self._pending_bytes() and self._pending_bytes() + len(line) > self.max_bytes:
+                if self.overflow == 'drop_newest':
+                    self.dropped += 1
+                    return None
+                if self.overflow == 'block':
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise SpoolFull(f"Spool {self.directory} is full")
+                    self._cond.wait(remaining)
+                else:
+                    self._drop_oldest()
+
+            if not self._segments or self._segments[-1].size >= self.segment_bytes:
+                self._roll()
+
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._segments[-1].size += len(line)
+
+            seq = self._next_seq
+            self._next_seq += 1
+            self._cond.notify_all()
+            return seq
+
+    def peek(self, max_records=1):
+        """
+        Read the oldest unacknowledged records without removing them.
+
+        Args:
+            max_records (int): Maximum number of records returned
+
+        Returns:
+            list: (sequence number, record, position) tuples; pass a position to `ack`
+        """
+        records = []
+        with self._cond:
+            offset = self._offset
+            for segment in self._segments:
+                with open(segment.path, 'rb') as f:
+                    f.seek(offset)
+                    while len(records) < max_records and offset < segment.size:
+                        line = f.readline()
+                        offset += len(line)
+                        entry = json.loads(line)
+                        records.append((entry['seq'], entry['data'], (segment.first_seq, offset, entry['seq'])))
+                if len(records) >= max_records:
+                    break
+                offset = 0
+        return records
+
+    def ack(self, position, skipped=False):
+        """
+        Acknowledge every record up to and including the one at `position`.
+
+        Args:
+            position (tuple): Position returned by `peek`
+            skipped (bool): The record was given up on rather than delivered
+        """
+        first_seq, offset, seq = position
+        with self._cond:
+            if seq <= self._acked_seq:
+                # Already acknowledged, or dropped while it was being sent
+                return
+
+            while len(self._segments) > 1 and self._segments[0].first_seq < first_seq:
+                os.remove(self._segments.pop(0).path)
+            self._acked_seq = seq
+            if skipped:
+                self._skipped_seq = seq
+            self._offset = offset
+            self._write_checkpoint()
+            self._cond.notify_all()
+
+    def _write_checkpoint(self):
+        """Persist the acknowledged position. Must hold the lock."""
+        checkpoint = {
+            'segment': self._segments[0].first_seq if self._segments else None,
+            'offset': self._offset,
+            'seq': self._acked_seq,
+            'skipped': self._skipped_seq,
+        }
+        path = self.directory / "checkpoint.json"
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        """Close the active segment file."""
+        with self._cond:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from werkzeug.utils import secure_filename
+from ..utils.checksum import file_sha256
+
+_UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Buffer size used when streaming request bodies
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _merge_ranges(ranges):
+    """Merge overlapping or adjacent [start, end) ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _missing_ranges(received, size):
+    """Compute the [start, end) ranges not yet received."""
+    missing = []
+    position = 0
+    for start, end in received:
+        if start > position:
+            missing.append([position, start])
+        position = max(position, end)
+    if position < size:
+        missing.append([position, size])
+    return missing
+
+
+class UploadManager:
+    """
+    Server-side state for resumable artifact uploads.
+
+    An upload is initiated with the final size and checksum, receives chunks at
+    arbitrary offsets (possibly in parallel and over several sessions) and is
+    committed once every byte has arrived and the checksum matches. State lives
+    next to the run so uploads survive server restarts.
+    """
+
+    def __init__(self, storage_dir):
+        """
+        Initialize upload manager.
+
+        Args:
+            storage_dir (str): Base directory for experiment data
+        """
+        self.storage_dir = Path(storage_dir)
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _upload_dir(self, project_name, run_name, upload_id):
+        if not _UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise LookupError("Upload not found")
+        upload_dir = self.storage_dir / project_name / run_name / ".uploads" / upload_id
+        if not upload_dir.exists():
+            raise LookupError("Upload not found")
+        return upload_dir
+
+    def _lock(self, upload_id):
+        with self._locks_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _load_state(self, upload_dir):
+        with open(upload_dir / "state.json", 'r') as f:
+            return json.load(f)
+
+    def _save_state(self, upload_dir, state):
+        tmp_path = upload_dir / "state.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, upload_dir / "state.json")
+
+    def initiate(self, project_name, run_name, name, filename, size, sha256=None, metadata=None):
+        """
+        Start a resumable upload.
+
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            name (str): Artifact name
+            filename (str): File name stored in the artifacts directory
+            size (int): Total size in bytes
+            sha256 (str, optional): Expected SHA-256 checksum, verified on commit
+            metadata (dict, optional): Artifact metadata
+
+        Returns:
+            dict: Upload state including its `upload_id`
+        """
+        filename = secure_filename(filename or name or '')
+        if not filename:
+            raise ValueError("A file name is required")
+        if not isinstance(size, int) or size < 0:
+            raise ValueError("'size' must be a non-negative integer")
+
+        upload_id = uuid.uuid4().hex
+        upload_dir = self.storage_dir / project_name / run_name / ".uploads" / upload_id
+        os.makedirs(upload_dir)
+
+        # Preallocate so chunks can be written at their offsets in any order
+        with open(upload_dir / "data", 'wb') as f:
+            f.truncate(size)
+
+        state = {
+            'upload_id': upload_id,
+            'name': name or filename,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256,
+            'metadata': metadata or {},
+            'received': [],
+        }
+        self._save_state(upload_dir, state)
+        return self._public_state(state)
+
+    def _public_state(self, state):
+        state = dict(state)
+        state['missing'] = _missing_ranges(state['received'], state['size'])
+        state['received_bytes'] = sum(end - start for start, end in state['received'])
+        return state
+
+    def status(self, project_name, run_name, upload_id):
+        """
+        Get the state of an upload, including the byte ranges still missing.
+
+        Returns:
+            dict: Upload state
+        """
+        upload_dir = self._upload_dir(project_name, run_name, upload_id)
+        with self._lock(upload_id):
+            return self._public_state(self._load_state(upload_dir))
+
+    def write_chunk(self, project_name, run_name, upload_id, offset, stream, length, chunk_sha256=None):
+        """
+        Write a chunk of an upload at the given offset.
+
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            upload_id (str): Upload ID
+            offset (int): Byte offset of the chunk
+            stream: File-like object providing the chunk bytes
+            length (int): Chunk length in bytes
+            chunk_sha256 (str, optional): Expected SHA-256 of the chunk
+
+        Returns:
+            dict: Upload state after the write
+        """
+        upload_dir = self._upload_dir(project_name, run_name, upload_id)
+        state = self._load_state(upload_dir)
+        if offset < 0 or length < 0 or offset + length > state['size']:
+            raise ValueError("Chunk is outside the declared upload size")
+
+        digest = hashlib.sha256()
+        written = 0
+        with open(upload_dir / "data", 'r+b') as f:
+            f.seek(offset)
+            while written < length:
+                block = stream.read(min(COPY_BUFFER_SIZE, length - written))
+                if not block:
+                    break
+                f.write(block)
+                digest.update(block)
+                written += len(block)
+
+        if written != length:
+            raise ValueError(f"Expected {length} bytes, received {written}")
+        if chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+            raise ValueError("Chunk checksum mismatch")
+
+        # Chunks write disjoint regions, so only the state update needs the lock
+        with self._lock(upload_id):
+            state = self._load_state(upload_dir)
+            state['received'] = _merge_ranges(state['received'] + [[offset, offset + length]])
+            self._save_state(upload_dir, state)
+            return self._public_state(state)
+
+    def commit(self, project_name, run_name, upload_id):
+        """
+        Verify a completed upload and move it into the run's artifacts.
+
+        Returns:
+            dict: Artifact record to register
+        """
+        upload_dir = self._upload_dir(project_name, run_name, upload_id)
+        with self._lock(upload_id):
+            state = self._load_state(upload_dir)
+            missing = _missing_ranges(state['received'], state['size'])
+            if missing:
+                raise ValueError(f"Upload is incomplete, missing byte ranges: {missing}")
+
+            data_path = upload_dir / "data"
+            sha256 = file_sha256(data_path)
+            if state['sha256'] and sha256 != state['sha256'].lower():
+                raise ValueError("Checksum mismatch, upload is corrupt")
+
+            artifacts_dir = self.storage_dir / project_name / run_name / "artifacts"
+            artifacts_dir.mkdir(parents=True, exist_ok=True)
+            file_path = artifacts_dir / state['filename']
+            os.replace(data_path, file_path)
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+        with self._locks_lock:
+            self._locks.pop(upload_id, None)
+
+        return {
+            'name': state['name'],
+            'path': str(file_path),
+            'size_bytes': state['size'],
+            'sha256': sha256,
+            'metadata': state['metadata'],
+        }
+
+    def abort(self, project_name, run_name, upload_id):
+        """Discard an upload and its received data."""
+        upload_dir = self._upload_dir(project_name, run_name, upload_id)
+        with self._lock(upload_id):
+            shutil.rmtree(upload_dir, ignore_errors=True)
+        with self._locks_lock:
+            self._locks.pop(upload_id, None)
@@ -0,0 +1,242 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from ..utils.summary import load_summary, summarize_points, update_summary, save_summary
+
+
+class SequenceConflict(Exception):
+    """A numbered batch does not follow the last batch written for its client ID."""
+
+    def __init__(self, last):
+        super().__init__(f"Batch does not follow sequence number {last}")
+        self.last = last
+
+
+def normalize_points(values, next_step):
+    """
+    Normalize values posted for one metric key into logged points.
+
+    Args:
+        values: A point dict, a list of point dicts, or a scalar value
+        next_step (int): Step assigned to scalar values
+
+    Returns:
+        list: Points with 'value', 'step' and 'timestamp' fields
+    """
+    if not isinstance(values, list):
+        values = [values]
+
+    points = []
+    for value in values:
+        if isinstance(value, dict):
+            point = dict(value)
+            point.setdefault('step', next_step)
+            point.setdefault('timestamp', time.time())
+        else:
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                value = str(value)
+            point = {'value': value, 'step': next_step, 'timestamp': time.time()}
+        points.append(point)
+        next_step = point['step'] + 1 if isinstance(point['step'], int) else next_step + 1
+    return points
+
+
+class MetricWriter:
+    """
+    Background writer for metrics received by the server.
+
+    Submitted batches are queued and coalesced per run, so a burst of requests for
+    the same run costs a single read and write of its metrics file. Written points
+    are published to the streaming hub.
+    """
+
+    def __init__(self, storage_dir, hub=None, max_batch=1000, on_flush=None, max_queue=0):
+        """
+        Initialize writer.
+
+        Args:
+            storage_dir (str): Base directory for experiment data
+            hub (MetricHub, optional): Hub notified of written points
+            max_batch (int): Maximum number of queued requests written in one pass
+            on_flush (callable, optional): Called with (project, run, seconds, number of points)
+                after each metrics file write
+            max_queue (int): Maximum number of queued batches; 0 means unbounded
+        """
+        self.storage_dir = Path(storage_dir)
+        self.hub = hub
+        self.max_batch = max_batch
+        self.on_flush = on_flush
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, project_name, run_name, metrics, sequence=None):
+        """
+        Queue metrics for writing.
+
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            metrics (dict): Mapping of metric key to a value, point or list of points
+            sequence (tuple, optional): (client ID, sequence number, skipped number) of
+                the batch, where the skipped number is the last one the client gave up on.
+                A batch whose number is not above the last one written for that client and
+                run is a replay and is skipped. Otherwise it is only written if it follows
+                the last one, or every number in between was given up on.
+
+        Returns:
+            concurrent.futures.Future: Resolves to True once the batch is written, or
+                False if it was skipped as a replay; fails with SequenceConflict if batches
+                between the last written one and this one are missing
+
+        Raises:
+            queue.Full: If the queue is bounded and full
+        """
+        self._ensure_started()
+        future = Future()
+        self.queue.put_nowait((project_name, run_name, metrics, sequence, future))
+        return future
+
+    def flush(self):
+        """Block until every queued batch has been written."""
+        self.queue.join()
+
+    def _ensure_started(self):
+        if self.thread is None:
+            with self._lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name="mltracker-metric-writer")
+                    self.thread.daemon = True
+                    self.thread.start()
+
+    def _run(self):
+        """Writer loop that runs in a separate thread."""
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Group requests per run, preserving arrival order
+            runs = OrderedDict()
+            for project_name, run_name, metrics, sequence, future in batch:
+                runs.setdefault((project_name, run_name), []).append((metrics, sequence, future))
+
+            for (project_name, run_name), updates in runs.items():
+                try:
+                    self._write(project_name, run_name, updates)
+                except Exception as e:
+                    print(f"MLTracker: Failed to write metrics for {project_name}/{run_name}: {e}")
+                    for _, _, future in updates:
+                        if not future.done():
+                            future.set_exception(e)
+
+            for _ in batch:
+                self.queue.task_done()
+
+    def _write(self, project_name, run_name, updates):
+        """Append a run's queued updates to its metrics file."""
+        start = time.perf_counter()
+        run_dir = self.storage_dir / project_name / run_name
+        os.makedirs(run_dir, exist_ok=True)
+        metrics_path = run_dir / "metrics.json"
+        sequences_path = run_dir / "sequences.json"
+
+        if metrics_path.exists():
+            with open(metrics_path, 'r') as f:
+                existing_metrics = json.load(f)
+        else:
+            existing_metrics = {}
+
+        # Highest batch sequence number written per client
+        sequences = {}
+        if any(sequence is not None for _, sequence, _ in updates):
+            sequences = self._load_sequences(sequences_path, existing_metrics)
+        committed = dict(sequences)
+
+        summary = load_summary(run_dir, rebuild=False) or {}
+        
+        new_points = {}
+        written = []
+        for metrics, sequence, future in updates:
+            if sequence is not None:
+                client_id, seq, skipped = sequence
+                last = sequences.get(client_id, 0)
+                if seq <= last:
+                    future.set_result(False)
+                    continue
+                if seq > last + 1 and skipped < seq - 1:
+                    # An earlier batch is still in flight or was lost, or another sender
+                    # uses the same client ID; the client has to resend in order
+                    future.set_exception(SequenceConflict(last))
+                    continue
+                sequences[client_id] = seq
+
+            for key, values in metrics.items():
+                history = existing_metrics.setdefault(key, [])
+                points = normalize_points(values, len(history))
+                entry = summary.get(key)
+                if entry is None or entry.get('count') != len(history):
+                    # Missing or out of date, e.g. a run logged before summaries existed
+                    entry = summary[key] = summarize_points(history)
+                for point in points:
+                    update_summary(entry, point)
+                history.extend(points)
+                new_points.setdefault(key, []).extend(points)
+            written.append((sequence, future))
+
+        if not written:
+            return
+
+        # The sequence numbers are written first, together with the number of points the
+        # metrics file holds once this write lands. If the process dies before the metrics
+        # file is replaced, the count doesn't match and the previous numbers stay in effect,
+        # so the replayed batches are accepted instead of skipped.
+        if any(sequence is not None for sequence, _ in written):
+            self._replace_json(sequences_path, {
+                'clients': sequences,
+                'previous': committed,
+                'points': sum(len(history) for history in existing_metrics.values()),
+            })
+        # Write to a temporary file first so concurrent readers never see a partial file
+        self._replace_json(metrics_path, existing_metrics)
+        save_summary(run_dir, summary)
+
+        if self.on_flush is not None:
+            self.on_flush(project_name, run_name, time.perf_counter() - start,
+                          sum(len(p) for p in new_points.values()))
+
+        for _, future in written:
+            future.set_result(True)
+
+        if self.hub is not None:
+            self.hub.publish(project_name, run_name, new_points)
+
+    def _load_sequences(self, path, metrics):
+        """Read the sequence numbers whose batches are in `metrics`."""
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if 'clients' not in record:
+            # Written before the point count was recorded
+            return record
+        if sum(len(history) for history in metrics.values()) >= record['points']:
+            return record['clients']
+        return record['previous']
+
+    def _replace_json(self, path, data):
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
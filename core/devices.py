@@ -0,0 +1,176 @@
+import os
+import re
+from functools import lru_cache
+
+_NAN = float('nan')
+
+
+class DeviceProbe:
+    """
+    Base class of the accelerator probes used by SystemMonitor.
+
+    A probe finds its devices once, in `detect`, and keeps whatever handles it
+    needs to sample them. Detection must be cheap and must not import ML
+    frameworks, since it runs on CPU-only machines too.
+    """
+
+    name = None
+
+    def detect(self):
+        """
+        Find this probe's devices.
+
+        Returns:
+            int: Number of devices found; 0 if there are none or the probe is unusable
+        """
+        raise NotImplementedError
+
+    def sample(self):
+        """
+        Read the devices found by `detect`.
+
+        Returns:
+            tuple: (utilization percents, memory used percents), one value per device;
+                NaN for a value that could not be read
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the probe's handles."""
+
+
+class NvmlProbe(DeviceProbe):
+    """NVIDIA GPUs through NVML (the `nvidia-ml-py` package, installed with the `gpu` extra)."""
+
+    name = 'nvml'
+
+    def __init__(self):
+        self._nvml = None
+        self._handles = []
+
+    def detect(self):
+        # Don't load NVML at all where no NVIDIA driver is present
+        if os.path.isdir('/proc') and not os.path.exists('/proc/driver/nvidia'):
+            return 0
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+        except Exception:
+            return 0
+        try:
+            self._handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+        except pynvml.NVMLError:
+            pynvml.nvmlShutdown()
+            return 0
+        self._nvml = pynvml
+        return len(self._handles)
+
+    def sample(self):
+        utilization, memory_used = [], []
+        for handle in self._handles:
+            try:
+                busy = float(self._nvml.nvmlDeviceGetUtilizationRates(handle).gpu)
+            except self._nvml.NVMLError:
+                busy = _NAN
+            try:
+                memory = self._nvml.nvmlDeviceGetMemoryInfo(handle)
+                used = memory.used / memory.total * 100 if memory.total else _NAN
+            except self._nvml.NVMLError:
+                used = _NAN
+            utilization.append(busy)
+            memory_used.append(used)
+        return utilization, memory_used
+
+    def close(self):
+        if self._nvml is not None:
+            self._nvml.nvmlShutdown()
+            self._nvml = None
+            self._handles = []
+
+
+class AmdgpuProbe(DeviceProbe):
+    """AMD GPUs through the amdgpu driver's sysfs files; needs no Python package."""
+
+    name = 'amdgpu'
+
+    def __init__(self, drm_dir='/sys/class/drm'):
+        """
+        Initialize probe.
+
+        Args:
+            drm_dir (str): DRM class directory listing the cards
+        """
+        self.drm_dir = drm_dir
+        self._devices = []
+
+    def detect(self):
+        try:
+            cards = sorted((entry for entry in os.listdir(self.drm_dir) if re.fullmatch(r'card\d+', entry)),
+                           key=lambda card: int(card[4:]))
+        except OSError:
+            return 0
+        self._devices = [os.path.join(self.drm_dir, card, 'device') for card in cards
+                         if os.path.exists(os.path.join(self.drm_dir, card, 'device', 'gpu_busy_percent'))]
+        return len(self._devices)
+
+    def _read(self, device, filename):
+        with open(os.path.join(device, filename), 'r') as f:
+            return int(f.read())
+
+    def sample(self):
+        utilization, memory_used = [], []
+        for device in self._devices:
+            try:
+                busy = float(self._read(device, 'gpu_busy_percent'))
+            except (OSError, ValueError):
+                busy = _NAN
+            try:
+                total = self._read(device, 'mem_info_vram_total')
+                used = self._read(device, 'mem_info_vram_used') / total * 100 if total else _NAN
+            except (OSError, ValueError):
+                used = _NAN
+            utilization.append(busy)
+            memory_used.append(used)
+        return utilization, memory_used
+
+
+# Probe classes tried by detect_devices, in order
+DEVICE_PROBES = [NvmlProbe, AmdgpuProbe]
+
+
+def register_device_probe(probe_class):
+    """
+    Add a probe class to the ones tried by detect_devices; usable as a class decorator.
+
+    Args:
+        probe_class (type): DeviceProbe subclass
+
+    Returns:
+        type: The probe class
+    """
+    if probe_class not in DEVICE_PROBES:
+        DEVICE_PROBES.append(probe_class)
+        detect_devices.cache_clear()
+    return probe_class
+
+
+@lru_cache(maxsize=None)
+def detect_devices():
+    """
+    Detect accelerators once per process.
+
+    Returns:
+        tuple: (probe, device count) of the probes that found devices, ready to sample;
+            empty on CPU-only machines
+    """
+    probes = []
+    for probe_class in DEVICE_PROBES:
+        probe = probe_class()
+        try:
+            found = probe.detect()
+        except Exception as e:
+            print(f"MLTracker: {probe_class.__name__} failed to detect devices: {e}")
+            continue
+        if found:
+            probes.append((probe, found))
+    return tuple(probes)
@@ -5,12 +5,17 @@ import uuid
 from datetime import datetime
 import threading
 from pathlib import Path
+from ..utils.streaming import default_hub
+from ..utils.metrics_query import select_keys
+from ..utils.summary import update_summary, save_summary
+from ..utils.system_stream import SystemMetricsWriter
 
 class Experiment:
     """
     Core experiment tracking class that logs metrics, parameters, and artifacts.
     """
-    def __init__(self, project_name, run_name=None, config=None, tags=None, storage_dir="./mltracker_data"):
+    def __init__(self, project_name, run_name=None, config=None, tags=None, storage_dir="./mltracker_data",
+                 summary_interval=5.0):
         """
         Initialize a new experiment run.
         
@@ -20,6 +25,8 @@ class Experiment:
             config (dict, optional): Configuration parameters for the run.
             tags (list, optional): List of tags for the run.
             storage_dir (str, optional): Base directory for storing experiment data.
+            summary_interval (float, optional): Minimum seconds between summary.json writes
+                while logging; `finish` always writes it.
         """
         self.project_name = project_name
         self.run_id = str(uuid.uuid4())[:8]
@@ -28,6 +35,10 @@ class Experiment:
         self.config = config or {}
         self.tags = tags or []
         self.metrics = {}
+        # Per-key last/min/max/mean/variance, kept up to date as points are logged
+        self.summary = {}
+        self.summary_interval = summary_interval
+        self._summary_saved_at = None
         self.artifacts = {}
         self._step = 0
         self._lock = threading.Lock()
@@ -79,6 +90,7 @@ class Experiment:
         with self._lock:
             timestamp = time.time()
             step = step if step is not None else self._step
+            new_points = {}
             
             for key, value in metrics.items():
                 if key not in self.metrics:
@@ -90,11 +102,14 @@ class Experiment:
                 except (ValueError, TypeError):
                     value_float = str(value)
                 
-                self.metrics[key].append({
+                point = {
                     'value': value_float,
                     'step': step,
                     'timestamp': timestamp
-                })
+                }
+                self.metrics[key].append(point)
+                update_summary(self.summary.setdefault(key, {}), point)
+                new_points[key] = [point]
             
             # Auto-increment step if using internal counter
             if step == self._step:
@@ -102,6 +117,13 @@ class Experiment:
             
             # Save metrics after each update
             self._save_metrics()
+            # The summary is rewritten at most every summary_interval; readers rebuild it from
+            # the metrics while it is older than them
+            if self._summary_saved_at is None or time.monotonic() - self._summary_saved_at >= self.summary_interval:
+                self._save_summary()
+            
+            # Push the new points to live streams served from this process
+            default_hub.publish(self.project_name, self.run_name, new_points)
     
     def _save_metrics(self):
         """Save metrics to disk."""
@@ -109,6 +131,11 @@ class Experiment:
         with open(metrics_path, 'w') as f:
             json.dump(self.metrics, f, indent=2)
     
+    def _save_summary(self):
+        """Save the summary to disk. Must hold the lock."""
+        save_summary(self.run_dir, self.summary)
+        self._summary_saved_at = time.monotonic()
+    
     def log_artifact(self, name, file_path, metadata=None):
         """
         Log an artifact file.
@@ -144,17 +171,87 @@ class Experiment:
         self.artifacts[name] = artifact_info
         
         # Save artifacts registry
+        self._save_artifacts()
+        
+        return str(dest_path)
+    
+    def log_artifact_bytes(self, name, data, filename, metadata=None):
+        """
+        Log an artifact from bytes held in memory, written straight into the run's artifacts.
+        
+        Args:
+            name (str): Name of the artifact
+            data (bytes): File content
+            filename (str): File name in the artifacts directory
+            metadata (dict, optional): Additional metadata about the artifact
+        
+        Returns:
+            str: Path where the artifact was saved
+        """
+        dest_path = self.artifacts_dir / filename
+        tmp_path = dest_path.with_name(f".{filename}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, dest_path)
+        
+        with self._lock:
+            self.artifacts[name] = {
+                'name': name,
+                'path': str(dest_path),
+                'original_path': None,
+                'size_bytes': len(data),
+                'timestamp': time.time(),
+                'metadata': metadata or {}
+            }
+            self._save_artifacts()
+        
+        return str(dest_path)
+    
+    def _save_artifacts(self):
+        """Save the artifacts registry to disk."""
         artifacts_path = self.run_dir / "artifacts.json"
         with open(artifacts_path, 'w') as f:
             json.dump(self.artifacts, f, indent=2)
+    
+    @property
+    def step(self):
+        """Step recorded by the next `log` call without an explicit step."""
+        return self._step
+    
+    def metrics_snapshot(self, keys=None):
+        """
+        Copy the logged points, so they can be read while other threads keep logging.
         
-        return str(dest_path)
+        Args:
+            keys (list, optional): Metric names or glob patterns. None copies every metric.
+        
+        Returns:
+            dict: Mapping of metric key to a copy of its list of points
+        """
+        with self._lock:
+            return {key: list(self.metrics[key]) for key in select_keys(self.metrics, keys)}
+    
+    def system_writer(self, n_cores, n_gpus=0):
+        """
+        Open the run's system metrics stream for appending; used by SystemMonitor.
+        
+        Args:
+            n_cores (int): Number of logical CPU cores
+            n_gpus (int): Number of GPUs
+        
+        Returns:
+            SystemMetricsWriter: Writer of system.bin in the run directory
+        """
+        return SystemMetricsWriter(self.run_dir, n_cores, n_gpus)
     
     def finish(self):
         """End the experiment run and record final metadata."""
         end_time = datetime.now()
         duration = (end_time - self.start_time).total_seconds()
         
+        with self._lock:
+            self._save_summary()
+        
         # Update run info with completion details
         info_path = self.run_dir / "run_info.json"
         with open(info_path, 'r') as f:
@@ -0,0 +1,150 @@
+import os
+import psutil
+
+_GB = 1024 ** 3
+
+
+class ProcessTree:
+    """
+    Resource accounting for a process and all of its descendants.
+
+    Process handles are kept across samples, so each sample only reads the
+    counters of known processes. New descendants are found by walking down from
+    the known processes (using /proc/<pid>/task/<tid>/children where the kernel
+    provides it), rather than scanning every process on the host. Counters of
+    processes that exit are carried over, so the CPU time and I/O totals never
+    go backwards when a dataloader worker is replaced.
+    """
+
+    def __init__(self, pid=None):
+        """
+        Initialize process tree.
+
+        Args:
+            pid (int, optional): Root process. Defaults to the current process.
+        """
+        self.root = psutil.Process(pid or os.getpid())
+        self._procs = {self.root.pid: self.root}
+        # pid -> (cpu seconds, read bytes, write bytes) at the last sample
+        self._last = {}
+        self._exited = (0.0, 0, 0)
+        self._proc_children = os.path.exists(f"/proc/{self.root.pid}/task/{self.root.pid}/children")
+        self.refresh()
+
+    def _children(self, pid):
+        """Get the pids of the direct children of a process."""
+        children = set()
+        task_dir = f"/proc/{pid}/task"
+        for tid in os.listdir(task_dir):
+            try:
+                with open(f"{task_dir}/{tid}/children", 'r') as f:
+                    children.update(int(child) for child in f.read().split())
+            except OSError:
+                pass
+        return children
+
+    def refresh(self):
+        """Pick up processes started since the last refresh."""
+        if not self._proc_children:
+            # One scan of the process table for the whole tree
+            try:
+                descendants = self.root.children(recursive=True)
+            except psutil.Error:
+                return
+            for proc in descendants:
+                self._procs.setdefault(proc.pid, proc)
+            return
+
+        stack = list(self._procs)
+        while stack:
+            try:
+                children = self._children(stack.pop())
+            except OSError:
+                continue
+            for pid in children - self._procs.keys():
+                try:
+                    self._procs[pid] = psutil.Process(pid)
+                except psutil.Error:
+                    continue
+                stack.append(pid)
+
+    def _forget(self, pid):
+        """Drop an exited process, keeping its last counters in the totals."""
+        self._procs.pop(pid, None)
+        last = self._last.pop(pid, None)
+        if last is not None:
+            self._exited = tuple(total + value for total, value in zip(self._exited, last))
+
+    def rss_gb(self):
+        """
+        Get the resident memory of the tree; cheap enough to call at high frequency.
+
+        Returns:
+            float: Total RSS in GB
+        """
+        rss = 0
+        for pid, proc in list(self._procs.items()):
+            try:
+                rss += proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                self._forget(pid)
+            except psutil.Error:
+                pass
+        return rss / _GB
+
+    def sample(self):
+        """
+        Read the counters of every process in the tree.
+
+        Values a process does not expose (e.g. USS or I/O counters of a process
+        owned by another user) are left out of the totals.
+
+        Returns:
+            dict: 'count', 'cpu_time' (user + system seconds, including exited
+                processes), 'rss_gb', 'uss_gb', 'read_bytes', 'write_bytes'
+                (including exited processes), 'num_fds' and 'num_threads'
+        """
+        totals = {'count': 0, 'rss_gb': 0.0, 'uss_gb': 0.0, 'num_fds': 0, 'num_threads': 0}
+        cpu_time, read_bytes, write_bytes = 0.0, 0, 0
+
+        for pid, proc in list(self._procs.items()):
+            try:
+                with proc.oneshot():
+                    times = proc.cpu_times()
+                    proc_cpu = times.user + times.system
+                    try:
+                        memory = proc.memory_full_info()
+                        uss = memory.uss
+                    except (psutil.AccessDenied, AttributeError):
+                        memory, uss = proc.memory_info(), 0
+                    try:
+                        io = proc.io_counters()
+                        proc_read, proc_write = io.read_bytes, io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        proc_read, proc_write = 0, 0
+                    try:
+                        num_fds = proc.num_fds()
+                    except (psutil.AccessDenied, AttributeError):
+                        num_fds = 0
+                    num_threads = proc.num_threads()
+            except psutil.NoSuchProcess:
+                self._forget(pid)
+                continue
+            except psutil.Error:
+                continue
+
+            self._last[pid] = (proc_cpu, proc_read, proc_write)
+            totals['count'] += 1
+            totals['rss_gb'] += memory.rss / _GB
+            totals['uss_gb'] += uss / _GB
+            totals['num_fds'] += num_fds
+            totals['num_threads'] += num_threads
+            cpu_time += proc_cpu
+            read_bytes += proc_read
+            write_bytes += proc_write
+
+        # Added last: processes found to have exited during this sample are included
+        exited_cpu, exited_read, exited_write = self._exited
+        totals.update(cpu_time=cpu_time + exited_cpu, read_bytes=read_bytes + exited_read,
+                      write_bytes=write_bytes + exited_write)
+        return totals
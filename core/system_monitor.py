@@ -1,115 +1,217 @@
 import threading
 import time
 import psutil
-import platform
-import os
+import math
+from .devices import detect_devices
+from .process_tree import ProcessTree
+from ..utils.system_stream import SampleRing, gauge_shapes
 
 class SystemMonitor:
-    """Monitor system resources during experiment runs."""
+    """
+    Monitor system resources during experiment runs.
     
-    def __init__(self, experiment, interval=5.0):
+    CPU and memory are sampled at high frequency into a ring buffer, so short
+    spikes are not missed, and only their per-window min/max/mean/p95 are
+    recorded every `interval` seconds. Sampling slows down while the values
+    are stable and speeds back up as soon as they move.
+    
+    The training process and its descendants (e.g. dataloader workers) are
+    accounted for separately from the host: CPU time, RSS/USS, I/O bytes, open
+    file descriptors and threads of the whole tree.
+    
+    Accelerators are found by the device probes in core.devices, which read
+    driver interfaces directly instead of importing ML frameworks, so CPU-only
+    jobs pay nothing for GPU support.
+    
+    Windows go to the run's system metrics stream (system.bin), one fixed-size
+    row per window with per-core and per-GPU values as vectors, rather than
+    through Experiment.log: they neither add keys to metrics.json nor advance
+    the run's step counter. A RemoteExperiment sends them to the server, which
+    appends them to the same stream. Read them back with
+    LocalStorage.load_system_metrics or through the server's and the dashboard's
+    /api/projects/<project>/runs/<run>/system endpoint (MLTrackerClient.get_system_metrics).
+    """
+    
+    def __init__(self, experiment, interval=5.0, sample_interval=0.1, max_sample_interval=1.0,
+                 stable_threshold=1.0, track_processes=True, pid=None, device_probes=None):
         """
         Initialize system monitor.
         
         Args:
             experiment: The experiment to log metrics to
-            interval (float): Monitoring interval in seconds
+            interval (float): Logging interval in seconds; one aggregated row is written per interval
+            sample_interval (float): Shortest time between samples in seconds
+            max_sample_interval (float): Longest time between samples while values are stable
+            stable_threshold (float): Change in CPU or memory percent between two samples
+                below which values count as stable
+            track_processes (bool): Account for the process tree rooted at `pid`
+            pid (int, optional): Root of the process tree. Defaults to the current process.
+            device_probes (list, optional): DeviceProbe instances to sample. Defaults to the
+                probes that found devices on this machine; an empty list disables GPU monitoring.
         """
         self.experiment = experiment
         self.interval = interval
+        self.sample_interval = sample_interval
+        self.max_sample_interval = max(max_sample_interval, sample_interval)
+        self.stable_threshold = stable_threshold
+        self.track_processes = track_processes
+        self.pid = pid
+        self.process_tree = None
         self.running = False
         self.thread = None
-        self._has_gpu = self._check_gpu()
+        self.writer = None
+        self.device_probes = device_probes
+        self._probes = ()
+        self._stop_event = threading.Event()
     
-    def _check_gpu(self):
-        """Check if GPU monitoring is available."""
-        try:
-            import torch
-            return torch.cuda.is_available()
-        except ImportError:
-            try:
-                import tensorflow as tf
-                return tf.config.list_physical_devices('GPU')
-            except ImportError:
-                return False
+    def _sample(self, ring):
+        """Take one high-frequency sample and return whether the values were stable."""
+        cpu_per_core = psutil.cpu_percent(interval=None, percpu=True)
+        memory = psutil.virtual_memory()
+        sample = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            # Cores taken offline since the stream was opened read as NaN
+            'cpu_per_core': (cpu_per_core + [float('nan')] * self._n_cores)[:self._n_cores],
+            'memory_used_percent': memory.percent,
+            'memory_used_gb': memory.used / (1024 ** 3),
+        }
+        if self.process_tree is not None:
+            # Pick up new workers within a second, so their memory counts towards the peaks
+            now = time.monotonic()
+            if now - self._last_refresh >= 1.0:
+                self.process_tree.refresh()
+                self._last_refresh = now
+            sample['proc_rss_gb'] = self.process_tree.rss_gb()
+        
+        previous_cpu = ring.latest('cpu_percent')
+        previous_memory = ring.latest('memory_used_percent')
+        ring.append(sample)
+        if previous_cpu is None:
+            return False
+        return abs(sample['cpu_percent'] - previous_cpu[0]) < self.stable_threshold and \
+            abs(sample['memory_used_percent'] - previous_memory[0]) < self.stable_threshold
     
-    def _get_gpu_stats(self):
-        """Get GPU statistics if available."""
-        gpu_stats = {}
+    def _emit(self, ring):
+        """Write the aggregates of a window together with the slowly changing values."""
+        samples = ring.count
+        row = ring.aggregate()
+        
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        net_io = psutil.net_io_counters()
+        row.update({
+            'timestamp': time.time(),
+            # Read without the experiment's lock; only used to line windows up with training
+            'step': self.experiment.step,
+            'samples': samples,
+            'memory_total_gb': memory.total / (1024 ** 3),
+            'disk_used_percent': disk.percent,
+            'net_bytes_sent': net_io.bytes_sent,
+            'net_bytes_recv': net_io.bytes_recv,
+        })
         
-        try:
-            import torch
-            if torch.cuda.is_available():
-                for i in range(torch.cuda.device_count()):
-                    # Get utilization stats using nvidia-smi via subprocess
-                    # This is a simplified version
-                    gpu_stats[f'gpu_{i}_memory_used_percent'] = torch.cuda.memory_allocated(i) / torch.cuda.max_memory_allocated(i) * 100 if torch.cuda.max_memory_allocated(i) > 0 else 0
-        except:
-            pass
+        # Accelerators change slowly compared to host memory, so they are read once per window
+        if self._n_gpus:
+            row['gpu_utilization'] = []
+            row['gpu_memory_used_percent'] = []
+            for probe, count in self._probes:
+                try:
+                    utilization, memory_used = probe.sample()
+                except Exception:
+                    utilization = memory_used = [float('nan')] * count
+                row['gpu_utilization'].extend(utilization)
+                row['gpu_memory_used_percent'].extend(memory_used)
         
-        try:
-            import GPUtil
-            gpus = GPUtil.getGPUs()
-            for i, gpu in enumerate(gpus):
-                gpu_stats[f'gpu_{i}_utilization'] = gpu.load * 100
-                gpu_stats[f'gpu_{i}_memory_used_percent'] = gpu.memoryUtil * 100
-        except:
-            pass
-            
-        return gpu_stats
+        if self.process_tree is not None:
+            self._add_process_stats(row)
+        
+        self.writer.write(row)
+    
+    def _add_process_stats(self, row):
+        """Add the totals of the monitored process tree to a window's row."""
+        self.process_tree.refresh()
+        stats = self.process_tree.sample()
+        now = time.monotonic()
+        last_time, last_cpu = self._last_cpu
+        self._last_cpu = (now, stats['cpu_time'])
+        
+        row.update({
+            'proc_count': stats['count'],
+            'proc_cpu_time': stats['cpu_time'],
+            # Busy cores over the window, as a percentage of one core
+            'proc_cpu_percent': (stats['cpu_time'] - last_cpu) / (now - last_time) * 100 if now > last_time else 0.0,
+            'proc_uss_gb': stats['uss_gb'],
+            'proc_read_bytes': stats['read_bytes'],
+            'proc_write_bytes': stats['write_bytes'],
+            'proc_num_fds': stats['num_fds'],
+            'proc_num_threads': stats['num_threads'],
+        })
     
     def _monitor(self):
         """Monitoring function that runs in a separate thread."""
-        while self.running:
+        capacity = math.ceil(self.interval / self.sample_interval) + 1
+        ring = SampleRing(gauge_shapes(self._n_cores), capacity)
+        delay = self.sample_interval
+        window_end = time.monotonic() + self.interval
+        
+        while not self._stop_event.wait(max(0.0, min(delay, window_end - time.monotonic()))):
             try:
-                # CPU usage
-                cpu_percent = psutil.cpu_percent(interval=None)
-                cpu_per_core = psutil.cpu_percent(interval=None, percpu=True)
-                
-                # Memory usage
-                memory = psutil.virtual_memory()
-                memory_used_percent = memory.percent
-                memory_used_gb = memory.used / (1024 ** 3)
-                memory_total_gb = memory.total / (1024 ** 3)
-                
-                # Disk usage
-                disk = psutil.disk_usage('/')
-                disk_used_percent = disk.percent
-                
-                # Network stats
-                net_io = psutil.net_io_counters()
-                
-                # System metrics
-                metrics = {
-                    'system.cpu.percent': cpu_percent,
-                    'system.memory.used_percent': memory_used_percent,
-                    'system.memory.used_gb': memory_used_gb,
-                    'system.memory.total_gb': memory_total_gb,
-                    'system.disk.used_percent': disk_used_percent,
-                    'system.net.bytes_sent': net_io.bytes_sent,
-                    'system.net.bytes_recv': net_io.bytes_recv,
-                }
-                
-                # Add per-core CPU metrics
-                for i, core_percent in enumerate(cpu_per_core):
-                    metrics[f'system.cpu.core_{i}'] = core_percent
-                
-                # Add GPU metrics if available
-                if self._has_gpu:
-                    gpu_stats = self._get_gpu_stats()
-                    metrics.update(gpu_stats)
-                
-                # Log to experiment
-                self.experiment.log(metrics)
+                # Back off while values are stable, return to full rate as soon as they move
+                if self._sample(ring):
+                    delay = min(delay * 2, self.max_sample_interval)
+                else:
+                    delay = self.sample_interval
                 
+                now = time.monotonic()
+                if now >= window_end:
+                    window_end += self.interval
+                    if window_end <= now:
+                        window_end = now + self.interval
+                    self._emit(ring)
             except Exception as e:
                 print(f"Error in system monitoring: {e}")
-            
-            time.sleep(self.interval)
+        
+        # Record the partial last window
+        if ring.count:
+            try:
+                self._emit(ring)
+            except Exception as e:
+                print(f"Error in system monitoring: {e}")
+    
+    def _detect_devices(self):
+        """Get (probe, device count) of every probe with devices."""
+        if self.device_probes is None:
+            return list(detect_devices())
+        
+        probes = []
+        for probe in self.device_probes:
+            try:
+                count = probe.detect()
+            except Exception as e:
+                print(f"MLTracker: {type(probe).__name__} failed to detect devices: {e}")
+                continue
+            if count:
+                probes.append((probe, count))
+        return probes
     
     def start(self):
         """Start the monitoring thread."""
         if not self.running:
+            if not hasattr(self.experiment, 'system_writer') or not hasattr(self.experiment, 'step'):
+                raise TypeError(f"SystemMonitor needs an experiment with `step` and `system_writer`, "
+                                f"such as Experiment or RemoteExperiment; got {type(self.experiment).__name__}")
+            self._n_cores = psutil.cpu_count() or 1
+            self._probes = self._detect_devices()
+            self._n_gpus = sum(count for _, count in self._probes)
+            self.writer = self.experiment.system_writer(self._n_cores, self._n_gpus)
+            if self.track_processes:
+                self.process_tree = ProcessTree(self.pid)
+                self._last_refresh = time.monotonic()
+                self._last_cpu = (time.monotonic(), self.process_tree.sample()['cpu_time'])
+            # The first CPU reading only sets the baseline of the next one
+            psutil.cpu_percent(interval=None)
+            psutil.cpu_percent(interval=None, percpu=True)
+            self._stop_event.clear()
             self.running = True
             self.thread = threading.Thread(target=self._monitor)
             self.thread.daemon = True
@@ -117,8 +219,11 @@ class SystemMonitor:
             print("MLTracker: System monitoring started")
     
     def stop(self):
-        """Stop the monitoring thread."""
+        """Stop the monitoring thread; returns as soon as the current sample is recorded."""
         self.running = False
+        self._stop_event.set()
         if self.thread:
             self.thread.join(timeout=self.interval + 1.0)
+            self.thread = None
+            self.writer.close()
             print("MLTracker: System monitoring stopped")
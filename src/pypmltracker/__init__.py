@@ -8,7 +8,9 @@ from .visualization.plots import Plotter
 from .storage.local import LocalStorage
 from .storage.cloud import S3Storage
 from .api.client import MLTrackerClient
+from .api.async_client import AsyncMLTrackerClient
 from .api.server import MLTrackerServer
+from .api.remote import RemoteExperiment
 from .utils.logging import mltracker_logger as logger
 
 __version__ = "0.1.0"
@@ -24,6 +26,8 @@ __all__ = [
     "LocalStorage",
     "S3Storage",
     "MLTrackerClient",
+    "AsyncMLTrackerClient",
     "MLTrackerServer",
+    "RemoteExperiment",
     "logger"
 ]
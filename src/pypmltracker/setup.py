@@ -29,6 +29,6 @@ setup(
         "tensorflow": ["tensorflow"],
         "sklearn": ["scikit-learn"],
         "cloud": ["boto3"],
-        "gpu": ["GPUtil"],
+        "gpu": ["nvidia-ml-py"],
     },
 )
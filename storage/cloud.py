@@ -2,13 +2,16 @@ import os
 import json
 import tempfile
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from pathlib import Path
+from ..utils.checksum import file_sha256, matches_checksum
 
 class S3Storage:
     """AWS S3 storage for experiments."""
     
-    def __init__(self, bucket_name, aws_access_key_id=None, aws_secret_access_key=None, region_name=None):
+    def __init__(self, bucket_name, aws_access_key_id=None, aws_secret_access_key=None, region_name=None,
+                 part_size=64 * 1024 * 1024, max_concurrency=16):
         """
         Initialize S3 storage.
         
@@ -17,9 +20,19 @@ class S3Storage:
             aws_access_key_id (str, optional): AWS access key ID
             aws_secret_access_key (str, optional): AWS secret access key
             region_name (str, optional): AWS region name
+            part_size (int): Part size of multipart uploads and ranged downloads
+            max_concurrency (int): Number of parts transferred in parallel
         """
         self.bucket_name = bucket_name
         
+        # Artifacts larger than one part are transferred as parallel parts
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=max_concurrency,
+            use_threads=True
+        )
+        
         # Initialize S3 client
         self.s3 = boto3.client(
             's3',
@@ -111,10 +124,14 @@ class S3Storage:
         Returns:
             str: S3 key of the saved artifact
         """
-        # Upload file to S3
+        # Upload file to S3, keeping its checksum to verify downloads
         artifact_key = self._get_s3_key(project_name, run_name, f"artifacts/{os.path.basename(file_path)}")
-        with open(file_path, 'rb') as f:
-            self.s3.upload_fileobj(f, self.bucket_name, artifact_key)
+        sha256 = file_sha256(file_path)
+        self.s3.upload_file(
+            file_path, self.bucket_name, artifact_key,
+            ExtraArgs={'Metadata': {'sha256': sha256}},
+            Config=self.transfer_config
+        )
         
         # Update artifacts registry
         artifacts_key = self._get_s3_key(project_name, run_name, "artifacts.json")
@@ -128,6 +145,8 @@ class S3Storage:
         artifacts[artifact_name] = {
             'key': artifact_key,
             'original_path': file_path,
+            'size_bytes': os.path.getsize(file_path),
+            'sha256': sha256,
             'metadata': metadata or {}
         }
         
@@ -176,18 +195,25 @@ class S3Storage:
         except ClientError:
             return None
     
-    def download_artifact(self, project_name, run_name, artifact_name, destination=None):
+    def download_artifact(self, project_name, run_name, artifact_name, destination=None, verify=True):
         """
         Download an artifact from S3.
         
+        Large artifacts are downloaded as parallel ranged parts. A local file that
+        already has the artifact's checksum is not downloaded again.
+        
         Args:
             project_name (str): Project name
             run_name (str): Run name
             artifact_name (str): Artifact name
             destination (str, optional): Destination path
+            verify (bool): Verify the checksum of the downloaded file
         
         Returns:
             str: Path to the downloaded artifact
+        
+        Raises:
+            IOError: If the downloaded file does not match the recorded checksum
         """
         # Get artifact metadata
         artifacts_key = self._get_s3_key(project_name, run_name, "artifacts.json")
@@ -202,6 +228,7 @@ class S3Storage:
         
         artifact = artifacts[artifact_name]
         artifact_key = artifact['key']
+        sha256 = artifact.get('sha256')
         
         # Create destination path
         if destination is None:
@@ -209,8 +236,15 @@ class S3Storage:
         
         destination_path = os.path.join(destination, os.path.basename(artifact_key))
         
+        if matches_checksum(destination_path, sha256, artifact.get('size_bytes')):
+            return destination_path
+        
         # Download the artifact
-        self.s3.download_file(self.bucket_name, artifact_key, destination_path)
+        self.s3.download_file(self.bucket_name, artifact_key, destination_path, Config=self.transfer_config)
+        
+        if verify and sha256 and file_sha256(destination_path) != sha256:
+            os.remove(destination_path)
+            raise IOError(f"Checksum mismatch for artifact '{artifact_name}'")
         
         return destination_path
     
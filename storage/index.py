@@ -0,0 +1,355 @@
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from ..utils.cache import LRUCache
+from ..utils.metrics_query import encode_cursor, decode_cursor
+from ..utils.summary import load_summary
+
+_FILTER_PATTERN = re.compile(r'^\s*([\w.\-]+)\s*(==|!=|<=|>=|=|<|>|\s+contains\s+)\s*(.*?)\s*$')
+
+_OPERATORS = {
+    '=': lambda a, b: a == b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    'contains': lambda a, b: b in a,
+}
+
+# Files whose content is part of a run record
+_RECORD_FILES = ('run_info.json', 'config.json', 'summary.json')
+
+
+def parse_filter(expression):
+    """
+    Parse a run filter such as `status=running`, `tags contains x` or `config.lr < 0.01`.
+
+    Args:
+        expression (str): Filter expression
+
+    Returns:
+        tuple: (field path, operator, value)
+
+    Raises:
+        ValueError: If the expression cannot be parsed
+    """
+    match = _FILTER_PATTERN.match(expression)
+    if not match or not match.group(3):
+        raise ValueError(f"Invalid filter: {expression}")
+
+    field, op, raw = match.group(1), match.group(2).strip(), match.group(3)
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw.strip('"\'')
+    return field, op, value
+
+
+def parse_run_query(args):
+    """
+    Parse run listing parameters (`filter`, `sort_by`, `limit`, `cursor`) from a query string.
+
+    Args:
+        args: Query arguments (a werkzeug MultiDict)
+
+    Returns:
+        dict: Keyword arguments for `RunIndex.query`
+
+    Raises:
+        ValueError: If a parameter has an invalid value
+    """
+    filters = args.getlist('filter')
+    for expression in filters:
+        parse_filter(expression)
+
+    limit = args.get('limit')
+    if limit:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError(f"Invalid value for 'limit': {limit}")
+        if limit <= 0:
+            raise ValueError("'limit' must be a positive integer")
+    else:
+        limit = None
+
+    cursor = args.get('cursor') or None
+    decode_cursor(cursor)
+
+    return {
+        'filters': filters,
+        'sort_by': args.get('sort_by') or None,
+        'limit': limit,
+        'cursor': cursor,
+    }
+
+
+def resolve_field(record, field):
+    """
+    Look up a dotted field in a run record.
+
+    `name`, `info.*`, `config.*` and `summary.*` address the record directly; any
+    other name is looked up in the run info (e.g. `status`, `tags`, `start_time`).
+    `summary.<key>` is the metric's last value; `summary.<key>.min`, `.max`,
+    `.min_step`, `.mean` etc. address the other summary fields.
+
+    Returns:
+        The field value, or None if it is missing
+    """
+    parts = field.split('.')
+    section = parts[0]
+    if section == 'name' and len(parts) == 1:
+        return record.get('name')
+    if section in ('info', 'config', 'summary'):
+        value = record.get(section)
+        parts = parts[1:]
+    else:
+        value = record.get('info')
+
+    for part in parts:
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    if section == 'summary' and len(parts) == 1 and isinstance(value, dict):
+        return value.get('last')
+    return value
+
+
+def matches(record, filters):
+    """Check whether a run record satisfies every (field, operator, value) filter."""
+    for field, op, expected in filters:
+        value = resolve_field(record, field)
+        if value is None:
+            return False
+        try:
+            if not _OPERATORS[op](value, expected):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def _sort_value(value):
+    """Make values of mixed types comparable: numbers first, then strings, then others."""
+    if isinstance(value, bool):
+        return (0, float(value))
+    if isinstance(value, (int, float)):
+        return (0, float(value))
+    if isinstance(value, str):
+        return (1, value)
+    return (2, json.dumps(value, sort_keys=True, default=str))
+
+
+class _ProjectEntry:
+    """Cached run records of one project."""
+
+    def __init__(self):
+        self.dir_mtime = None
+        self.checked_at = 0.0
+        self.records = {}
+        self.stamps = {}
+        self.generation = 0
+        # Runs reported as changed, reloaded without revalidating the whole project
+        self.dirty = set()
+
+
+class RunIndex:
+    """
+    In-process index of run records for fast listing, filtering and sorting.
+
+    Records are rebuilt only for runs whose metadata files changed. A project is
+    revalidated at most once per `refresh_interval`, or immediately after `invalidate`.
+    While a `ChangeWatcher` runs, nothing is revalidated on a timer: only the runs
+    the watcher reports as changed are reloaded.
+    """
+
+    def __init__(self, storage_dir, refresh_interval=1.0, watcher=None):
+        """
+        Initialize run index.
+
+        Args:
+            storage_dir (str): Base directory for experiment data
+            refresh_interval (float): Seconds a project listing is trusted without
+                checking the filesystem. Ignored while the watcher runs.
+            watcher (ChangeWatcher, optional): Watcher reporting changed runs
+        """
+        self.storage_dir = Path(storage_dir)
+        self.refresh_interval = refresh_interval
+        self.watcher = watcher
+        self._projects = {}
+        self._lock = threading.Lock()
+        self._results = LRUCache(max_entries=128)
+        if watcher is not None:
+            watcher.add_listener(self._on_change)
+
+    def _on_change(self, project_name, run_name, filename):
+        if filename is None or filename in _RECORD_FILES:
+            self.invalidate(project_name, run_name)
+
+    def invalidate(self, project_name=None, run_name=None):
+        """
+        Force revalidation of a run, a project or the whole index.
+
+        Args:
+            project_name (str, optional): Project name. None invalidates every project.
+            run_name (str, optional): Run name. None invalidates the whole project.
+        """
+        with self._lock:
+            entries = self._projects.values() if project_name is None else \
+                [self._projects[project_name]] if project_name in self._projects else []
+            for entry in entries:
+                if run_name is not None:
+                    entry.dirty.add(run_name)
+                else:
+                    # Rescan the run directories; unchanged records are kept
+                    entry.checked_at = 0.0
+                    entry.dir_mtime = None
+
+    def cache_stats(self):
+        """
+        Get hit and miss counts of the listing cache.
+
+        Returns:
+            tuple: (hits, misses)
+        """
+        return self._results.hits, self._results.misses
+
+    def _load_record(self, run_dir):
+        record = {'name': run_dir.name, 'info': None, 'config': {}}
+        for filename, field in (('run_info.json', 'info'), ('config.json', 'config')):
+            try:
+                with open(run_dir / filename, 'r') as f:
+                    record[field] = json.load(f)
+            except (OSError, ValueError):
+                pass
+        # Filters and sorting on summary fields never read metrics files
+        record['summary'] = load_summary(run_dir) or {}
+        return record
+
+    def _stamp(self, run_dir):
+        stamp = []
+        for filename in _RECORD_FILES:
+            try:
+                st = os.stat(run_dir / filename)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _refresh(self, project_name):
+        """Bring a project's records up to date. Must hold the lock."""
+        entry = self._projects.setdefault(project_name, _ProjectEntry())
+        now = time.monotonic()
+        # Without a running watcher, changes are only found by checking the filesystem
+        watched = self.watcher is not None and self.watcher.running
+        if entry.checked_at and (watched or now - entry.checked_at < self.refresh_interval):
+            if entry.dirty:
+                self._reload_dirty(project_name, entry)
+            return entry
+
+        project_dir = self.storage_dir / project_name
+        try:
+            dir_mtime = os.stat(project_dir).st_mtime_ns
+        except OSError:
+            if entry.records:
+                entry.generation += 1
+            entry.records, entry.stamps, entry.dir_mtime = {}, {}, None
+            entry.checked_at = now
+            return entry
+
+        changed = False
+
+        # Runs are only added or removed when the project directory itself changes
+        if dir_mtime != entry.dir_mtime:
+            names = {e.name for e in os.scandir(project_dir) if e.is_dir()}
+            for name in set(entry.records) - names:
+                del entry.records[name]
+                entry.stamps.pop(name, None)
+                changed = True
+            for name in names - set(entry.records):
+                entry.records[name] = None
+            entry.dir_mtime = dir_mtime
+
+        for name in list(entry.records):
+            run_dir = project_dir / name
+            stamp = self._stamp(run_dir)
+            if entry.records[name] is None or name in entry.dirty or entry.stamps.get(name) != stamp:
+                entry.records[name] = self._load_record(run_dir)
+                entry.stamps[name] = stamp
+                changed = True
+        entry.dirty.clear()
+
+        if changed:
+            entry.generation += 1
+        entry.checked_at = now
+        return entry
+
+    def _reload_dirty(self, project_name, entry):
+        """Reload only the runs reported as changed. Must hold the lock."""
+        for name in entry.dirty:
+            run_dir = self.storage_dir / project_name / name
+            if run_dir.is_dir():
+                entry.records[name] = self._load_record(run_dir)
+                entry.stamps[name] = self._stamp(run_dir)
+            else:
+                entry.records.pop(name, None)
+                entry.stamps.pop(name, None)
+        entry.dirty.clear()
+        entry.generation += 1
+
+    def runs(self, project_name):
+        """
+        Get every run record of a project.
+
+        Returns:
+            list: Run records ({'name', 'info', 'config', 'summary'}), sorted by name
+        """
+        with self._lock:
+            entry = self._refresh(project_name)
+            return [entry.records[name] for name in sorted(entry.records)]
+
+    def query(self, project_name, filters=None, sort_by=None, limit=None, cursor=None, require_info=False):
+        """
+        List run records with filtering, sorting and pagination.
+
+        Args:
+            project_name (str): Project name
+            filters (list, optional): Filter expressions, e.g. ['status=running', 'config.lr < 0.01']
+            sort_by (str, optional): Field to sort by; prefix with '-' for descending order
+            limit (int, optional): Maximum number of records returned
+            cursor (str, optional): Cursor returned by a previous query
+            require_info (bool): Skip directories without a run_info.json
+
+        Returns:
+            tuple: (records, cursor for the next page or None, total number of matches)
+        """
+        parsed = [parse_filter(f) for f in filters or []]
+        offset = decode_cursor(cursor).get('offset', 0)
+
+        with self._lock:
+            entry = self._refresh(project_name)
+
+            # Filtered and sorted listings are reused until the project changes
+            cache_key = (project_name, entry.generation, tuple(filters or ()), sort_by, require_info)
+            selected = self._results.get(cache_key)
+            if selected is None:
+                records = entry.records
+                selected = [records[name] for name in sorted(records)
+                            if matches(records[name], parsed) and not (require_info and records[name]['info'] is None)]
+                if sort_by:
+                    field = sort_by.lstrip('-')
+                    present = [r for r in selected if resolve_field(r, field) is not None]
+                    missing = [r for r in selected if resolve_field(r, field) is None]
+                    present.sort(key=lambda r: _sort_value(resolve_field(r, field)),
+                                 reverse=sort_by.startswith('-'))
+                    selected = present + missing
+                self._results.set(cache_key, selected)
+
+        end = len(selected) if limit is None else offset + limit
+        next_cursor = encode_cursor({'offset': end}) if end < len(selected) else None
+        return selected[offset:end], next_cursor, len(selected)
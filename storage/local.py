@@ -2,6 +2,10 @@ import os
 import shutil
 import json
 from pathlib import Path
+from ..utils.summary import load_summary, save_summary, summarize_metrics, summary_is_stale
+from ..utils.encoding import to_columns
+from ..utils.system_stream import load_system_metrics
+from ..utils.metrics_query import select_keys
 
 class LocalStorage:
     """Local filesystem storage for experiments."""
@@ -57,6 +61,7 @@ class LocalStorage:
         metrics_path = run_dir / "metrics.json"
         with open(metrics_path, 'w') as f:
             json.dump(metrics, f, indent=2)
+        save_summary(run_dir, summarize_metrics(metrics))
         
         return str(metrics_path)
     
@@ -136,6 +141,83 @@ class LocalStorage:
         with open(metrics_path, 'r') as f:
             return json.load(f)
     
+    def load_metric_columns(self, project_name, run_name, keys=None):
+        """
+        Load selected metrics as NumPy columns.
+        
+        Only the selected keys are converted, and the parsed lists are dropped
+        as soon as their columns are built.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            keys (list, optional): Metric names or glob patterns. None loads every key.
+        
+        Returns:
+            dict: Mapping of metric key to {'step', 'value', 'timestamp'} arrays, or None
+                if the run has no metrics
+        """
+        metrics = self.load_metrics(project_name, run_name)
+        if metrics is None:
+            return None
+        return to_columns({key: metrics.pop(key) for key in select_keys(metrics, keys)})
+    
+    def load_summary(self, project_name, run_name):
+        """
+        Load a run's per-metric summary (last, min, max, step of min/max, count, mean, variance).
+        
+        Summaries are small, so listings over many runs can avoid reading whole
+        metrics files. A run without one gets it computed from its metrics in
+        memory; `migrate_summaries` saves them.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+        
+        Returns:
+            dict: Mapping of metric key to its summary, or None if the run has no metrics
+        """
+        return load_summary(self.base_dir / project_name / run_name)
+    
+    def load_system_metrics(self, project_name, run_name):
+        """
+        Load the system metrics recorded by a SystemMonitor as columns.
+        
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+        
+        Returns:
+            dict: Mapping of field name to an array with one entry per logging window:
+                'timestamp', 'step', 'samples'; `<gauge>_<stat>` for the gauges 'cpu_percent',
+                'cpu_per_core', 'memory_used_percent', 'memory_used_gb' and 'proc_rss_gb' with
+                the statistics 'min', 'max', 'mean' and 'p95' (e.g. 'memory_used_percent_max');
+                'memory_total_gb', 'disk_used_percent', 'net_bytes_sent', 'net_bytes_recv',
+                'gpu_utilization', 'gpu_memory_used_percent' and the 'proc_*' totals of the
+                monitored process tree. Per-core and per-GPU fields are 2-D. None if the run
+                has no system metrics.
+        """
+        return load_system_metrics(self.base_dir / project_name / run_name)
+    
+    def migrate_summaries(self, project_name=None):
+        """
+        Write summary.json for runs logged before summaries existed, or whose summary is stale.
+        
+        Args:
+            project_name (str, optional): Project to migrate. Defaults to every project.
+        
+        Returns:
+            int: Number of runs whose summary was written
+        """
+        migrated = 0
+        projects = [project_name] if project_name else self.list_projects()
+        for project in projects:
+            for run_name in self.list_runs(project):
+                run_dir = self.base_dir / project / run_name
+                if summary_is_stale(run_dir) and load_summary(run_dir, save=True) is not None:
+                    migrated += 1
+        return migrated
+    
     def load_artifact(self, project_name, run_name, artifact_name):
         """
         Load artifact metadata from local storage.
@@ -1,15 +1,27 @@
 # tests/test_api.py
+import asyncio
 import unittest
+import json
 import os
+import re
 import shutil
 import tempfile
 import threading
 import time
+import numpy as np
+import psutil
 import requests
 from tests.conftest import get_free_port
 from pypmltracker.api.server import MLTrackerServer
 from pypmltracker.api.client import MLTrackerClient
+from pypmltracker.api.async_client import AsyncMLTrackerClient
+from pypmltracker.api.admission import AdmissionController
+from pypmltracker.api.remote import RemoteExperiment
+from pypmltracker.api.spool import Spool
+from pypmltracker.api.response_cache import ResponseCache
 from pypmltracker.core.experiment import Experiment
+from pypmltracker.utils.streaming import MetricHub
+from pypmltracker.core.system_monitor import SystemMonitor
 
 class TestAPI(unittest.TestCase):
     def setUp(self):
@@ -87,13 +99,658 @@ class TestAPI(unittest.TestCase):
         self.assertEqual(len(runs), 1)
         self.assertEqual(runs[0]["name"], "test_run")
     
+    def test_list_runs_filtered_and_paginated(self):
+        for i in range(5):
+            Experiment(
+                project_name="test_project",
+                run_name=f"sweep_{i}",
+                config={"learning_rate": 0.001 * (i + 1)},
+                tags=["sweep"],
+                storage_dir=self.test_dir
+            )
+        self.server.run_index.invalidate("test_project")
+        
+        runs, cursor = self.client.list_runs("test_project", filters=["tags contains sweep", "config.learning_rate < 0.0045"],
+                                             sort_by="-config.learning_rate", limit=2, return_cursor=True)
+        self.assertEqual([r["name"] for r in runs], ["sweep_3", "sweep_2"])
+        
+        runs, cursor = self.client.list_runs("test_project", filters=["tags contains sweep", "config.learning_rate < 0.0045"],
+                                             sort_by="-config.learning_rate", limit=2, cursor=cursor, return_cursor=True)
+        self.assertEqual([r["name"] for r in runs], ["sweep_1", "sweep_0"])
+        self.assertIsNone(cursor)
+        
+        runs = self.client.list_runs("test_project", filters=["status=completed"])
+        self.assertEqual([r["name"] for r in runs], ["test_run"])
+    
     def test_get_metrics(self):
         metrics = self.client.get_metrics("test_project", "test_run")
         self.assertIn("accuracy", metrics)
     
+    def test_get_metrics_incremental(self):
+        metrics, cursor, has_more = self.client.get_metrics("test_project", "test_run", keys=["acc*"],
+                                                            return_cursor=True)
+        self.assertEqual(list(metrics), ["accuracy"])
+        self.assertFalse(has_more)
+        
+        self.experiment.log({"accuracy": 0.9, "loss": 0.4})
+        self.experiment.log({"accuracy": 0.95, "loss": 0.3})
+        
+        # Only points logged after the cursor are returned, one page at a time
+        metrics, cursor, has_more = self.client.get_metrics("test_project", "test_run", keys=["acc*"],
+                                                            since=cursor, limit=1, return_cursor=True)
+        self.assertEqual([p["value"] for p in metrics["accuracy"]], [0.9])
+        self.assertTrue(has_more)
+        
+        metrics = self.client.get_metrics("test_project", "test_run", keys=["acc*"], since=cursor)
+        self.assertEqual([p["value"] for p in metrics["accuracy"]], [0.95])
+    
+    def test_get_metrics_downsampled(self):
+        for i in range(500):
+            self.experiment.log({"loss": 1.0 / (i + 1)})
+        
+        for method in ("lttb", "minmax", "mean"):
+            metrics = self.client.get_metrics("test_project", "test_run", keys=["loss"],
+                                              max_points=50, downsample=method)
+            self.assertLessEqual(len(metrics["loss"]), 50)
+            
+            # The spike at the first step survives every method
+            first = metrics["loss"][0]
+            self.assertAlmostEqual(first.get("max", first["value"]), 1.0)
+    
+    def test_get_metrics_as_arrays(self):
+        for i in range(200):
+            self.experiment.log({"loss": 1.0 / (i + 1)})
+        
+        metrics = self.client.get_metrics("test_project", "test_run", as_arrays=True)
+        self.assertEqual(len(metrics["loss"]["value"]), 200)
+        self.assertAlmostEqual(float(metrics["loss"]["value"][-1]), 1.0 / 200)
+        self.assertAlmostEqual(float(metrics["accuracy"]["value"][0]), 0.85)
+        
+        # Large responses are compressed when the client accepts it
+        response = requests.get(f"http://127.0.0.1:{self.port}/api/projects/test_project/runs/test_run/metrics",
+                                headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        self.assertEqual(len(response.json()["loss"]), 200)
+    
+    def test_get_metrics_as_arrays_from_legacy_points(self):
+        run_dir = os.path.join(self.test_dir, "test_project", "legacy_run")
+        os.makedirs(run_dir)
+        with open(os.path.join(run_dir, "metrics.json"), "w") as f:
+            json.dump({"loss": [0.5, {"value": 0.4, "step": 1.0, "timestamp": 10.0}, {"value": "nan?", "step": "x"}]}, f)
+        
+        metrics = self.client.get_metrics("test_project", "legacy_run", as_arrays=True)
+        self.assertEqual(metrics["loss"]["step"].tolist(), [0, 1, 2])
+        self.assertEqual(metrics["loss"]["value"][:2].tolist(), [0.5, 0.4])
+        self.assertTrue(np.isnan(metrics["loss"]["value"][2]))
+    
+    def test_stream_metrics(self):
+        received = []
+        
+        def consume():
+            for event_id, metrics in self.client.stream_metrics("test_project", "test_run", keys=["loss"]):
+                received.append(metrics)
+                break
+        
+        consumer = threading.Thread(target=consume, daemon=True)
+        consumer.start()
+        
+        for _ in range(50):
+            if self.server.hub.has_subscribers("test_project", "test_run"):
+                break
+            time.sleep(0.1)
+        
+        response = requests.post(f"http://127.0.0.1:{self.port}/api/projects/test_project/runs/test_run/log",
+                                 json={"loss": 0.25, "accuracy": 0.9})
+        self.assertEqual(response.status_code, 202)
+        
+        consumer.join(timeout=5)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(received[0]), ["loss"])
+        self.assertEqual(received[0]["loss"][0]["value"], 0.25)
+        
+        # The writer persisted the points as well
+        self.server.writer.flush()
+        metrics = self.client.get_metrics("test_project", "test_run")
+        self.assertEqual(metrics["loss"][-1]["value"], 0.25)
+    
     def test_get_artifacts(self):
         artifacts = self.client.get_artifacts("test_project", "test_run")
         self.assertIn("test_artifact", artifacts)
 
+    def test_chunked_upload_and_ranged_download(self):
+        payload = os.urandom(300 * 1024)
+        source = os.path.join(self.test_dir, "checkpoint.bin")
+        with open(source, "wb") as f:
+            f.write(payload)
+        
+        result = self.client.upload_artifact("test_project", "test_run", source, name="checkpoint",
+                                             chunk_size=64 * 1024, max_workers=4)
+        self.assertIn("sha256", result)
+        self.assertIn("checkpoint", self.client.get_artifacts("test_project", "test_run"))
+        
+        response = requests.get(f"http://127.0.0.1:{self.port}/api/projects/test_project/runs/test_run/artifacts/checkpoint",
+                                headers={"Range": "bytes=10-19"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, payload[10:20])
+        
+        download_dir = os.path.join(self.test_dir, "downloads")
+        os.makedirs(download_dir)
+        path = self.client.download_artifact("test_project", "test_run", "checkpoint", destination=download_dir,
+                                             chunk_size=64 * 1024, max_workers=4)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), payload)
+    
+    def test_download_verifies_and_skips_current_copy(self):
+        download_dir = os.path.join(self.test_dir, "downloads")
+        os.makedirs(download_dir)
+        
+        # Artifacts logged without a checksum are hashed by the server
+        path = self.client.download_artifact("test_project", "test_run", "test_artifact", destination=download_dir)
+        with open(path) as f:
+            self.assertEqual(f.read(), "test content")
+        
+        # An identical local copy is kept, a corrupted one is replaced
+        mtime = os.stat(path).st_mtime_ns
+        time.sleep(0.01)
+        self.client.download_artifact("test_project", "test_run", "test_artifact", destination=download_dir)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        
+        with open(path, "w") as f:
+            f.write("TEST CONTENT")
+        self.client.download_artifact("test_project", "test_run", "test_artifact", destination=download_dir)
+        with open(path) as f:
+            self.assertEqual(f.read(), "test content")
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    def test_telemetry_endpoint(self):
+        self.client.get_metrics("test_project", "test_run", max_points=10)
+        
+        response = requests.get(f"http://127.0.0.1:{self.port}/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+        
+        text = response.text
+        self.assertIn('mltracker_http_requests_total{route="/api/projects/<project_name>/runs/<run_name>/metrics",'
+                      'method="GET",status="200"} 1', text)
+        self.assertIn('mltracker_http_request_duration_seconds_bucket{', text)
+        self.assertIn('mltracker_storage_read_seconds_count{file="metrics.json"} 1', text)
+        self.assertIn('mltracker_writer_queue_depth 0', text)
+        self.assertRegex(text, r'mltracker_stream_subscribers \d+')
+
+    def test_client_reuses_connections(self):
+        with MLTrackerClient(base_url=f"http://127.0.0.1:{self.port}", pool_size=2) as client:
+            for _ in range(20):
+                client.list_projects()
+                client.get_run("test_project", "test_run")
+            
+            pool = client.session.get_adapter(client.base_url).poolmanager.connection_from_url(client.base_url)
+            self.assertLessEqual(pool.num_connections, 2)
+    
+    def test_remote_experiment(self):
+        path = os.path.join(self.test_dir, "weights.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(4096))
+        
+        experiment = RemoteExperiment("remote_project", run_name="remote_run", config={"lr": 0.1},
+                                      base_url=f"http://127.0.0.1:{self.port}", max_batch_points=50)
+        for i in range(200):
+            experiment.log({"loss": 1.0 / (i + 1), "phase": "train"})
+        experiment.log({"val_loss": 0.5}, step=199)
+        upload = experiment.log_artifact("weights", path)
+        experiment.finish()
+        
+        self.assertEqual(len(upload.result()["sha256"]), 64)
+        self.server.writer.flush()
+        
+        run = self.client.get_run("remote_project", "remote_run")
+        self.assertEqual(run["config"], {"lr": 0.1})
+        self.assertEqual(run["info"]["status"], "completed")
+        
+        metrics = self.client.get_metrics("remote_project", "remote_run")
+        self.assertEqual([p["step"] for p in metrics["loss"]], list(range(200)))
+        self.assertEqual(metrics["phase"][0]["value"], "train")
+        self.assertEqual(metrics["val_loss"][0]["step"], 199)
+        self.assertIn("weights", self.client.get_artifacts("remote_project", "remote_run"))
+    
+    def test_spool_replay_is_idempotent(self):
+        spool_dir = os.path.join(self.test_dir, "spool")
+        
+        # Nothing listens on this port, so every batch stays in the spool
+        offline = RemoteExperiment("spool_project", run_name="spool_run", spool_dir=spool_dir,
+                                   base_url=f"http://127.0.0.1:{get_free_port()}", max_batch_points=10)
+        for i in range(25):
+            offline.log({"loss": float(i)})
+        offline.finish(timeout=1)
+        self.assertGreater(Spool(os.path.join(spool_dir, "spool_project", "spool_run")).pending_bytes(), 0)
+        
+        # Resuming the run drains the spool to the server
+        online = RemoteExperiment("spool_project", run_name="spool_run", spool_dir=spool_dir,
+                                  base_url=f"http://127.0.0.1:{self.port}")
+        self.assertEqual(online.run_id, offline.run_id)
+        online.finish()
+        
+        spool = Spool(os.path.join(spool_dir, "spool_project", "spool_run"))
+        self.assertEqual(spool.pending_bytes(), 0)
+        
+        # Resending an acknowledged batch is skipped by the server
+        response = self.client.log_metrics("spool_project", "spool_run", {"loss": [{"value": 0.0, "step": 0}]},
+                                           sequence=1, client_id=spool.writer_id)
+        self.assertTrue(response["duplicate"])
+        
+        metrics = self.client.get_metrics("spool_project", "spool_run")
+        self.assertEqual([p["value"] for p in metrics["loss"]], [float(i) for i in range(25)])
+
+    def test_sequence_without_metrics_write_is_not_a_duplicate(self):
+        response = self.client.log_metrics("seq_project", "seq_run", {"loss": [{"value": 0.0, "step": 0}]},
+                                           sequence=1, client_id="writer")
+        self.assertFalse(response["duplicate"])
+
+        # The process died after recording sequence 2, before the metrics file was replaced
+        sequences_path = os.path.join(self.test_dir, "seq_project", "seq_run", "sequences.json")
+        with open(sequences_path, 'w') as f:
+            json.dump({"clients": {"writer": 2}, "previous": {"writer": 1}, "points": 2}, f)
+
+        response = self.client.log_metrics("seq_project", "seq_run", {"loss": [{"value": 1.0, "step": 1}]},
+                                           sequence=2, client_id="writer")
+        self.assertFalse(response["duplicate"])
+        response = self.client.log_metrics("seq_project", "seq_run", {"loss": [{"value": 1.0, "step": 1}]},
+                                           sequence=2, client_id="writer")
+        self.assertTrue(response["duplicate"])
+
+        metrics = self.client.get_metrics("seq_project", "seq_run")
+        self.assertEqual([p["value"] for p in metrics["loss"]], [0.0, 1.0])
+
+    def test_sequence_gap_is_a_conflict(self):
+        batch = {"loss": [{"value": 0.0, "step": 0}]}
+        self.client.log_metrics("gap_project", "gap_run", batch, sequence=1, client_id="writer")
+
+        # Batch 2 has not arrived yet
+        with self.assertRaises(requests.HTTPError) as raised:
+            self.client.log_metrics("gap_project", "gap_run", batch, sequence=3, client_id="writer")
+        self.assertEqual(raised.exception.response.status_code, 409)
+        self.assertEqual(raised.exception.response.json()["last_sequence"], 1)
+
+        # The client gave up on batch 2
+        response = self.client.log_metrics("gap_project", "gap_run", batch, sequence=3, client_id="writer",
+                                           skipped_sequence=2)
+        self.assertFalse(response["duplicate"])
+        response = self.client.log_metrics("gap_project", "gap_run", batch, sequence=2, client_id="writer")
+        self.assertTrue(response["duplicate"])
+
+        metrics = self.client.get_metrics("gap_project", "gap_run")
+        self.assertEqual(len(metrics["loss"]), 2)
+
+    def test_blocking_spool_drains_when_server_returns(self):
+        port = get_free_port()
+        remote = RemoteExperiment("block_project", run_name="block_run",
+                                  spool_dir=os.path.join(self.test_dir, "block_spool"),
+                                  base_url=f"http://127.0.0.1:{port}", flush_interval=0.1,
+                                  max_batch_points=5, spool_max_bytes=400, spool_overflow="block")
+        for i in range(50):
+            remote.log({"loss": float(i)})
+        
+        # The server is down: the spool fills up and the rest waits in memory
+        self.assertFalse(remote.flush(timeout=1))
+        self.assertLessEqual(remote.spool.pending_bytes(), 400)
+        self.assertGreater(remote._buffered, 0)
+        
+        server = MLTrackerServer(storage_dir=self.test_dir, host="127.0.0.1", port=port)
+        # The watcher thread only runs between start() and stop()
+        self.assertIsNone(server.watcher._thread)
+        server.start()
+        try:
+            self.wait_for_server(f"http://127.0.0.1:{port}/api/projects", max_retries=5)
+            self.assertTrue(remote.flush(timeout=30))
+            remote.finish()
+        finally:
+            server.stop()
+        
+        metrics = self.client.get_metrics("block_project", "block_run")
+        self.assertEqual([p["value"] for p in metrics["loss"]], [float(i) for i in range(50)])
+    
+    def test_spool_overflow(self):
+        spool = Spool(os.path.join(self.test_dir, "overflow"), segment_bytes=200, max_bytes=600)
+        for i in range(50):
+            spool.append({"loss": [i]})
+        self.assertLessEqual(spool.pending_bytes(), 600)
+        self.assertGreater(spool.dropped, 0)
+        
+        # The newest records are kept and acknowledged records are not read again
+        records = spool.peek(100)
+        self.assertEqual(records[-1][0], 50)
+        self.assertEqual(records[-1][1], {"loss": [49]})
+        # Dropped records are skipped; the server doesn't wait for them
+        self.assertEqual(spool.skipped_seq, records[0][0] - 1)
+        spool.ack(records[0][2], skipped=True)
+        spool.ack(records[1][2])
+        spool.close()
+        
+        reopened = Spool(os.path.join(self.test_dir, "overflow"), segment_bytes=200, max_bytes=600)
+        self.assertEqual([r[0] for r in reopened.peek(100)], [r[0] for r in records[2:]])
+        self.assertEqual(reopened.skipped_seq, records[0][0])
+        self.assertEqual(reopened.append({"loss": [50]}), 51)
+        
+        newest = Spool(os.path.join(self.test_dir, "newest"), max_bytes=100, overflow="drop_newest")
+        self.assertEqual(newest.append({"loss": list(range(20))}), 1)
+        self.assertIsNone(newest.append({"loss": [1]}))
+    
+    def test_async_stream_metrics(self):
+        url = f"http://127.0.0.1:{self.port}/api/projects/test_project/runs/test_run/log"
+        
+        def post_when_subscribed(loss):
+            for _ in range(50):
+                if self.server.hub.has_subscribers("test_project", "test_run"):
+                    break
+                time.sleep(0.1)
+            requests.post(url, json={"loss": loss})
+        
+        async def follow():
+            async with AsyncMLTrackerClient(f"http://127.0.0.1:{self.port}") as client:
+                stream = client.stream_metrics("test_project", "test_run", keys=["loss"])
+                threading.Thread(target=post_when_subscribed, args=(0.25,), daemon=True).start()
+                _, metrics = await stream.__anext__()
+                await stream.aclose()
+                return metrics
+        
+        metrics = asyncio.run(follow())
+        self.assertEqual(metrics["loss"][0]["value"], 0.25)
+        
+        # The reader thread closes the stream itself once it wakes up
+        reader = next(t for t in threading.enumerate() if t.name == "mltracker-stream")
+        requests.post(url, json={"loss": 0.5})
+        reader.join(timeout=5)
+        self.assertFalse(reader.is_alive())
+    
+    def test_async_client_bulk_reads(self):
+        for i in range(6):
+            experiment = Experiment(project_name="test_project", run_name=f"bulk_{i}", storage_dir=self.test_dir)
+            experiment.log({"loss": float(i), "accuracy": 0.5})
+            experiment.finish()
+        
+        async def fetch():
+            async with AsyncMLTrackerClient(f"http://127.0.0.1:{self.port}", max_concurrency=3) as client:
+                runs = await client.list_runs("test_project")
+                selection = [("test_project", run["name"]) for run in runs] + [("test_project", "missing")]
+                results = {}
+                async for project_name, run_name, metrics in client.get_metrics_many(selection, keys=["loss"],
+                                                                                    return_exceptions=True):
+                    results[run_name] = metrics
+                
+                async for metrics, cursor in client.tail_metrics("test_project", "bulk_3", keys=["loss"]):
+                    results["tail"] = metrics
+                    break
+                return results
+        
+        results = asyncio.run(fetch())
+        self.assertEqual(results.pop("tail")["loss"][0]["value"], 3.0)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(list(results["bulk_3"]), ["loss"])
+        self.assertEqual(results["bulk_3"]["loss"][0]["value"], 3.0)
+        self.assertIsInstance(results["missing"], requests.HTTPError)
+    
+    def test_system_metrics_of_remote_run(self):
+        remote = RemoteExperiment("system_project", run_name="system_run", base_url=f"http://127.0.0.1:{self.port}")
+        monitor = SystemMonitor(remote, interval=0.5, device_probes=[])
+        monitor.start()
+        time.sleep(1.2)
+        remote.log({"loss": 0.5})
+        monitor.stop()
+        remote.finish()
+        
+        system, cursor = self.client.get_system_metrics("system_project", "system_run",
+                                                        keys=["memory_used_percent_*", "cpu_per_core_max"],
+                                                        return_cursor=True)
+        self.assertGreaterEqual(cursor, 2)
+        self.assertEqual(sorted(system), ["cpu_per_core_max", "memory_used_percent_max", "memory_used_percent_mean",
+                                          "memory_used_percent_min", "memory_used_percent_p95", "step", "timestamp"])
+        self.assertEqual(len(system["timestamp"]), cursor)
+        self.assertEqual(len(system["cpu_per_core_max"][0]), psutil.cpu_count())
+        
+        # Only rows written after the cursor are returned
+        self.assertEqual(self.client.get_system_metrics("system_project", "system_run", since=cursor)["timestamp"], [])
+        
+        with self.assertRaises(requests.HTTPError):
+            self.client.get_system_metrics("test_project", "test_run")
+    
+    def test_stream_resume_after_restart(self):
+        old_hub = MetricHub()
+        with old_hub.subscribe("p", "r") as subscription:
+            old_hub.publish("p", "r", {"loss": [{"value": 1.0, "step": 0, "timestamp": time.time()}]})
+            last_id = subscription.next(timeout=1)[-1][0]
+        
+        # A hub in a restarted process numbers its points above the ids of the old one
+        new_hub = MetricHub()
+        with new_hub.subscribe("p", "r", last_seq=last_id) as subscription:
+            new_hub.publish("p", "r", {"loss": [{"value": 2.0, "step": 1, "timestamp": time.time()}]})
+            events = subscription.next(timeout=1)
+        self.assertEqual(len(events), 1)
+        self.assertGreater(events[0][0], last_id)
+        
+        # An id from the future resumes from the newest points and reports the gap
+        with new_hub.subscribe("p", "r", last_seq=events[0][0] + 10 ** 12) as subscription:
+            new_hub.publish("p", "r", {"loss": [{"value": 3.0, "step": 2, "timestamp": time.time()}]})
+            events = subscription.next(timeout=1)
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0][2])
+        self.assertEqual(json.loads(events[0][1])["loss"][0]["value"], 3.0)
+    
+    def test_app_without_start(self):
+        # Served through WSGI, e.g. a test client, the watcher never runs
+        server = MLTrackerServer(storage_dir=self.test_dir)
+        client = server.app.test_client()
+        url = "/api/projects/test_project/runs/test_run/metrics"
+
+        response = client.get(url)
+        self.assertEqual(len(response.get_json()["accuracy"]), 1)
+        etag = response.headers["ETag"]
+
+        self.experiment.log({"accuracy": 0.9})
+        response = client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["accuracy"]), 2)
+
+        Experiment(project_name="test_project", run_name="new_run", storage_dir=self.test_dir)
+        time.sleep(server.run_index.refresh_interval)
+        names = [run["name"] for run in client.get("/api/projects/test_project/runs").get_json()]
+        self.assertIn("new_run", names)
+
+    def test_client_cache_revalidation(self):
+        cache_dir = os.path.join(self.test_dir, "cache")
+        client = MLTrackerClient(f"http://127.0.0.1:{self.port}", cache=ResponseCache(ttl=0, cache_dir=cache_dir))
+        
+        live = Experiment(project_name="test_project", run_name="live_run", storage_dir=self.test_dir)
+        self.assertEqual(client.warm_cache("test_project"), 2)
+        
+        # Stale entries are revalidated with their ETag
+        self.assertEqual(len(client.list_runs("test_project")), 2)
+        self.assertEqual(client.get_run("test_project", "live_run")["info"]["status"], "running")
+        live.finish()
+        self.assertEqual(client.get_run("test_project", "live_run")["info"]["status"], "completed")
+        
+        text = requests.get(f"http://127.0.0.1:{self.port}/metrics").text
+        self.assertIn('route="/api/projects/<project_name>/runs",method="GET",status="304"} 1', text)
+        
+        # Completed runs are served from the on-disk cache without asking the server
+        def run_requests():
+            text = requests.get(f"http://127.0.0.1:{self.port}/metrics").text
+            return sum(int(n) for n in re.findall(
+                r'mltracker_http_requests_total\{route="/api/projects/<project_name>/runs/<run_name>",'
+                r'method="GET",status="\d+"\} (\d+)', text))
+        
+        before = run_requests()
+        fresh = MLTrackerClient(f"http://127.0.0.1:{self.port}", cache=ResponseCache(ttl=0, cache_dir=cache_dir))
+        self.assertEqual(fresh.get_run("test_project", "test_run")["config"], {"learning_rate": 0.01})
+        self.assertIn("test_artifact", fresh.get_artifacts("test_project", "test_run"))
+        self.assertEqual(run_requests(), before)
+        
+        fresh.invalidate("test_project", "test_run")
+        fresh.get_run("test_project", "test_run")
+        self.assertEqual(run_requests(), before + 1)
+    
+    def test_response_cache_invalidation(self):
+        cache_dir = os.path.join(self.test_dir, "url_cache")
+        cache = ResponseCache(cache_dir=cache_dir)
+        with open(os.path.join(cache_dir, "unrelated.txt"), "w") as f:
+            f.write("kept")
+        base = "http://host:5000/api/projects"
+        for key in [f"{base}/p", f"{base}/p?limit=1", f"{base}/p/runs/r", f"{base}/q", f"{base}/../p"]:
+            cache.set(key, {"key": key})
+        
+        cache.invalidate(f"{base}/p", include_children=False)
+        reopened = ResponseCache(cache_dir=cache_dir)
+        self.assertIsNone(reopened.get(f"{base}/p"))
+        self.assertIsNone(reopened.get(f"{base}/p?limit=1"))
+        self.assertEqual(reopened.get(f"{base}/p/runs/r")["body"], {"key": f"{base}/p/runs/r"})
+        self.assertIsNotNone(reopened.get(f"{base}/../p"))
+        
+        cache.invalidate(f"{base}/p")
+        self.assertIsNone(ResponseCache(cache_dir=cache_dir).get(f"{base}/p/runs/r"))
+        self.assertIsNotNone(ResponseCache(cache_dir=cache_dir).get(f"{base}/q"))
+        
+        # Clearing the cache leaves files it doesn't own alone
+        cache.invalidate()
+        self.assertEqual(os.listdir(cache_dir), ["unrelated.txt"])
+        self.assertIsNone(ResponseCache(cache_dir=cache_dir).get(f"{base}/q"))
+        cache.set(f"{base}/q", {})
+        self.assertIsNotNone(ResponseCache(cache_dir=cache_dir).get(f"{base}/q"))
+    
+    def test_summaries(self):
+        for name, losses in (("a", [0.9, 0.3, 0.5]), ("b", [0.8, 0.6]), ("c", [0.7, 0.1, 0.2])):
+            experiment = Experiment(project_name="board", run_name=name, storage_dir=self.test_dir)
+            for loss in losses:
+                experiment.log({"val_loss": loss})
+            experiment.finish()
+        
+        # Leaderboard: best runs first, without reading any metrics file
+        runs = self.client.list_runs("board", sort_by="summary.val_loss.min", include_summary=True)
+        self.assertEqual([r["name"] for r in runs], ["c", "a", "b"])
+        self.assertEqual(runs[0]["summary"]["val_loss"]["min_step"], 1)
+        self.assertEqual([r["name"] for r in self.client.list_runs("board", filters="summary.val_loss < 0.55")],
+                         ["a", "c"])
+        
+        # Points logged through the server update the summary as well
+        self.client.log_metrics("board", "b", {"val_loss": 0.05})
+        self.server.writer.flush()
+        summary = self.client.get_summary("board", "b")
+        self.assertEqual(summary["val_loss"]["count"], 3)
+        self.assertEqual(summary["val_loss"]["min"], 0.05)
+        self.assertEqual(summary["val_loss"]["min_step"], 2)
+    
+    def test_compare_runs(self):
+        for seed in range(5):
+            experiment = Experiment(project_name="sweep", run_name=f"seed_{seed}", config={"sweep": "a"},
+                                    storage_dir=self.test_dir)
+            for step in range(10 + seed):
+                experiment.log({"loss": seed + step, "note": "text"}, step=step)
+            experiment.finish()
+        Experiment(project_name="sweep", run_name="other", config={"sweep": "b"}, storage_dir=self.test_dir).finish()
+        
+        result = self.client.compare_runs("sweep", keys=["loss"], filters="config.sweep=a", percentiles=[50])
+        self.assertEqual(len(result["runs"]), 5)
+        loss = result["metrics"]["loss"]
+        self.assertEqual(loss["runs"], 5)
+        self.assertEqual(loss["x"], list(range(14)))
+        self.assertEqual(loss["count"][:10], [5] * 10)
+        self.assertEqual(loss["count"][-1], 1)
+        self.assertEqual(loss["mean"][0], 2.0)
+        self.assertEqual(loss["p50"][3], 5.0)
+        self.assertEqual(loss["min"][3], 3.0)
+        self.assertEqual(loss["max"][3], 7.0)
+        
+        # A single key or run may be passed as a string
+        result = self.client.compare_runs("sweep", keys="loss", runs="seed_4")
+        self.assertEqual(result["runs"], ["seed_4"])
+        self.assertEqual(result["metrics"]["loss"]["x"], list(range(14)))
+        
+        # Results are cached by selection, and the selection hash is the ETag
+        url = f"http://127.0.0.1:{self.port}/api/projects/sweep/compare"
+        params = {"runs": "seed_0,seed_1", "points": 5, "align": "time"}
+        response = requests.get(url, params=params)
+        self.assertEqual(len(response.json()["metrics"]["loss"]["x"]), 5)
+        self.assertEqual(response.headers["ETag"], f'"{response.json()["selection"]}"')
+        cached = requests.get(url, params=params, headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.server.comparer.cache_stats()[0], 1)
+        
+        self.assertEqual(requests.get(url, params={"runs": "missing"}).status_code, 404)
+        self.assertEqual(requests.get(url, params={"align": "epoch"}).status_code, 400)
+    
+    def test_external_writes_are_watched(self):
+        base = f"http://127.0.0.1:{self.port}/api/projects/test_project/runs/test_run"
+        
+        def wait_for_generation(project_name, run_name, generation):
+            for _ in range(100):
+                if self.server.watcher.generation(project_name, run_name) > generation:
+                    return
+                time.sleep(0.01)
+            self.fail("change was not noticed")
+        
+        first = requests.get(f"{base}/metrics")
+        etag = first.headers["ETag"]
+        self.assertEqual(requests.get(f"{base}/metrics", headers={"If-None-Match": etag}).status_code, 304)
+        
+        # A run created by another writer shows up in the run list
+        generation = self.server.watcher.generation("test_project")
+        other = Experiment(project_name="test_project", run_name="other_run", storage_dir=self.test_dir)
+        wait_for_generation("test_project", None, generation)
+        self.assertEqual(len(self.client.list_runs("test_project")), 2)
+        
+        # Points appended by another writer reach live streams and invalidate the ETag
+        received = []
+        
+        def consume():
+            for event_id, metrics in self.client.stream_metrics("test_project", "other_run"):
+                received.append(metrics)
+                break
+        
+        consumer = threading.Thread(target=consume, daemon=True)
+        consumer.start()
+        for _ in range(50):
+            if self.server.hub.has_subscribers("test_project", "other_run"):
+                break
+            time.sleep(0.1)
+        
+        generation = self.server.watcher.generation("test_project", "other_run")
+        other.log({"loss": 0.5})
+        wait_for_generation("test_project", "other_run", generation)
+        consumer.join(timeout=5)
+        self.assertEqual(received[0]["loss"][-1]["value"], 0.5)
+        
+        generation = self.server.watcher.generation("test_project", "test_run")
+        self.experiment.log({"accuracy": 0.9})
+        wait_for_generation("test_project", "test_run", generation)
+        response = requests.get(f"{base}/metrics", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["accuracy"]), 2)
+        other.finish()
+    
+    def test_ingestion_throttled(self):
+        self.server.admission = AdmissionController(client_rate=2, client_burst=2)
+        url = f"http://127.0.0.1:{self.port}/api/projects/test_project/runs/test_run/log"
+        headers = {"X-Client-Id": "burst"}
+        
+        statuses = [requests.post(url, json={"loss": i}, headers=headers).status_code for i in range(5)]
+        self.assertEqual(statuses[:2], [202, 202])
+        self.assertIn(429, statuses)
+        
+        response = requests.post(url, json={"loss": 0}, headers=headers)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+        
+        # Reads are not rate limited and other clients keep their own budget
+        self.assertEqual(len(self.client.list_projects()), 1)
+        self.assertEqual(requests.post(url, json={"loss": 0}, headers={"X-Client-Id": "other"}).status_code, 202)
+        
+        # The client backs off and retries throttled requests
+        client = MLTrackerClient(base_url=f"http://127.0.0.1:{self.port}", client_id="burst")
+        path = os.path.join(self.test_dir, "throttled.bin")
+        with open(path, "wb") as f:
+            f.write(b"x" * 1000)
+        record = client.upload_artifact("test_project", "test_run", path, name="throttled", chunk_size=250, max_workers=1)
+        self.assertEqual(len(record["sha256"]), 64)
+        
+        text = requests.get(f"http://127.0.0.1:{self.port}/metrics").text
+        self.assertRegex(text, r'mltracker_http_throttled_total\{reason="rate_limit"\} \d+')
+
 if __name__ == "__main__":
     unittest.main()
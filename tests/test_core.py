@@ -1,11 +1,20 @@
 # tests/test_core.py
 import unittest
+import json
 import os
 import shutil
 import tempfile
 from tests.conftest import get_free_port
 from pypmltracker.core.experiment import Experiment
 from pypmltracker.core.system_monitor import SystemMonitor
+from pypmltracker.core.process_tree import ProcessTree
+from pypmltracker.core.devices import AmdgpuProbe, DeviceProbe, detect_devices
+from pypmltracker.storage.local import LocalStorage
+from pypmltracker.utils.system_stream import SampleRing, SystemMetricsWriter, load_system_metrics
+import numpy as np
+import psutil
+import subprocess
+import sys
 import time
 
 class TestExperiment(unittest.TestCase):
@@ -42,6 +51,37 @@ class TestExperiment(unittest.TestCase):
         metrics_path = os.path.join(self.test_dir, "test_project", "test_run", "metrics.json")
         self.assertTrue(os.path.exists(metrics_path))
     
+    def test_summary(self):
+        for step, loss in enumerate([0.5, 0.2, 0.4]):
+            self.experiment.log({"loss": loss, "phase": "train"})
+        
+        summary = self.experiment.summary["loss"]
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["last"], 0.4)
+        self.assertEqual((summary["min"], summary["min_step"]), (0.2, 1))
+        self.assertEqual((summary["max"], summary["max_step"]), (0.5, 0))
+        self.assertAlmostEqual(summary["mean"], 1.1 / 3)
+        self.assertAlmostEqual(summary["variance"], ((0.5 - 1.1 / 3) ** 2 + (0.2 - 1.1 / 3) ** 2 + (0.4 - 1.1 / 3) ** 2) / 3)
+        self.assertEqual(self.experiment.summary["phase"], {"count": 3, "last": "train", "last_step": 2,
+                                                            "last_timestamp": summary["last_timestamp"]})
+        
+        # The summary is persisted next to the run info, and written in full when the run finishes
+        summary_path = os.path.join(self.test_dir, "test_project", "test_run", "summary.json")
+        self.assertTrue(os.path.exists(summary_path))
+        self.experiment.finish()
+        with open(summary_path) as f:
+            self.assertEqual(json.load(f)["loss"]["count"], 3)
+    
+    def test_metrics_snapshot(self):
+        self.experiment.log({"loss": 0.5, "val_loss": 0.6, "accuracy": 0.1})
+        snapshot = self.experiment.metrics_snapshot(["*loss"])
+        self.assertEqual(sorted(snapshot), ["loss", "val_loss"])
+        
+        # Later points don't show up in a snapshot taken before them
+        self.experiment.log({"loss": 0.4})
+        self.assertEqual(len(snapshot["loss"]), 1)
+        self.assertEqual(len(self.experiment.metrics_snapshot()["loss"]), 2)
+    
     def test_log_artifact(self):
         # Create a test file
         test_file = os.path.join(self.test_dir, "test_artifact.txt")
@@ -58,6 +98,15 @@ class TestExperiment(unittest.TestCase):
         artifact_path = os.path.join(self.test_dir, "test_project", "test_run", "artifacts", "test_artifact.txt")
         self.assertTrue(os.path.exists(artifact_path))
 
+class StaticProbe(DeviceProbe):
+    name = 'static'
+    
+    def detect(self):
+        return 2
+    
+    def sample(self):
+        return [50.0, 75.0], [10.0, 20.0]
+
 class TestSystemMonitor(unittest.TestCase):
     def setUp(self):
         self.test_dir = tempfile.mkdtemp()
@@ -73,6 +122,15 @@ class TestSystemMonitor(unittest.TestCase):
         self.experiment.finish()
         shutil.rmtree(self.test_dir)
     
+    def test_monitor_needs_system_writer(self):
+        class Logger:
+            def log(self, metrics, step=None):
+                pass
+        
+        with self.assertRaisesRegex(TypeError, "system_writer"):
+            SystemMonitor(Logger()).start()
+        self.assertEqual(self.experiment.step, 0)
+    
     def test_monitor_start_stop(self):
         self.monitor.start()
         self.assertTrue(self.monitor.running)
@@ -84,9 +142,122 @@ class TestSystemMonitor(unittest.TestCase):
         self.monitor.stop()
         self.assertFalse(self.monitor.running)
         
-        # Check if metrics were logged
+        # Samples go to the system stream, not to the run's metrics or step counter
         metrics_path = os.path.join(self.test_dir, "test_project", "test_run", "metrics.json")
-        self.assertTrue(os.path.exists(metrics_path))
+        self.assertFalse(os.path.exists(metrics_path))
+        self.assertEqual(self.experiment._step, 0)
+        
+        system = LocalStorage(self.test_dir).load_system_metrics("test_project", "test_run")
+        n = len(system['timestamp'])
+        self.assertGreaterEqual(n, 1)
+        self.assertEqual(system['cpu_per_core_max'].shape, (n, psutil.cpu_count()))
+        self.assertTrue((system['step'] == 0).all())
+        
+        # Several high-frequency samples are aggregated into each window
+        self.assertGreater(system['samples'].sum(), n)
+        self.assertTrue((system['memory_used_percent_min'] <= system['memory_used_percent_max']).all())
+        
+        # The current process is accounted for separately from the host
+        self.assertTrue((system['proc_count'] >= 1).all())
+        self.assertTrue((system['proc_rss_gb_max'] > 0).all())
+        self.assertTrue((system['proc_num_threads'] >= 1).all())
+    
+    def test_process_tree(self):
+        tree = ProcessTree()
+        before = tree.sample()
+        
+        child = subprocess.Popen([sys.executable, "-c", "sum(range(10 ** 7)); import time; time.sleep(30)"])
+        try:
+            time.sleep(0.5)
+            tree.refresh()
+            during = tree.sample()
+            self.assertEqual(during['count'], before['count'] + 1)
+            self.assertGreater(during['rss_gb'], before['rss_gb'])
+            self.assertGreater(tree.rss_gb(), 0)
+        finally:
+            child.kill()
+            child.wait()
+        
+        # The exited child's CPU time stays in the totals
+        after = tree.sample()
+        self.assertEqual(after['count'], before['count'])
+        self.assertGreaterEqual(after['cpu_time'], during['cpu_time'])
+    
+    def test_stop_does_not_wait_for_interval(self):
+        monitor = SystemMonitor(self.experiment, interval=30.0)
+        monitor.start()
+        time.sleep(0.3)
+        start = time.monotonic()
+        monitor.stop()
+        self.assertLess(time.monotonic() - start, 1.0)
+        
+        # The partial window is recorded on stop
+        system = load_system_metrics(self.experiment.run_dir)
+        self.assertEqual(len(system['timestamp']), 1)
+        self.assertGreaterEqual(system['samples'][0], 1)
+    
+    def test_device_probes(self):
+        # Detection runs once per process
+        self.assertIs(detect_devices(), detect_devices())
+        
+        monitor = SystemMonitor(self.experiment, interval=0.2, device_probes=[StaticProbe()])
+        monitor.start()
+        time.sleep(0.5)
+        monitor.stop()
+        system = load_system_metrics(self.experiment.run_dir)
+        self.assertEqual(system['gpu_utilization'][0].tolist(), [50.0, 75.0])
+        self.assertEqual(system['gpu_memory_used_percent'][0].tolist(), [10.0, 20.0])
+    
+    def test_amdgpu_probe(self):
+        drm_dir = os.path.join(self.test_dir, "drm")
+        device = os.path.join(drm_dir, "card0", "device")
+        os.makedirs(device)
+        os.makedirs(os.path.join(drm_dir, "card0-DP-1"))
+        for filename, value in [("gpu_busy_percent", 42), ("mem_info_vram_used", 256), ("mem_info_vram_total", 1024)]:
+            with open(os.path.join(device, filename), "w") as f:
+                f.write(f"{value}\n")
+        
+        probe = AmdgpuProbe(drm_dir)
+        self.assertEqual(probe.detect(), 1)
+        self.assertEqual(probe.sample(), ([42.0], [25.0]))
+        self.assertEqual(AmdgpuProbe(os.path.join(self.test_dir, "missing")).detect(), 0)
+    
+    def test_sample_ring(self):
+        ring = SampleRing([('memory', ()), ('cores', (2,))], capacity=4)
+        for i in range(6):
+            ring.append({'memory': float(i), 'cores': [i, 10 * i]})
+        self.assertEqual(ring.count, 4)
+        self.assertEqual(ring.latest('memory')[0], 5.0)
+        
+        # The two oldest samples were overwritten
+        stats = ring.aggregate()
+        self.assertEqual(stats['memory_min'], 2.0)
+        self.assertEqual(stats['memory_max'], 5.0)
+        self.assertEqual(stats['memory_mean'], 3.5)
+        self.assertAlmostEqual(float(stats['memory_p95']), np.percentile([2, 3, 4, 5], 95))
+        self.assertEqual(stats['cores_max'].tolist(), [5.0, 50.0])
+        self.assertEqual(ring.count, 0)
+    
+    def test_system_stream_reopen(self):
+        run_dir = self.experiment.run_dir
+        writer = SystemMetricsWriter(run_dir, n_cores=4)
+        writer.write({'timestamp': 1.0, 'cpu_per_core_max': [1, 2, 3, 4]})
+        writer.close()
+        
+        # Same schema: appended to
+        writer = SystemMetricsWriter(run_dir, n_cores=4)
+        writer.write({'timestamp': 2.0, 'cpu_per_core_max': [5, 6, 7, 8]})
+        writer.close()
+        system = load_system_metrics(run_dir)
+        self.assertEqual(system['timestamp'].tolist(), [1.0, 2.0])
+        self.assertEqual(system['cpu_per_core_max'][1].tolist(), [5, 6, 7, 8])
+        self.assertTrue(np.isnan(system['memory_used_percent_mean']).all())
+        
+        # Different schema: the old stream is kept aside
+        writer = SystemMetricsWriter(run_dir, n_cores=2)
+        writer.close()
+        self.assertEqual(len(load_system_metrics(run_dir)['timestamp']), 0)
+        self.assertTrue((run_dir / "system-1.bin").exists())
 
 if __name__ == "__main__":
     unittest.main()
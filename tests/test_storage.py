@@ -40,6 +40,28 @@ class TestLocalStorage(unittest.TestCase):
         # Check if metrics were saved
         self.assertTrue(os.path.exists(metrics_path))
     
+    def test_load_summary(self):
+        metrics = {"loss": [{"value": v, "step": i, "timestamp": 1672531200 + i} for i, v in enumerate([3.0, 1.0, 2.0])]}
+        self.storage.save_metrics("test_project", "test_run", metrics)
+        summary_path = os.path.join(self.test_dir, "test_project", "test_run", "summary.json")
+        self.assertTrue(os.path.exists(summary_path))
+        
+        summary = self.storage.load_summary("test_project", "test_run")
+        self.assertEqual(summary["loss"]["min"], 1.0)
+        self.assertEqual(summary["loss"]["min_step"], 1)
+        self.assertEqual(summary["loss"]["last"], 2.0)
+        self.assertEqual(summary["loss"]["mean"], 2.0)
+        
+        # A run from before summaries existed: computed in memory without writing, until migrated
+        os.remove(summary_path)
+        self.assertEqual(self.storage.load_summary("test_project", "test_run"), summary)
+        self.assertFalse(os.path.exists(summary_path))
+        self.assertEqual(self.storage.migrate_summaries(), 1)
+        self.assertTrue(os.path.exists(summary_path))
+        self.assertEqual(self.storage.migrate_summaries("test_project"), 0)
+        
+        self.assertIsNone(self.storage.load_summary("test_project", "missing_run"))
+    
     def test_list_projects_and_runs(self):
         # Create some test projects and runs
         os.makedirs(os.path.join(self.test_dir, "project1", "run1"))
@@ -6,7 +6,9 @@ import tempfile
 import numpy as np
 from tests.conftest import get_free_port
 from pypmltracker.core.experiment import Experiment
-from pypmltracker.visualization.plots import Plotter
+from concurrent.futures import ThreadPoolExecutor
+from pypmltracker.visualization.plots import Plotter, get_render_pool, process_render_pool
+from pypmltracker.visualization.render_cache import RenderCache
 
 class TestPlotter(unittest.TestCase):
     def setUp(self):
@@ -16,12 +18,25 @@ class TestPlotter(unittest.TestCase):
             run_name="test_run",
             storage_dir=self.test_dir
         )
-        self.plotter = Plotter(self.experiment)
+        self.cache = RenderCache(os.path.join(self.test_dir, "render_cache"))
+        self.plotter = Plotter(self.experiment, cache=self.cache)
     
     def tearDown(self):
         self.experiment.finish()
         shutil.rmtree(self.test_dir)
     
+    def test_render_pools(self):
+        # Plots render in-process unless a process pool is passed explicitly
+        self.assertIsInstance(get_render_pool(), ThreadPoolExecutor)
+        
+        pool = process_render_pool(max_workers=1)
+        try:
+            plotter = Plotter(self.experiment, executor=pool, cache=False)
+            path = plotter.line_plot({"loss": [0.5, 0.4, 0.3]}, name="process_plot").result(timeout=60)
+            self.assertTrue(os.path.exists(path))
+        finally:
+            pool.shutdown()
+    
     def test_line_plot(self):
         # Create some test data
         data = {
@@ -30,19 +45,46 @@ class TestPlotter(unittest.TestCase):
         }
         
         # Create a line plot
-        artifact_path = self.plotter.line_plot(
+        future = self.plotter.line_plot(
             data,
             title="Test Plot",
             xlabel="Epoch",
             ylabel="Value",
             name="test_plot"
         )
+        artifact_path = future.result(timeout=60)
         
         # Check if plot was saved
         self.assertTrue(os.path.exists(artifact_path))
         
         # Check if artifact was logged
         self.assertIn("plot_test_plot", self.experiment.artifacts)
+        with open(artifact_path, "rb") as f:
+            self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+    
+    def test_line_plot_with_x_values(self):
+        data = {"accuracy": [0.7, 0.8, 0.85], "loss": [0.5, 0.4, 0.3]}
+        future = self.plotter.line_plot(data, x=np.array([10, 20, 30]), name="x_values")
+        self.assertTrue(os.path.exists(future.result(timeout=60)))
+    
+    def test_concurrent_plots(self):
+        # Plotting from several threads at once is safe and never blocks the callers
+        import threading
+        futures = []
+        
+        def plot(i):
+            futures.append(self.plotter.line_plot({"loss": np.random.rand(100)}, name=f"thread_{i}"))
+        
+        threads = [threading.Thread(target=plot, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertTrue(self.plotter.wait(timeout=60))
+        for future in futures:
+            self.assertTrue(os.path.exists(future.result()))
+        self.assertEqual(len(self.experiment.artifacts), 4)
     
     def test_confusion_matrix(self):
         # Create a test confusion matrix
@@ -53,7 +95,7 @@ class TestPlotter(unittest.TestCase):
             cm,
             classes=["Class 0", "Class 1"],
             name="test_cm"
-        )
+        ).result(timeout=60)
         
         # Check if plot was saved
         self.assertTrue(os.path.exists(artifact_path))
@@ -61,5 +103,94 @@ class TestPlotter(unittest.TestCase):
         # Check if artifact was logged
         self.assertIn("plot_test_cm", self.experiment.artifacts)
 
+    def test_plot_metrics(self):
+        from pypmltracker.visualization.plots import prepare_series
+        
+        other = Experiment(project_name="test_project", run_name="other_run", storage_dir=self.test_dir)
+        for step in range(300):
+            self.experiment.log({"loss": 1.0 / (step + 1), "phase": "train"})
+            if step % 2 == 0:
+                other.log({"loss": 2.0 / (step + 1)}, step=step)
+        other.finish()
+        
+        artifact_path = self.plotter.plot_metrics(["loss", "phase"], runs=["test_run", "other_run"],
+                                                  smoothing=0.9, max_points=100, name="losses").result(timeout=60)
+        self.assertTrue(os.path.exists(artifact_path))
+        self.assertEqual(self.experiment.artifacts["plot_losses"]["metadata"]["runs"], ["test_run", "other_run"])
+        
+        columns = {
+            "step": np.arange(3000),
+            "value": np.where(np.arange(3000) % 10 == 0, np.nan, np.arange(3000.0)),
+            "timestamp": 100.0 + np.arange(3000),
+        }
+        x, y, raw = prepare_series(columns, x="time", smoothing=4, smoothing_method="rolling", max_points=500)
+        self.assertEqual(len(x), 500)
+        self.assertEqual(x[0], 0.0)
+        self.assertEqual(len(raw), 500)
+        self.assertEqual(y[0], 1.0)
+    
+    def test_render_cache(self):
+        cm = np.array([[10, 2], [3, 15]])
+        first = self.plotter.confusion_matrix(cm, name="epoch_cm", save_matrix=False).result(timeout=60)
+        self.assertEqual(self.cache.misses, 1)
+        
+        # Same inputs under the same name: the artifact is kept without rendering again
+        again = self.plotter.confusion_matrix(cm.copy(), name="epoch_cm", save_matrix=False)
+        self.assertTrue(again.done())
+        self.assertEqual(again.result(), first)
+        
+        # Same inputs in another run: served from the cache
+        other = Experiment(project_name="test_project", run_name="other_run", storage_dir=self.test_dir)
+        path = Plotter(other, cache=self.cache).confusion_matrix(cm, name="epoch_cm", save_matrix=False).result()
+        other.finish()
+        self.assertEqual(self.cache.hits, 1)
+        with open(first, "rb") as a, open(path, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        
+        # Different inputs are rendered
+        self.plotter.confusion_matrix(cm + 1, name="epoch_cm", save_matrix=False).result(timeout=60)
+        self.assertEqual(self.cache.misses, 2)
+        
+        # The cache stays within its size limit, evicting the least recently used images
+        small = RenderCache(os.path.join(self.test_dir, "small_cache"), max_bytes=3000)
+        small.put("a" * 40, b"x" * 1000)
+        small.put("b" * 40, b"x" * 1000)
+        small.get("a" * 40)
+        small.put("c" * 40, b"x" * 1500)
+        self.assertIn("a" * 40, small)
+        self.assertNotIn("b" * 40, small)
+        self.assertLessEqual(small.size(), 3000)
+    
+    def test_large_confusion_matrix(self):
+        import time
+        from pypmltracker.visualization.plots import top_confused_pairs
+        
+        rng = np.random.default_rng(0)
+        n = 2000
+        cm = rng.integers(0, 5, size=(n, n))
+        np.fill_diagonal(cm, 100)
+        cm[7, 3] = 60
+        cm[11, 5] = 50
+        
+        start = time.time()
+        artifact_path = self.plotter.confusion_matrix(cm, normalize=True, name="large_cm").result(timeout=60)
+        self.assertLess(time.time() - start, 30)
+        self.assertTrue(os.path.exists(artifact_path))
+        
+        metadata = self.experiment.artifacts["plot_large_cm"]["metadata"]
+        self.assertEqual(metadata["block_size"], 2)
+        self.assertEqual([(p["true"], p["predicted"]) for p in metadata["top_confused"][:2]], [(7, 3), (11, 5)])
+        
+        # The counts are kept for re-rendering, pooled like the plot
+        self.assertTrue(self.plotter.wait(timeout=60))
+        with np.load(self.experiment.artifacts["plot_large_cm_matrix"]["path"]) as archive:
+            self.assertEqual(int(archive["block_size"]), 2)
+            np.testing.assert_array_equal(archive["matrix"], cm.reshape(1000, 2, 1000, 2).sum(axis=(1, 3)))
+        
+        pairs = top_confused_pairs(np.array([[5, 1, 0], [4, 5, 2], [0, 0, 5]]), k=5, classes=["a", "b", "c"])
+        self.assertEqual([(p["true"], p["predicted"], p["count"]) for p in pairs],
+                         [("b", "a", 4), ("b", "c", 2), ("a", "b", 1)])
+        self.assertAlmostEqual(pairs[0]["rate"], 4 / 11)
+
 if __name__ == "__main__":
     unittest.main()
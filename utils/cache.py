@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe in-memory cache with least-recently-used eviction."""
+
+    def __init__(self, max_entries=256):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept in memory
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key (must be hashable)
+            default: Value returned on a miss
+
+        Returns:
+            The cached value, or `default`
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if needed.
+
+        Args:
+            key: Cache key (must be hashable)
+            value: Value to store
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate=None):
+        """
+        Remove entries from the cache.
+
+        Args:
+            predicate (callable, optional): Called with each key; matching entries
+                are removed. If None, the whole cache is cleared.
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,41 @@
+import hashlib
+import os
+
+# Block size used when hashing files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """
+    Compute the SHA-256 checksum of a file.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def matches_checksum(path, sha256, size=None):
+    """
+    Check whether a local file has the given checksum.
+
+    Args:
+        path (str): Path to the file
+        sha256 (str): Expected SHA-256 hex digest
+        size (int, optional): Expected size, checked first to avoid hashing files that differ
+
+    Returns:
+        bool: True if the file exists and matches
+    """
+    if not sha256 or not os.path.isfile(path):
+        return False
+    if size is not None and os.path.getsize(path) != size:
+        return False
+    return file_sha256(path) == sha256.lower()
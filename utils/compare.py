@@ -0,0 +1,276 @@
+import hashlib
+import json
+import math
+import threading
+import warnings
+import numpy as np
+from .cache import LRUCache
+from .metrics_query import parse_keys, select_keys
+
+ALIGNMENTS = ('step', 'time')
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+
+def parse_compare_args(args):
+    """
+    Parse run comparison parameters from a request's query string.
+
+    Supported parameters are `runs` (comma separated or repeated run names),
+    `filter` (run filter expressions, used when `runs` is not given), `keys`,
+    `align` ('step' or 'time', seconds since each run's first point),
+    `percentiles` (comma separated, 0-100) and `points` (grid size).
+
+    Args:
+        args: Query arguments (a werkzeug MultiDict)
+
+    Returns:
+        dict: 'runs', 'filters', 'keys', 'align', 'percentiles' and 'points'
+
+    Raises:
+        ValueError: If a parameter has an invalid value
+    """
+    runs = []
+    for value in args.getlist('runs'):
+        runs.extend(r.strip() for r in value.split(',') if r.strip())
+
+    align = args.get('align') or 'step'
+    if align not in ALIGNMENTS:
+        raise ValueError(f"Unknown alignment '{align}', expected one of {', '.join(ALIGNMENTS)}")
+
+    percentiles = DEFAULT_PERCENTILES
+    if args.get('percentiles'):
+        try:
+            percentiles = tuple(float(p) for p in args.get('percentiles').split(',') if p.strip())
+        except ValueError:
+            raise ValueError(f"Invalid value for 'percentiles': {args.get('percentiles')}")
+        if not all(0.0 <= p <= 100.0 for p in percentiles):
+            raise ValueError("'percentiles' must be between 0 and 100")
+
+    points = args.get('points') or 200
+    try:
+        points = int(points)
+    except ValueError:
+        raise ValueError(f"Invalid value for 'points': {points}")
+    if points < 2:
+        raise ValueError("'points' must be at least 2")
+
+    return {
+        'runs': runs or None,
+        'filters': args.getlist('filter'),
+        'keys': parse_keys(args),
+        'align': align,
+        'percentiles': percentiles,
+        'points': points,
+    }
+
+
+def series_arrays(points, align='step'):
+    """
+    Convert logged points into sorted x and y arrays.
+
+    Non-numeric points are skipped. When several points share an x value, the
+    last one logged wins.
+
+    Args:
+        points (list): Logged points with 'value', 'step' and 'timestamp' fields
+        align (str): 'step' or 'time' (seconds since the first point)
+
+    Returns:
+        tuple: (x, y) float64 arrays
+    """
+    xs, ys = [], []
+    field = 'step' if align == 'step' else 'timestamp'
+    for i, point in enumerate(points):
+        try:
+            y = float(point['value'])
+            x = float(point.get(field, i if align == 'step' else math.nan))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        if math.isfinite(x):
+            xs.append(x)
+            ys.append(y)
+
+    x = np.array(xs, dtype=np.float64)
+    y = np.array(ys, dtype=np.float64)
+    if not len(x):
+        return x, y
+    if align == 'time':
+        x -= x.min()
+
+    # Keep the last point of each x value
+    order = np.argsort(x, kind='stable')[::-1]
+    x, first = np.unique(x[order], return_index=True)
+    return x, y[order][first]
+
+
+def aggregate_series(series, points=200, percentiles=DEFAULT_PERCENTILES):
+    """
+    Align series on a common grid and compute bands across them.
+
+    Each series is linearly interpolated onto the grid within its own x range and
+    left out of the statistics outside it.
+
+    Args:
+        series (list): (x, y) array pairs, one per run
+        points (int): Maximum number of grid points
+        percentiles (tuple): Percentiles to compute, 0-100
+
+    Returns:
+        dict: 'x', 'count', 'mean', 'std', 'min', 'max' and one 'p<N>' entry per percentile
+    """
+    series = [(x, y) for x, y in series if len(x)]
+    if not series:
+        return {'x': [], 'count': []}
+
+    all_x = np.unique(np.concatenate([x for x, _ in series]))
+    if len(all_x) <= points:
+        grid = all_x
+    else:
+        grid = np.linspace(all_x[0], all_x[-1], points)
+
+    matrix = np.full((len(series), len(grid)), np.nan)
+    for row, (x, y) in enumerate(series):
+        lo = np.searchsorted(grid, x[0], side='left')
+        hi = np.searchsorted(grid, x[-1], side='right')
+        if hi > lo:
+            matrix[row, lo:hi] = np.interp(grid[lo:hi], x, y)
+
+    count = np.sum(~np.isnan(matrix), axis=0)
+    with warnings.catch_warnings():
+        # Grid points that no series covers are NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        result = {
+            'x': grid,
+            'count': count,
+            'mean': np.nanmean(matrix, axis=0),
+            'std': np.nanstd(matrix, axis=0),
+            'min': np.nanmin(matrix, axis=0),
+            'max': np.nanmax(matrix, axis=0),
+        }
+        if percentiles:
+            bands = np.nanpercentile(matrix, percentiles, axis=0)
+            for p, band in zip(percentiles, bands):
+                result[f"p{p:g}"] = band
+
+    return {name: _to_list(values) for name, values in result.items()}
+
+
+def _to_list(values):
+    """Convert an array to a JSON-friendly list with NaN as None."""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values.tolist()
+    return [None if math.isnan(v) else v for v in values.tolist()]
+
+
+class RunComparer:
+    """
+    Computes aggregated curves across many runs.
+
+    Per-run series are converted to arrays once and reused until the run's
+    version changes; complete results are cached by a hash of the selection,
+    the runs' versions and the parameters.
+    """
+
+    def __init__(self, load_metrics, version, max_results=128, max_series=8192):
+        """
+        Initialize comparer.
+
+        Args:
+            load_metrics (callable): load_metrics(project, run) returning the run's metrics dict
+            version (callable): version(project, run) returning a value that changes
+                whenever the run's metrics change
+            max_results (int): Maximum number of cached comparison results
+            max_series (int): Maximum number of cached per-run series
+        """
+        self.load_metrics = load_metrics
+        self.version = version
+        self._results = LRUCache(max_entries=max_results)
+        self._series = LRUCache(max_entries=max_series)
+        self._lock = threading.Lock()
+
+    def cache_stats(self):
+        """
+        Get hit and miss counts of the result cache.
+
+        Returns:
+            tuple: (hits, misses)
+        """
+        return self._results.hits, self._results.misses
+
+    def selection_hash(self, project_name, run_names, keys=None, align='step',
+                       percentiles=DEFAULT_PERCENTILES, points=200):
+        """Hash identifying a comparison and the data it was computed from."""
+        selection = {
+            'project': project_name,
+            'runs': [[name, repr(self.version(project_name, name))] for name in sorted(run_names)],
+            'keys': sorted(keys) if keys else None,
+            'align': align,
+            'percentiles': list(percentiles),
+            'points': points,
+        }
+        return hashlib.sha1(json.dumps(selection, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _run_series(self, project_name, run_name, patterns, align):
+        """Get a run's selected series as arrays, from the cache where possible."""
+        version = self.version(project_name, run_name)
+        index_key = (project_name, run_name, 'keys')
+        cached_keys = self._series.get(index_key)
+        metrics = None
+        if cached_keys is None or cached_keys[0] != version:
+            metrics = self.load_metrics(project_name, run_name) or {}
+            cached_keys = (version, sorted(metrics))
+            self._series.set(index_key, cached_keys)
+
+        series = {}
+        for key in select_keys(cached_keys[1], patterns):
+            cache_key = (project_name, run_name, key, align)
+            cached = self._series.get(cache_key)
+            if cached is None or cached[0] != version:
+                if metrics is None:
+                    metrics = self.load_metrics(project_name, run_name) or {}
+                cached = (version, series_arrays(metrics.get(key, []), align))
+                self._series.set(cache_key, cached)
+            series[key] = cached[1]
+        return series
+
+    def compare(self, project_name, run_names, keys=None, align='step', percentiles=DEFAULT_PERCENTILES,
+                points=200):
+        """
+        Compare metrics across runs.
+
+        Args:
+            project_name (str): Project name
+            run_names (list): Runs to compare
+            keys (list, optional): Metric names or glob patterns. None compares every key.
+            align (str): 'step' or 'time' (seconds since each run's first point)
+            percentiles (tuple): Percentile bands to compute, 0-100
+            points (int): Maximum number of points per aggregated curve
+
+        Returns:
+            dict: 'selection' (the hash), 'align', 'runs' and per-key aggregates under 'metrics'
+        """
+        if align not in ALIGNMENTS:
+            raise ValueError(f"Unknown alignment '{align}', expected one of {', '.join(ALIGNMENTS)}")
+
+        run_names = sorted(set(run_names))
+        selection = self.selection_hash(project_name, run_names, keys, align, percentiles, points)
+        result = self._results.get(selection)
+        if result is not None:
+            return result
+
+        with self._lock:
+            per_key = {}
+            for run_name in run_names:
+                for key, arrays in self._run_series(project_name, run_name, keys, align).items():
+                    per_key.setdefault(key, []).append(arrays)
+
+        metrics = {}
+        for key in sorted(per_key):
+            aggregate = aggregate_series(per_key[key], points, percentiles)
+            aggregate['runs'] = sum(1 for x, _ in per_key[key] if len(x))
+            metrics[key] = aggregate
+
+        result = {'selection': selection, 'align': align, 'runs': run_names, 'metrics': metrics}
+        self._results.set(selection, result)
+        return result
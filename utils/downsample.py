@@ -0,0 +1,222 @@
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax', 'mean')
+
+
+def parse_downsample_args(args):
+    """
+    Parse the `max_points` and `downsample` query parameters.
+
+    Args:
+        args: Query arguments (a werkzeug MultiDict)
+
+    Returns:
+        tuple: (max_points or None, method)
+
+    Raises:
+        ValueError: If a parameter has an invalid value
+    """
+    max_points = args.get('max_points')
+    method = args.get('downsample') or 'lttb'
+
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {', '.join(DOWNSAMPLE_METHODS)}")
+
+    if max_points is None or max_points == '':
+        return None, method
+
+    try:
+        max_points = int(max_points)
+    except ValueError:
+        raise ValueError(f"Invalid value for 'max_points': {max_points}")
+    if max_points < 3:
+        raise ValueError("'max_points' must be at least 3")
+
+    return max_points, method
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x (np.ndarray): Monotonic x values
+        y (np.ndarray): y values
+        n_out (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+
+    # Interior points are split into n_out - 2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    avg_x = (cum_x[edges[1:]] - cum_x[edges[:-1]]) / counts
+    avg_y = (cum_y[edges[1:]] - cum_y[edges[:-1]]) / counts
+
+    # Each bucket is scored against the average of the following bucket
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[b]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[b] - ay))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+
+    return selected
+
+
+def _bucketize(values, n_buckets, fill):
+    """Reshape values into equally sized buckets, padding the last one with `fill`."""
+    width = -(-len(values) // n_buckets)
+    n_buckets = -(-len(values) // width)
+    padded = np.full(n_buckets * width, fill, dtype=np.float64)
+    padded[:len(values)] = values
+    return padded.reshape(n_buckets, width), width
+
+
+def minmax_indices(y, n_out):
+    """
+    Select the minimum and maximum point of each bucket so spikes stay visible.
+
+    Args:
+        y (np.ndarray): y values
+        n_out (int): Maximum number of points to keep
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+
+    n_buckets = max(n_out // 2, 1)
+    low, width = _bucketize(np.where(np.isnan(y), np.inf, y), n_buckets, np.inf)
+    high, _ = _bucketize(np.where(np.isnan(y), -np.inf, y), n_buckets, -np.inf)
+
+    offsets = np.arange(low.shape[0]) * width
+    indices = np.concatenate((offsets + np.argmin(low, axis=1), offsets + np.argmax(high, axis=1)))
+    return np.unique(indices)
+
+
+def bucket_means(x, y, timestamps, n_out):
+    """
+    Aggregate points into buckets, keeping the mean, min and max of each bucket.
+
+    Args:
+        x (np.ndarray): Step values
+        y (np.ndarray): Metric values
+        timestamps (np.ndarray): Timestamps
+        n_out (int): Number of buckets
+
+    Returns:
+        list: One aggregated point per bucket
+    """
+    low, _ = _bucketize(np.where(np.isnan(y), np.inf, y), n_out, np.inf)
+    high, _ = _bucketize(np.where(np.isnan(y), -np.inf, y), n_out, -np.inf)
+    values, _ = _bucketize(y, n_out, np.nan)
+    steps, _ = _bucketize(x, n_out, np.nan)
+    times, _ = _bucketize(timestamps, n_out, np.nan)
+
+    with np.errstate(invalid='ignore'):
+        mean = np.nanmean(values, axis=1)
+
+    return [
+        {
+            'value': float(mean[i]),
+            'min': float(low[i].min()),
+            'max': float(high[i].max()),
+            'step': int(steps[i, 0]),
+            'timestamp': float(times[i, 0]),
+        }
+        for i in range(len(mean))
+    ]
+
+
+def downsample_points(points, max_points, method='lttb'):
+    """
+    Reduce a list of logged points to at most `max_points`.
+
+    Points whose values are not numeric are returned unchanged.
+
+    Args:
+        points (list): Logged points with 'value', 'step' and 'timestamp' fields
+        max_points (int): Point budget
+        method (str): 'lttb', 'minmax' or 'mean'
+
+    Returns:
+        list: Downsampled points
+    """
+    if len(points) <= max_points:
+        return points
+
+    try:
+        y = np.array([p['value'] for p in points], dtype=np.float64)
+        x = np.array([p.get('step', i) for i, p in enumerate(points)], dtype=np.float64)
+    except (KeyError, TypeError, ValueError):
+        return points
+
+    if method == 'mean':
+        timestamps = np.array([p.get('timestamp', np.nan) for p in points], dtype=np.float64)
+        return bucket_means(x, y, timestamps, max_points)
+
+    if method == 'minmax':
+        indices = minmax_indices(y, max_points)
+    else:
+        finite = np.isfinite(y)
+        if not finite.all():
+            y = np.where(finite, y, 0.0)
+        indices = lttb_indices(x, y, max_points)
+
+    return [points[i] for i in indices]
+
+
+def downsample_metrics(metrics, max_points, method='lttb', cache=None, cache_prefix=(), versions=None):
+    """
+    Downsample every series in a metrics dictionary.
+
+    Args:
+        metrics (dict): Mapping of metric key to a list of logged points
+        max_points (int): Point budget per series
+        method (str): 'lttb', 'minmax' or 'mean'
+        cache (LRUCache, optional): Cache for downsampled series
+        cache_prefix (tuple): Identifies the run and query range in cache keys
+        versions (dict, optional): Per-key data version (e.g. the raw point count).
+            A cached series is recomputed when its version changes.
+
+    Returns:
+        dict: Downsampled metrics
+    """
+    result = {}
+    for key, points in metrics.items():
+        if len(points) <= max_points:
+            result[key] = points
+            continue
+
+        if cache is None:
+            result[key] = downsample_points(points, max_points, method)
+            continue
+
+        cache_key = tuple(cache_prefix) + (key, max_points, method)
+        version = versions.get(key) if versions else len(points)
+        cached = cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            result[key] = cached[1]
+        else:
+            result[key] = downsample_points(points, max_points, method)
+            cache.set(cache_key, (version, result[key]))
+
+    return result
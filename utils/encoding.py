@@ -0,0 +1,259 @@
+import gzip
+import io
+import json
+from functools import lru_cache
+import numpy as np
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+NPZ_MIMETYPE = 'application/x-npz'
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+COLUMNS = ('step', 'value', 'timestamp')
+_DTYPES = {'step': '<i8', 'value': '<f8', 'timestamp': '<f8'}
+
+
+def _optional_import(name):
+    """Import an optional dependency, returning None if it is not installed."""
+    try:
+        return __import__(name)
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def available_mimetypes():
+    """
+    List the metric response formats supported in this environment.
+
+    Returns:
+        tuple: Mimetypes, in order of preference for binary clients
+    """
+    mimetypes = []
+    if _optional_import('msgpack') is not None:
+        mimetypes.append(MSGPACK_MIMETYPE)
+    if _optional_import('pyarrow') is not None:
+        mimetypes.append(ARROW_MIMETYPE)
+    mimetypes.append(NPZ_MIMETYPE)
+    return tuple(mimetypes)
+
+
+@lru_cache(maxsize=None)
+def available_encodings():
+    """
+    List the content encodings supported in this environment.
+
+    Returns:
+        tuple: Content codings, in order of preference
+    """
+    encodings = []
+    if _optional_import('zstandard') is not None:
+        encodings.append('zstd')
+    encodings.append('gzip')
+    return tuple(encodings)
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _point_row(index, point):
+    """(step, value, timestamp) of a logged point, tolerating the forms query_metrics passes through."""
+    if not isinstance(point, dict):
+        # Points logged by old versions may be bare values
+        return index, _as_float(point), np.nan
+    step = _as_float(point.get('step', index))
+    if not np.isfinite(step) or abs(step) >= 2 ** 63:
+        step = index
+    return int(step), _as_float(point.get('value')), _as_float(point.get('timestamp'))
+
+
+def to_columns(metrics):
+    """
+    Convert logged points to NumPy columns.
+
+    Args:
+        metrics (dict): Mapping of metric key to a list of logged points
+
+    Returns:
+        dict: Mapping of metric key to {'step', 'value', 'timestamp'} arrays.
+            Non-numeric values become NaN. Steps are truncated to integers; a
+            point without a numeric step, or a bare value, gets its index.
+    """
+    columns = {}
+    for key, points in metrics.items():
+        n = len(points)
+        rows = [_point_row(i, p) for i, p in enumerate(points)]
+        columns[key] = {
+            'step': np.fromiter((row[0] for row in rows), dtype=np.int64, count=n),
+            'value': np.fromiter((row[1] for row in rows), dtype=np.float64, count=n),
+            'timestamp': np.fromiter((row[2] for row in rows), dtype=np.float64, count=n),
+        }
+    return columns
+
+
+def _encode_msgpack(columns):
+    import msgpack
+
+    payload = {
+        key: {name: np.ascontiguousarray(arrays[name], dtype=_DTYPES[name]).tobytes()
+              for name in COLUMNS}
+        for key, arrays in columns.items()
+    }
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def _decode_msgpack(body):
+    import msgpack
+
+    payload = msgpack.unpackb(body, raw=False)
+    return {
+        key: {name: np.frombuffer(arrays[name], dtype=_DTYPES[name]) for name in COLUMNS}
+        for key, arrays in payload.items()
+    }
+
+
+def _encode_arrow(columns):
+    import pyarrow as pa
+
+    keys = list(columns)
+    lengths = [len(columns[key]['step']) for key in keys]
+    indices = np.repeat(np.arange(len(keys), dtype=np.int32), lengths)
+
+    def _concat(name):
+        if not keys:
+            return np.empty(0, dtype=_DTYPES[name])
+        return np.concatenate([columns[key][name] for key in keys])
+
+    table = pa.table({
+        'key': pa.DictionaryArray.from_arrays(pa.array(indices), pa.array(keys, type=pa.string())),
+        'step': _concat('step'),
+        'value': _concat('value'),
+        'timestamp': _concat('timestamp'),
+    })
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _decode_arrow(body):
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(body).read_all().combine_chunks()
+    key_column = table.column('key').chunk(0) if table.num_rows else None
+    data = {name: table.column(name).to_numpy() for name in COLUMNS}
+
+    columns = {}
+    if key_column is None:
+        return columns
+
+    indices = key_column.indices.to_numpy()
+    for i, key in enumerate(key_column.dictionary.to_pylist()):
+        mask = indices == i
+        columns[key] = {name: data[name][mask] for name in COLUMNS}
+    return columns
+
+
+def _encode_npz(columns):
+    keys = list(columns)
+    arrays = {'keys': np.array(keys, dtype=str)}
+    for i, key in enumerate(keys):
+        for name in COLUMNS:
+            arrays[f'{name}_{i}'] = columns[key][name]
+
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+def _decode_npz(body):
+    with np.load(io.BytesIO(body), allow_pickle=False) as data:
+        keys = data['keys'].tolist()
+        return {key: {name: data[f'{name}_{i}'] for name in COLUMNS} for i, key in enumerate(keys)}
+
+
+_ENCODERS = {
+    MSGPACK_MIMETYPE: _encode_msgpack,
+    ARROW_MIMETYPE: _encode_arrow,
+    NPZ_MIMETYPE: _encode_npz,
+}
+
+_DECODERS = {
+    MSGPACK_MIMETYPE: _decode_msgpack,
+    ARROW_MIMETYPE: _decode_arrow,
+    NPZ_MIMETYPE: _decode_npz,
+}
+
+
+def compress(body, encoding):
+    """
+    Compress a response body.
+
+    Args:
+        body (bytes): Response body
+        encoding (str): 'gzip' or 'zstd'
+
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return gzip.compress(body, compresslevel=5)
+
+
+def encode_metrics(metrics, accept_mimetypes=None, accept_encodings=None):
+    """
+    Encode metrics according to the client's Accept and Accept-Encoding headers.
+
+    Args:
+        metrics (dict): Mapping of metric key to a list of logged points
+        accept_mimetypes: Parsed Accept header (werkzeug MIMEAccept)
+        accept_encodings: Parsed Accept-Encoding header (werkzeug Accept)
+
+    Returns:
+        tuple: (body bytes, mimetype, content encoding or None)
+    """
+    mimetype = JSON_MIMETYPE
+    if accept_mimetypes is not None:
+        mimetype = accept_mimetypes.best_match((JSON_MIMETYPE,) + available_mimetypes(), default=JSON_MIMETYPE)
+
+    if mimetype == JSON_MIMETYPE:
+        body = json.dumps(metrics, separators=(',', ':')).encode('utf-8')
+    else:
+        body = _ENCODERS[mimetype](to_columns(metrics))
+
+    encoding = None
+    if accept_encodings is not None and len(body) >= MIN_COMPRESS_SIZE:
+        for candidate in available_encodings():
+            if accept_encodings[candidate]:
+                encoding = candidate
+                body = compress(body, encoding)
+                break
+
+    return body, mimetype, encoding
+
+
+def decode_metrics(body, mimetype):
+    """
+    Decode a metrics response into NumPy columns.
+
+    Args:
+        body (bytes): Decompressed response body
+        mimetype (str): Response mimetype
+
+    Returns:
+        dict: Mapping of metric key to {'step', 'value', 'timestamp'} arrays
+    """
+    mimetype = (mimetype or JSON_MIMETYPE).split(';')[0].strip()
+    if mimetype in _DECODERS:
+        return _DECODERS[mimetype](body)
+    return to_columns(json.loads(body))
@@ -0,0 +1,207 @@
+import base64
+import fnmatch
+import json
+
+
+def encode_cursor(offsets):
+    """
+    Encode per-key read offsets as an opaque cursor string.
+
+    Args:
+        offsets (dict): Mapping of metric key to the number of points already read
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps(offsets, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor string
+
+    Returns:
+        dict: Mapping of metric key to read offset
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return {}
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        offsets = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(offsets, dict) or not all(isinstance(v, int) and v >= 0 for v in offsets.values()):
+        raise ValueError("Invalid cursor")
+
+    return offsets
+
+
+def select_keys(available, patterns=None):
+    """
+    Select metric keys matching any of the given names or glob patterns.
+
+    Args:
+        available (iterable): Metric keys present in the run
+        patterns (list, optional): Key names or glob patterns. None selects all keys.
+
+    Returns:
+        list: Matching keys, sorted
+    """
+    available = sorted(available)
+    if not patterns:
+        return available
+
+    selected = []
+    for key in available:
+        for pattern in patterns:
+            if key == pattern or fnmatch.fnmatchcase(key, pattern):
+                selected.append(key)
+                break
+    return selected
+
+
+def parse_keys(args):
+    """
+    Parse the `keys` query parameter (comma separated or repeated).
+
+    Args:
+        args: Query arguments (a werkzeug MultiDict)
+
+    Returns:
+        list: Key names or glob patterns, or None if no keys were given
+    """
+    keys = []
+    for value in args.getlist('keys'):
+        keys.extend(k.strip() for k in value.split(',') if k.strip())
+    return keys or None
+
+
+def parse_metric_query(args):
+    """
+    Parse metric query parameters from a request's query string.
+
+    Supported parameters are `keys` (comma separated or repeated, glob patterns
+    allowed), `min_step`, `max_step`, `start_time`, `end_time`, `since` (a cursor
+    returned by a previous query) and `limit` (maximum number of points returned).
+
+    Args:
+        args: Query arguments (a werkzeug MultiDict)
+
+    Returns:
+        dict: Keyword arguments for `query_metrics`
+
+    Raises:
+        ValueError: If a parameter has an invalid value
+    """
+    def _number(name, cast):
+        value = args.get(name)
+        if value is None or value == '':
+            return None
+        try:
+            return cast(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for '{name}': {value}")
+
+    query = {
+        'keys': parse_keys(args),
+        'min_step': _number('min_step', int),
+        'max_step': _number('max_step', int),
+        'start_time': _number('start_time', float),
+        'end_time': _number('end_time', float),
+        'since': args.get('since') or None,
+        'limit': _number('limit', int),
+    }
+
+    if query['limit'] is not None and query['limit'] <= 0:
+        raise ValueError("'limit' must be a positive integer")
+
+    # Validate the cursor early so callers can report a 400
+    decode_cursor(query['since'])
+
+    return query
+
+
+def _matches(point, min_step, max_step, start_time, end_time):
+    """Check whether a logged point falls in the requested step and time range."""
+    if not isinstance(point, dict):
+        return min_step is None and max_step is None and start_time is None and end_time is None
+
+    step = point.get('step')
+    if min_step is not None and (step is None or step < min_step):
+        return False
+    if max_step is not None and (step is None or step > max_step):
+        return False
+
+    timestamp = point.get('timestamp')
+    if start_time is not None and (timestamp is None or timestamp < start_time):
+        return False
+    if end_time is not None and (timestamp is None or timestamp > end_time):
+        return False
+
+    return True
+
+
+def query_metrics(metrics, keys=None, min_step=None, max_step=None, start_time=None,
+                  end_time=None, since=None, limit=None):
+    """
+    Select a subset of a run's metrics.
+
+    Metric histories are append-only, so a cursor records how many points of each
+    key have already been read and a query with `since` only scans points logged
+    after it.
+
+    Args:
+        metrics (dict): Mapping of metric key to a list of logged points
+        keys (list, optional): Key names or glob patterns to include
+        min_step (int, optional): Minimum step (inclusive)
+        max_step (int, optional): Maximum step (inclusive)
+        start_time (float, optional): Minimum timestamp (inclusive)
+        end_time (float, optional): Maximum timestamp (inclusive)
+        since (str, optional): Cursor returned by a previous query
+        limit (int, optional): Maximum number of points to return
+
+    Returns:
+        tuple: (selected metrics, next cursor, whether more points are pending)
+    """
+    offsets = decode_cursor(since)
+    next_offsets = {}
+    result = {}
+    remaining = limit
+    has_more = False
+
+    for key in select_keys(metrics.keys(), keys):
+        points = metrics[key]
+        start = min(offsets.get(key, 0), len(points))
+
+        if has_more:
+            next_offsets[key] = start
+            continue
+
+        selected = []
+        position = start
+        for position in range(start, len(points)):
+            if remaining is not None and len(selected) >= remaining:
+                has_more = True
+                break
+            point = points[position]
+            if _matches(point, min_step, max_step, start_time, end_time):
+                selected.append(point)
+        else:
+            position = len(points)
+
+        next_offsets[key] = position
+        if selected:
+            result[key] = selected
+            if remaining is not None:
+                remaining -= len(selected)
+
+    return result, encode_cursor(next_offsets), has_more
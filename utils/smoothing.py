@@ -0,0 +1,81 @@
+import numpy as np
+
+SMOOTHING_METHODS = ('ema', 'rolling')
+
+
+def ema(values, weight):
+    """
+    Exponential moving average, debiased like TensorBoard's smoothing slider.
+
+    Computed in closed form over blocks short enough for the powers of `weight`
+    to stay finite, so the cost is a few vectorized passes instead of a Python
+    loop over every point.
+
+    Args:
+        values (np.ndarray): Values to smooth
+        weight (float): Smoothing weight in [0, 1); 0 returns the values unchanged
+
+    Returns:
+        np.ndarray: Smoothed values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not 0.0 <= weight < 1.0:
+        raise ValueError("EMA weight must be in [0, 1)")
+    if weight == 0.0 or len(values) == 0:
+        return values.copy()
+
+    # weight ** -block must not overflow
+    block = max(1, min(len(values), int(600 / -np.log(weight))))
+    smoothed = np.empty_like(values)
+    state = 0.0
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        k = np.arange(len(chunk))
+        powers = weight ** k
+        # s_k = w^(k+1) * state + (1 - w) * sum_j w^(k-j) x_j
+        smoothed[start:start + len(chunk)] = powers * weight * state + \
+            (1.0 - weight) * powers * np.cumsum(chunk / powers)
+        state = smoothed[start + len(chunk) - 1]
+
+    # Remove the bias towards the initial zero state
+    return smoothed / (1.0 - weight ** np.arange(1, len(values) + 1))
+
+
+def rolling_mean(values, window):
+    """
+    Trailing moving average; the first points average over what is available.
+
+    Args:
+        values (np.ndarray): Values to smooth
+        window (int): Window size in points
+
+    Returns:
+        np.ndarray: Smoothed values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    window = int(window)
+    if window < 1:
+        raise ValueError("Rolling window must be at least 1")
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cumsum[ends] - cumsum[starts]) / (ends - starts)
+
+
+def smooth(values, method='ema', amount=0.6):
+    """
+    Smooth a series.
+
+    Args:
+        values (np.ndarray): Values to smooth
+        method (str): 'ema' (amount is the weight in [0, 1)) or 'rolling' (amount is the window size)
+        amount (float): Smoothing amount
+
+    Returns:
+        np.ndarray: Smoothed values
+    """
+    if method == 'ema':
+        return ema(values, amount)
+    if method == 'rolling':
+        return rolling_mean(values, amount)
+    raise ValueError(f"Unknown smoothing method '{method}', expected one of {', '.join(SMOOTHING_METHODS)}")
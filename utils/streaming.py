@@ -0,0 +1,242 @@
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from .metrics_query import select_keys
+
+
+class _Entry:
+    """A batch of points published to a run, with its JSON encoding cached."""
+
+    __slots__ = ('seq', 'metrics', '_encoded')
+
+    def __init__(self, seq, metrics):
+        self.seq = seq
+        self.metrics = metrics
+        self._encoded = None
+
+    def encoded(self):
+        # Shared by every unfiltered subscriber, so it is only serialized once
+        if self._encoded is None:
+            self._encoded = json.dumps(self.metrics, separators=(',', ':'))
+        return self._encoded
+
+
+class _Channel:
+    """Per-run ring buffer shared by all subscribers of the run."""
+
+    def __init__(self, buffer_size, first_seq):
+        self.entries = deque(maxlen=buffer_size)
+        self.condition = threading.Condition()
+        self.subscribers = 0
+        # Entries up to this sequence number are no longer (or were never) buffered
+        self.evicted_seq = first_seq
+        self.created_at = time.time()
+        # Newest published timestamp per key, to skip points published twice
+        self.last_timestamps = {}
+
+
+class Subscription:
+    """A subscriber's cursor into a run's channel."""
+
+    def __init__(self, hub, key, channel, keys=None, last_seq=None, reset=False):
+        self._hub = hub
+        self._key = key
+        self._channel = channel
+        self.keys = list(keys) if keys else None
+        self.cursor = last_seq
+        # Report a gap with the first points, e.g. for an unknown resume position
+        self._reset = reset
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.next()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def next(self, timeout=None):
+        """
+        Wait for points published after this subscription's cursor.
+
+        Args:
+            timeout (float, optional): Seconds to wait. None waits indefinitely.
+
+        Returns:
+            list: (seq, JSON payload, gap) tuples, oldest first. `gap` is True if points were
+                dropped from the ring buffer before this subscriber could read them.
+                An empty list means the timeout expired.
+        """
+        channel = self._channel
+        with channel.condition:
+            if not self._pending():
+                channel.condition.wait(timeout)
+            entries = [e for e in channel.entries if self.cursor is None or e.seq > self.cursor]
+            # Read with the entries, before a concurrent publish can evict more of them
+            gap = self._reset or (self.cursor is not None and self.cursor < channel.evicted_seq)
+
+        if not entries:
+            return []
+
+        events = []
+        for entry in entries:
+            if self.keys is None:
+                payload = entry.encoded()
+            else:
+                selected = {k: entry.metrics[k] for k in select_keys(entry.metrics, self.keys)}
+                payload = json.dumps(selected, separators=(',', ':')) if selected else None
+            if payload is not None:
+                events.append((entry.seq, payload, gap))
+                gap = False
+        self.cursor = entries[-1].seq
+        self._reset = False
+        return events
+
+    def _pending(self):
+        entries = self._channel.entries
+        return bool(entries) and (self.cursor is None or entries[-1].seq > self.cursor)
+
+    def close(self):
+        """Stop receiving points."""
+        if not self.closed:
+            self.closed = True
+            self._hub._unsubscribe(self._key)
+
+
+class MetricHub:
+    """
+    Fan-out hub for newly logged metric points.
+
+    Writers publish each batch once into a per-run ring buffer; every subscriber
+    of the run reads from that shared buffer with its own cursor, so adding
+    subscribers costs no extra reads or writes.
+    """
+
+    def __init__(self, buffer_size=1024):
+        """
+        Initialize hub.
+
+        Args:
+            buffer_size (int): Number of published batches retained per run
+        """
+        self.buffer_size = buffer_size
+        self._channels = {}
+        self._lock = threading.Lock()
+        # Sequence numbers start at the current time in microseconds, so a hub in a
+        # restarted process numbers its points above every id handed out before
+        self._seq = itertools.count(time.time_ns() // 1000)
+
+    def has_subscribers(self, project_name, run_name):
+        """Check whether anyone is subscribed to a run."""
+        return (project_name, run_name) in self._channels
+
+    def subscriber_count(self):
+        """Total number of active subscriptions."""
+        with self._lock:
+            return sum(channel.subscribers for channel in self._channels.values())
+
+    def publish(self, project_name, run_name, metrics, only_new=False):
+        """
+        Publish newly logged points to the subscribers of a run.
+
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            metrics (dict): Mapping of metric key to a list of new points
+            only_new (bool): Skip points that are not newer than the last point published
+                for their key, or than the subscription. Used when the same points may
+                reach the hub twice, from their writer and from a file watcher.
+        """
+        channel = self._channels.get((project_name, run_name))
+        if channel is None or not metrics:
+            return
+
+        with channel.condition:
+            if only_new:
+                fresh = {}
+                for key, points in metrics.items():
+                    newest = channel.last_timestamps.get(key, channel.created_at)
+                    points = [p for p in points if p.get('timestamp', 0) > newest]
+                    if points:
+                        fresh[key] = points
+                metrics = fresh
+                if not metrics:
+                    return
+
+            for key, points in metrics.items():
+                newest = max(p.get('timestamp', 0) for p in points)
+                if newest > channel.last_timestamps.get(key, 0):
+                    channel.last_timestamps[key] = newest
+            if len(channel.entries) == channel.entries.maxlen:
+                channel.evicted_seq = channel.entries[0].seq
+            channel.entries.append(_Entry(next(self._seq), metrics))
+            channel.condition.notify_all()
+
+    def subscribe(self, project_name, run_name, keys=None, last_seq=None):
+        """
+        Subscribe to the points published for a run.
+
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            keys (list, optional): Only receive these metric keys (glob patterns allowed)
+            last_seq (int, optional): Resume after this sequence number (SSE Last-Event-ID).
+                A number this hub has not handed out yet, e.g. from a process whose clock
+                was ahead, resumes from the newest points and reports a gap.
+
+        Returns:
+            Subscription: Subscription to read points from; close it when done
+        """
+        key = (project_name, run_name)
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = _Channel(self.buffer_size, next(self._seq))
+            channel.subscribers += 1
+            head = next(self._seq)
+
+        reset = last_seq is not None and last_seq >= head
+        if reset or last_seq is None:
+            with channel.condition:
+                last_seq = channel.entries[-1].seq if channel.entries else channel.evicted_seq
+
+        return Subscription(self, key, channel, keys=keys, last_seq=last_seq, reset=reset)
+
+    def _unsubscribe(self, key):
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                return
+            channel.subscribers -= 1
+            if channel.subscribers <= 0:
+                del self._channels[key]
+
+
+def format_sse(events):
+    """
+    Format subscription events as Server-Sent Events.
+
+    Args:
+        events (list): (seq, JSON payload, gap) tuples from `Subscription.next`
+
+    Returns:
+        str: SSE stream chunk
+    """
+    chunks = []
+    for seq, payload, gap in events:
+        if gap:
+            # Points were dropped; the client should refetch with its metrics cursor
+            chunks.append(f"id: {seq}\nevent: reset\ndata: {{}}\n\n")
+        chunks.append(f"id: {seq}\nevent: metrics\ndata: {payload}\n\n")
+    return ''.join(chunks)
+
+
+# Hub shared by experiments, servers and dashboards living in the same process
+default_hub = MetricHub()
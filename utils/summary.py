@@ -0,0 +1,153 @@
+import json
+import math
+import os
+
+
+def update_summary(entry, point):
+    """
+    Fold one logged point into a metric's summary record.
+
+    The mean and variance are maintained with Welford's algorithm, so a
+    summary can be extended point by point without revisiting the history.
+    Non-numeric values only update the count and the last value.
+
+    Args:
+        entry (dict): Summary record of the metric, updated in place; start with {}
+        point (dict): Logged point with 'value', 'step' and 'timestamp' fields
+
+    Returns:
+        dict: The updated record
+    """
+    value = point.get('value') if isinstance(point, dict) else point
+    step = point.get('step') if isinstance(point, dict) else None
+
+    entry['count'] = entry.get('count', 0) + 1
+    entry['last'] = value
+    entry['last_step'] = step
+    if isinstance(point, dict) and 'timestamp' in point:
+        entry['last_timestamp'] = point['timestamp']
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+        return entry
+
+    n = entry.get('numeric_count', 0) + 1
+    entry['numeric_count'] = n
+    if n == 1 or value < entry['min']:
+        entry['min'] = value
+        entry['min_step'] = step
+    if n == 1 or value > entry['max']:
+        entry['max'] = value
+        entry['max_step'] = step
+
+    mean = entry.get('mean', 0.0)
+    delta = value - mean
+    mean += delta / n
+    m2 = entry.get('m2', 0.0) + delta * (value - mean)
+    entry['mean'] = mean
+    entry['m2'] = m2
+    entry['variance'] = m2 / n
+    return entry
+
+
+def summarize_points(points):
+    """
+    Build a metric's summary record from its full history.
+
+    Args:
+        points (list): Logged points
+
+    Returns:
+        dict: Summary record
+    """
+    entry = {}
+    for point in points:
+        update_summary(entry, point)
+    return entry
+
+
+def summarize_metrics(metrics):
+    """
+    Build summary records for every key of a metrics dictionary.
+
+    Args:
+        metrics (dict): Mapping of metric key to a list of logged points
+
+    Returns:
+        dict: Mapping of metric key to its summary record
+    """
+    return {key: summarize_points(points) for key, points in metrics.items()}
+
+
+def summary_is_stale(run_dir):
+    """
+    Check whether a run's summary.json is missing or older than its metrics.json.
+
+    Args:
+        run_dir (Path): Run directory
+
+    Returns:
+        bool: True if the summary needs to be rebuilt
+    """
+    try:
+        metrics_mtime = os.stat(run_dir / "metrics.json").st_mtime_ns
+    except OSError:
+        return False
+    try:
+        return os.stat(run_dir / "summary.json").st_mtime_ns < metrics_mtime
+    except OSError:
+        return True
+
+
+def load_summary(run_dir, rebuild=True, save=False):
+    """
+    Read a run's summary.json, rebuilding it from metrics.json when it is missing or stale.
+
+    Runs logged before summaries existed have no summary file; with `rebuild`
+    one is computed from the metrics file in memory. Read paths leave the run
+    directory untouched; only writers and explicit migrations pass `save`.
+
+    Args:
+        run_dir (Path): Run directory
+        rebuild (bool): Compute a missing or outdated summary from the metrics
+        save (bool): Write a rebuilt summary to summary.json
+
+    Returns:
+        dict: Mapping of metric key to its summary record, or None if the run has no metrics
+    """
+    try:
+        with open(run_dir / "summary.json", 'r') as f:
+            summary = json.load(f)
+        if not rebuild or not summary_is_stale(run_dir):
+            return summary
+    except (OSError, ValueError):
+        if not rebuild:
+            return None
+
+    try:
+        with open(run_dir / "metrics.json", 'r') as f:
+            metrics = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    summary = summarize_metrics(metrics)
+    if save:
+        save_summary(run_dir, summary)
+    return summary
+
+
+def save_summary(run_dir, summary):
+    """
+    Atomically write a run's summary.json.
+
+    Args:
+        run_dir (Path): Run directory
+        summary (dict): Mapping of metric key to its summary record
+    """
+    summary_path = run_dir / "summary.json"
+    tmp_path = summary_path.with_suffix(f'.json.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(summary, f)
+        os.replace(tmp_path, summary_path)
+    except OSError:
+        pass
@@ -0,0 +1,318 @@
+import json
+import os
+import threading
+import warnings
+import numpy as np
+from .metrics_query import select_keys
+
+SCHEMA_FILE = "system.json"
+DATA_FILE = "system.bin"
+SCHEMA_VERSION = 3
+
+# Statistics kept for every gauge over each logging window
+AGGREGATES = ('min', 'max', 'mean', 'p95')
+
+
+def gauge_shapes(n_cores):
+    """
+    List the gauges sampled at high frequency and aggregated per window.
+
+    Args:
+        n_cores (int): Number of logical CPU cores
+
+    Returns:
+        list: (name, shape) pairs
+    """
+    return [
+        ('cpu_percent', ()),
+        ('cpu_per_core', (n_cores,)),
+        ('memory_used_percent', ()),
+        ('memory_used_gb', ()),
+        ('proc_rss_gb', ()),
+    ]
+
+
+def system_fields(n_cores, n_gpus):
+    """
+    Build the schema of a system metrics stream.
+
+    Every row is one logging window and has a fixed size; per-core and per-GPU
+    values are vectors, so the row size depends only on the host. Each gauge
+    gets one field per statistic in AGGREGATES (`memory_used_percent_max`, ...);
+    the other values are read once at the end of the window. `proc_*` fields
+    cover the monitored process tree only.
+
+    Args:
+        n_cores (int): Number of logical CPU cores
+        n_gpus (int): Number of GPUs
+
+    Returns:
+        list: (name, dtype, shape) fields
+    """
+    fields = [
+        ('timestamp', '<f8', ()),
+        ('step', '<i8', ()),
+        ('samples', '<u4', ()),
+    ]
+    for name, shape in gauge_shapes(n_cores):
+        fields.extend((f"{name}_{stat}", '<f4', shape) for stat in AGGREGATES)
+    fields.extend([
+        ('memory_total_gb', '<f4', ()),
+        ('disk_used_percent', '<f4', ()),
+        ('net_bytes_sent', '<u8', ()),
+        ('net_bytes_recv', '<u8', ()),
+        ('gpu_utilization', '<f4', (n_gpus,)),
+        ('gpu_memory_used_percent', '<f4', (n_gpus,)),
+        # Totals over the monitored process and its descendants
+        ('proc_count', '<u4', ()),
+        ('proc_cpu_time', '<f8', ()),
+        ('proc_cpu_percent', '<f4', ()),
+        ('proc_uss_gb', '<f4', ()),
+        ('proc_read_bytes', '<u8', ()),
+        ('proc_write_bytes', '<u8', ()),
+        ('proc_num_fds', '<u4', ()),
+        ('proc_num_threads', '<u4', ()),
+    ])
+    return fields
+
+
+class SampleRing:
+    """
+    Fixed-capacity ring buffer of high-frequency samples.
+
+    Samples are flattened into rows of a preallocated array, so appending does
+    not allocate. Once full, the oldest samples are overwritten.
+    """
+
+    def __init__(self, shapes, capacity):
+        """
+        Initialize buffer.
+
+        Args:
+            shapes (list): (name, shape) of the sampled values
+            capacity (int): Maximum number of samples held
+        """
+        self.shapes = shapes
+        self.capacity = capacity
+        self._slices = {}
+        offset = 0
+        for name, shape in shapes:
+            size = int(np.prod(shape, dtype=np.int64))
+            self._slices[name] = slice(offset, offset + size)
+            offset += size
+        self._data = np.full((capacity, offset), np.nan)
+        self._next = 0
+        self.count = 0
+
+    def append(self, sample):
+        """
+        Add a sample, overwriting the oldest one if the buffer is full.
+
+        Args:
+            sample (dict): Mapping of name to a value or vector
+        """
+        row = self._data[self._next]
+        for name, columns in self._slices.items():
+            row[columns] = sample.get(name, np.nan)
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self, name):
+        """Get the most recent value of `name`, or None if the buffer is empty."""
+        if not self.count:
+            return None
+        return self._data[self._next - 1, self._slices[name]]
+
+    def aggregate(self):
+        """
+        Aggregate the held samples and empty the buffer.
+
+        Returns:
+            dict: `<name>_<stat>` for every value and statistic in AGGREGATES
+        """
+        data = self._data[:self.count] if self.count < self.capacity else self._data
+        with warnings.catch_warnings():
+            # Columns without any sample, e.g. an offline core, are NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            stats = {
+                'min': np.nanmin(data, axis=0),
+                'max': np.nanmax(data, axis=0),
+                'mean': np.nanmean(data, axis=0),
+                'p95': np.nanpercentile(data, 95, axis=0),
+            }
+        self._next = 0
+        self.count = 0
+
+        result = {}
+        for name, shape in self.shapes:
+            columns = self._slices[name]
+            for stat in AGGREGATES:
+                result[f"{name}_{stat}"] = stats[stat][columns].reshape(shape)
+        return result
+
+
+def _dtype(fields):
+    return np.dtype([(name, dtype, tuple(shape)) for name, dtype, shape in fields])
+
+
+def _read_schema(run_dir):
+    try:
+        with open(run_dir / SCHEMA_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SystemMetricsWriter:
+    """
+    Append-only writer of a run's system metrics stream.
+
+    Rows are written as raw records of a NumPy structured dtype to system.bin,
+    described by system.json. The stream is separate from metrics.json: writing
+    a row never takes the experiment's lock or advances its step counter.
+    """
+
+    def __init__(self, run_dir, n_cores, n_gpus=0):
+        """
+        Open a run's stream for appending.
+
+        A stream written with another schema, e.g. by a run resumed on a different
+        host, is moved aside to system-<n>.json/.bin.
+
+        Args:
+            run_dir (Path): Run directory
+            n_cores (int): Number of logical CPU cores
+            n_gpus (int): Number of GPUs
+        """
+        self.run_dir = run_dir
+        self.shape = (n_cores, n_gpus)
+        self.fields = system_fields(n_cores, n_gpus)
+        self.dtype = _dtype(self.fields)
+        self._row = np.zeros(1, dtype=self.dtype)
+        self._lock = threading.Lock()
+        os.makedirs(run_dir, exist_ok=True)
+
+        schema = {
+            'version': SCHEMA_VERSION,
+            'fields': [[name, dtype, list(shape)] for name, dtype, shape in self.fields],
+            'row_bytes': self.dtype.itemsize,
+        }
+        existing = _read_schema(run_dir)
+        if existing != schema:
+            if existing is not None:
+                self._archive()
+            tmp_path = run_dir / f".{SCHEMA_FILE}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(schema, f, indent=2)
+            os.replace(tmp_path, run_dir / SCHEMA_FILE)
+            open(run_dir / DATA_FILE, 'wb').close()
+
+        self._file = open(run_dir / DATA_FILE, 'ab')
+        # Drop a partial row left by a process that died mid-write
+        size = self._file.tell()
+        if size % self.dtype.itemsize:
+            self._file.truncate(size - size % self.dtype.itemsize)
+            self._file.seek(0, os.SEEK_END)
+
+    def _archive(self):
+        n = 1
+        while (self.run_dir / f"system-{n}.json").exists():
+            n += 1
+        for filename in (DATA_FILE, SCHEMA_FILE):
+            path = self.run_dir / filename
+            if path.exists():
+                os.replace(path, path.with_name(f"system-{n}{path.suffix}"))
+
+    def write(self, sample):
+        """
+        Append one row.
+
+        Args:
+            sample (dict): Field values; missing fields are written as zero, or NaN
+                for floating point fields
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            row = self._row
+            for name, dtype, _ in self.fields:
+                value = sample.get(name)
+                if value is None:
+                    value = np.nan if dtype[1] == 'f' else 0
+                row[name] = value
+            self._file.write(row.tobytes())
+            self._file.flush()
+
+    def close(self):
+        """Close the stream."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def load_system_metrics(run_dir):
+    """
+    Read a run's system metrics stream as columns.
+
+    Args:
+        run_dir (Path): Run directory
+
+    Returns:
+        dict: Mapping of field name to an array with one entry (or row, for vector
+            fields) per logging window, or None if the run has no system metrics
+    """
+    schema = _read_schema(run_dir)
+    if schema is None:
+        return None
+    dtype = _dtype(schema['fields'])
+    try:
+        with open(run_dir / DATA_FILE, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    # A sample being appended concurrently is not complete yet
+    rows = np.frombuffer(data, dtype=dtype, count=len(data) // dtype.itemsize)
+    return {name: rows[name].copy() for name in dtype.names}
+
+
+def _json_values(values):
+    """Convert an array to (nested) lists, with NaN as None so the result is valid JSON."""
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        return np.where(np.isnan(values), None, values).tolist()
+    return values.tolist()
+
+
+def system_row_json(row):
+    """
+    Convert one row of system metrics to JSON values, e.g. to send it to a server.
+
+    Args:
+        row (dict): Field values; vector fields as arrays or lists
+
+    Returns:
+        dict: The same fields as numbers and lists, NaN as None
+    """
+    return {name: None if value is None else _json_values(value) for name, value in row.items()}
+
+
+def system_metrics_json(columns, keys=None, since=0):
+    """
+    Convert system metrics columns to JSON values.
+
+    Args:
+        columns (dict): Columns returned by load_system_metrics
+        keys (list, optional): Field names or glob patterns to include; 'timestamp'
+            and 'step' are always included
+        since (int): Number of leading rows to leave out, e.g. the rows count of an
+            earlier response
+
+    Returns:
+        dict: Mapping of field name to a list with one entry (or list, for vector
+            fields) per logging window, NaN as None
+    """
+    names = select_keys(columns, keys)
+    if keys:
+        names = ['timestamp', 'step'] + [name for name in names if name not in ('timestamp', 'step')]
+    return {name: _json_values(columns[name][since:]) for name in names}
@@ -0,0 +1,382 @@
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# Files whose changes are reported for a run
+RUN_FILES = ('run_info.json', 'config.json', 'metrics.json', 'artifacts.json', 'summary.json')
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+_DIR_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+# Files are reported once complete: in-place writes on close, atomic replaces on rename
+_RUN_MASK = _DIR_MASK | IN_CLOSE_WRITE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class _Inotify:
+    """Minimal inotify binding through ctypes."""
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(path))
+        return wd
+
+    def read(self, timeout):
+        """Wait up to `timeout` seconds and return (wd, mask, name) events."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        data = os.read(self.fd, 256 * 1024)
+        events, offset = [], 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ChangeWatcher:
+    """
+    Watches a storage directory and keeps a generation counter per run.
+
+    A run's generation is bumped whenever one of its files changes, and a
+    project's generation whenever any of its runs changes, so caches keyed by
+    generation never re-read unchanged data. Listeners are called with
+    (project, run, filename) on every change; (None, None, None) means that
+    everything may have changed. If a hub is given, points appended to
+    metrics.json by other processes are published to the run's live streams.
+
+    Uses inotify where available and falls back to polling file modification
+    times. Polling checks running and recently changed runs every
+    `poll_interval` and every run every `full_scan_interval`.
+    """
+
+    def __init__(self, storage_dir, hub=None, poll_interval=0.1, full_scan_interval=2.0, use_inotify=True):
+        """
+        Initialize watcher.
+
+        Args:
+            storage_dir (str): Base directory for experiment data
+            hub (MetricHub, optional): Hub notified of points appended by other processes
+            poll_interval (float): Seconds between checks of active runs
+            full_scan_interval (float): Seconds between checks of every run when polling
+            use_inotify (bool): Use inotify if available
+        """
+        self.storage_dir = Path(storage_dir)
+        self.hub = hub
+        self.poll_interval = poll_interval
+        self.full_scan_interval = full_scan_interval
+        self.use_inotify = use_inotify
+        self.backend = None
+        # Distinguishes generation counters of different watcher instances
+        self.epoch = uuid.uuid4().hex[:8]
+        self._generations = {}
+        # Bumped when every run may have changed
+        self._base_generation = 0
+        self._listeners = []
+        self._tails = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def generation(self, project_name, run_name=None):
+        """
+        Get the generation counter of a run, or of a project if `run_name` is None.
+
+        Returns:
+            int: Number of changes seen since the watcher started
+        """
+        return self._base_generation + self._generations.get((project_name, run_name), 0)
+
+    @property
+    def running(self):
+        """Whether the watcher thread is alive, so the generation counters follow changes."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_listener(self, callback):
+        """Register a callback(project, run, filename) called on every change."""
+        self._listeners.append(callback)
+
+    def start(self):
+        """Start watching in a background thread."""
+        if self._thread is not None:
+            return
+        os.makedirs(self.storage_dir, exist_ok=True)
+
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = _Inotify()
+            except (OSError, AttributeError):
+                inotify = None
+
+        self.backend = 'inotify' if inotify is not None else 'polling'
+        # Anything may have changed while nothing was watching
+        self._changed(None, None, None, publish=False)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(inotify,), name="mltracker-watcher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def touch(self, project_name, run_name, filename=None):
+        """
+        Report a change made by this process, without waiting for it to be noticed.
+
+        Args:
+            project_name (str): Project name
+            run_name (str): Run name
+            filename (str, optional): Changed file
+        """
+        self._changed(project_name, run_name, filename, publish=False)
+
+    def _changed(self, project_name, run_name, filename, publish=True):
+        with self._lock:
+            if project_name is None:
+                self._base_generation += 1
+            else:
+                key = (project_name, run_name)
+                self._generations[key] = self._generations.get(key, 0) + 1
+                if run_name is not None:
+                    self._generations[(project_name, None)] = self._generations.get((project_name, None), 0) + 1
+
+        for callback in list(self._listeners):
+            try:
+                callback(project_name, run_name, filename)
+            except Exception as e:
+                print(f"MLTracker: Change listener failed: {e}")
+
+        if publish and filename == 'metrics.json':
+            self._publish(project_name, run_name)
+
+    def _publish(self, project_name, run_name):
+        """Publish points appended to a run's metrics file to its live streams."""
+        if self.hub is None or not self.hub.has_subscribers(project_name, run_name):
+            self._tails.pop((project_name, run_name), None)
+            return
+
+        try:
+            with open(self.storage_dir / project_name / run_name / "metrics.json", 'r') as f:
+                metrics = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        tails = self._tails.get((project_name, run_name), {})
+        new_points = {}
+        for key, points in metrics.items():
+            start = tails.get(key, 0)
+            if start > len(points):
+                start = 0
+            if start < len(points):
+                new_points[key] = points[start:]
+        self._tails[(project_name, run_name)] = {key: len(points) for key, points in metrics.items()}
+
+        # Points already published by the writer that produced them are skipped
+        self.hub.publish(project_name, run_name, new_points, only_new=True)
+
+    def _run(self, inotify):
+        try:
+            if inotify is not None:
+                try:
+                    self._watch_inotify(inotify)
+                    return
+                except OSError as e:
+                    # Usually the inotify watch limit; polling has no such limit
+                    print(f"MLTracker: inotify unavailable ({e}), falling back to polling")
+                    self.backend = 'polling'
+                    self._changed(None, None, None)
+                finally:
+                    inotify.close()
+            self._watch_polling()
+        except Exception as e:
+            print(f"MLTracker: Change watcher stopped: {e}")
+
+    def _watch_inotify(self, inotify):
+        """Watch loop using inotify."""
+        watches = {}
+
+        def add_project(project_name):
+            path = self.storage_dir / project_name
+            watches[inotify.add_watch(path, _DIR_MASK)] = (project_name, None)
+            for entry in os.scandir(path):
+                if entry.is_dir():
+                    add_run(project_name, entry.name)
+
+        def add_run(project_name, run_name):
+            path = self.storage_dir / project_name / run_name
+            try:
+                watches[inotify.add_watch(path, _RUN_MASK)] = (project_name, run_name)
+            except FileNotFoundError:
+                return
+
+        watches[inotify.add_watch(self.storage_dir, _DIR_MASK)] = (None, None)
+        for entry in os.scandir(self.storage_dir):
+            if entry.is_dir():
+                add_project(entry.name)
+
+        while not self._stop.is_set():
+            for wd, mask, name in inotify.read(0.5):
+                if mask & IN_Q_OVERFLOW:
+                    self._changed(None, None, None)
+                    continue
+                if mask & IN_IGNORED:
+                    watches.pop(wd, None)
+                    continue
+
+                target = watches.get(wd)
+                if target is None:
+                    continue
+                project_name, run_name = target
+                created = mask & (IN_CREATE | IN_MOVED_TO) and mask & IN_ISDIR
+
+                if project_name is None:
+                    if created:
+                        add_project(name)
+                        for entry in os.scandir(self.storage_dir / name):
+                            if entry.is_dir():
+                                self._changed(name, entry.name, None)
+                    if mask & IN_ISDIR:
+                        self._changed(name, None, None)
+                elif run_name is None:
+                    if created:
+                        add_run(project_name, name)
+                    if mask & IN_ISDIR:
+                        self._changed(project_name, name, None)
+                elif name in RUN_FILES:
+                    self._changed(project_name, run_name, name)
+
+    def _stat_run(self, run_dir):
+        stamps = {}
+        for filename in RUN_FILES:
+            try:
+                st = os.stat(run_dir / filename)
+                stamps[filename] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return stamps
+
+    def _is_running(self, run_dir):
+        try:
+            with open(run_dir / "run_info.json", 'r') as f:
+                return json.load(f).get('status') == 'running'
+        except (OSError, ValueError):
+            return False
+
+    def _watch_polling(self):
+        """Watch loop comparing modification times."""
+        dir_mtimes = {}
+        stamps = {}
+        active = {}
+        last_full_scan = 0.0
+        first = True
+
+        while not self._stop.is_set():
+            now = time.monotonic()
+            full_scan = now - last_full_scan >= self.full_scan_interval
+            if full_scan:
+                last_full_scan = now
+
+            # Projects and runs only appear or disappear when their parent directory changes
+            try:
+                root_mtime = os.stat(self.storage_dir).st_mtime_ns
+            except OSError:
+                root_mtime = None
+            if root_mtime != dir_mtimes.get(None) or full_scan:
+                dir_mtimes[None] = root_mtime
+                projects = {e.name for e in os.scandir(self.storage_dir) if e.is_dir()} if root_mtime else set()
+                for project_name in [p for p in dir_mtimes if p is not None and p not in projects]:
+                    del dir_mtimes[project_name]
+                    for key in [k for k in stamps if k[0] == project_name]:
+                        del stamps[key]
+                        active.pop(key, None)
+                    self._changed(project_name, None, None)
+                for project_name in projects:
+                    dir_mtimes.setdefault(project_name, None)
+
+            for project_name in [p for p in dir_mtimes if p is not None]:
+                project_dir = self.storage_dir / project_name
+                try:
+                    mtime = os.stat(project_dir).st_mtime_ns
+                except OSError:
+                    continue
+                if mtime == dir_mtimes[project_name]:
+                    continue
+                dir_mtimes[project_name] = mtime
+                runs = {e.name for e in os.scandir(project_dir) if e.is_dir()}
+                for key in [k for k in stamps if k[0] == project_name and k[1] not in runs]:
+                    del stamps[key]
+                    active.pop(key, None)
+                    self._changed(project_name, key[1], None)
+                for run_name in runs:
+                    if (project_name, run_name) not in stamps:
+                        stamps[(project_name, run_name)] = None
+                        active[(project_name, run_name)] = now
+
+            keys = list(stamps) if full_scan else list(active)
+            for key in keys:
+                run_dir = self.storage_dir / key[0] / key[1]
+                current = self._stat_run(run_dir)
+                previous = stamps.get(key)
+                if previous == current:
+                    # Completed runs that stay unchanged drop out of the frequent checks
+                    if key in active and now - active[key] > 30.0 and not self._is_running(run_dir):
+                        del active[key]
+                    continue
+
+                stamps[key] = current
+                active[key] = now
+                if first:
+                    continue
+                if previous is None:
+                    self._changed(key[0], key[1], None)
+                    continue
+                for filename in RUN_FILES:
+                    if previous.get(filename) != current.get(filename):
+                        self._changed(key[0], key[1], filename)
+
+            first = False
+            self._stop.wait(self.poll_interval)
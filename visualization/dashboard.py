@@ -2,13 +2,20 @@ import os
 import json
 import glob
 import threading
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, g, render_template, jsonify, request, send_from_directory
 from pathlib import Path
+from ..utils.cache import LRUCache
+from ..utils.streaming import default_hub
+from ..utils.watcher import ChangeWatcher
+from ..utils.compare import RunComparer
+from ..storage.index import RunIndex, parse_run_query
+from ..api.handlers import (check_not_modified, metrics_response, compare_response, stream_response,
+                            system_metrics_response)
 
 class Dashboard:
     """Web dashboard for visualizing experiments."""
     
-    def __init__(self, storage_dir="./mltracker_data", host="127.0.0.1", port=8000):
+    def __init__(self, storage_dir="./mltracker_data", host="127.0.0.1", port=8000, hub=None, watch=True):
         """
         Initialize dashboard.
         
@@ -16,6 +23,11 @@ class Dashboard:
             storage_dir (str): Base directory for experiment data
             host (str): Host to run the dashboard on
             port (int): Port to run the dashboard on
+            hub (MetricHub, optional): Hub used for live metric streams. Defaults to the
+                process-wide hub that local experiments publish to.
+            watch (bool): Watch the storage directory while the dashboard runs, so runs written
+                by other processes show up without re-reading unchanged files and stream their
+                new points live
         """
         self.storage_dir = Path(storage_dir)
         self.host = host
@@ -24,11 +36,62 @@ class Dashboard:
                          template_folder=os.path.join(os.path.dirname(__file__), 'templates'),
                          static_folder=os.path.join(os.path.dirname(__file__), 'static'))
         self.thread = None
+        self._downsample_cache = LRUCache(max_entries=1024)
+        self.hub = hub or default_hub
+        self.watcher = ChangeWatcher(self.storage_dir, hub=self.hub) if watch else None
+        self.run_index = RunIndex(self.storage_dir, watcher=self.watcher)
+        self._metrics_cache = LRUCache(max_entries=32)
+        self.comparer = RunComparer(self._load_metrics, self._metrics_version)
         self._setup_routes()
     
+    def _load_metrics(self, project_name, run_name):
+        """Read a run's metrics, reusing the parsed file while the run is unchanged."""
+        version = self._metrics_version(project_name, run_name)
+        if version is None:
+            return {}
+        key = (project_name, run_name, version)
+        metrics = self._metrics_cache.get(key)
+        if metrics is not None:
+            return metrics
+        
+        metrics = {}
+        metrics_path = os.path.join(self.storage_dir, project_name, run_name, "metrics.json")
+        if os.path.exists(metrics_path):
+            with open(metrics_path, 'r') as f:
+                metrics = json.load(f)
+        self._metrics_cache.set(key, metrics)
+        return metrics
+    
+    def _metrics_version(self, project_name, run_name):
+        """Value that changes whenever a run's metrics change."""
+        # Generation counters only follow changes while the watcher thread runs
+        if self.watcher is not None and self.watcher.running:
+            return (self.watcher.epoch, self.watcher.generation(project_name, run_name))
+        try:
+            st = os.stat(os.path.join(self.storage_dir, project_name, run_name, "metrics.json"))
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
     def _setup_routes(self):
         """Set up Flask routes."""
         
+        # Responses of these routes only change when the watcher reports a change
+        generation_endpoints = {'get_runs', 'get_metrics', 'get_artifacts'}
+        
+        @self.app.before_request
+        def not_modified():
+            # Unchanged runs are answered without touching the disk
+            return check_not_modified(self.watcher, generation_endpoints)
+        
+        @self.app.after_request
+        def add_etag(response):
+            etag = g.get('generation_etag')
+            if etag and response.status_code == 200 and not response.is_streamed:
+                response.headers['ETag'] = etag
+                response.make_conditional(request)
+            return response
+        
         @self.app.route('/')
         def index():
             return render_template('index.html')
@@ -44,43 +107,37 @@ class Dashboard:
         
         @self.app.route('/api/projects/<project_name>/runs')
         def get_runs(project_name):
-            runs = []
-            run_dirs = glob.glob(str(self.storage_dir / project_name / "*"))
-            for run_dir in run_dirs:
-                if os.path.isdir(run_dir):
-                    run_name = os.path.basename(run_dir)
-                    
-                    # Load run info
-                    info_path = os.path.join(run_dir, "run_info.json")
-                    config_path = os.path.join(run_dir, "config.json")
-                    
-                    run_info = {}
-                    config = {}
-                    
-                    if os.path.exists(info_path):
-                        with open(info_path, 'r') as f:
-                            run_info = json.load(f)
-                    
-                    if os.path.exists(config_path):
-                        with open(config_path, 'r') as f:
-                            config = json.load(f)
-                    
-                    runs.append({
-                        "name": run_name,
-                        "info": run_info,
-                        "config": config
-                    })
+            try:
+                query = parse_run_query(request.args)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
             
-            return jsonify(runs)
+            records, cursor, total = self.run_index.query(project_name, **query)
+            runs = [{"name": r["name"], "info": r["info"] or {}, "config": r["config"], "summary": r["summary"]}
+                    for r in records]
+            
+            response = jsonify(runs)
+            response.headers['X-Total-Count'] = str(total)
+            if cursor:
+                response.headers['X-Next-Cursor'] = cursor
+            return response
         
         @self.app.route('/api/projects/<project_name>/runs/<run_name>/metrics')
         def get_metrics(project_name, run_name):
-            metrics_path = os.path.join(self.storage_dir, project_name, run_name, "metrics.json")
-            if os.path.exists(metrics_path):
-                with open(metrics_path, 'r') as f:
-                    metrics = json.load(f)
-                return jsonify(metrics)
-            return jsonify({})
+            return metrics_response(project_name, run_name, lambda: self._load_metrics(project_name, run_name),
+                                    self._downsample_cache)
+        
+        @self.app.route('/api/projects/<project_name>/compare')
+        def compare_runs(project_name):
+            return compare_response(self.storage_dir / project_name, self.comparer, self.run_index)
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/stream')
+        def stream_metrics(project_name, run_name):
+            return stream_response(self.hub, project_name, run_name)
+        
+        @self.app.route('/api/projects/<project_name>/runs/<run_name>/system')
+        def get_system_metrics(project_name, run_name):
+            return system_metrics_response(self.storage_dir / project_name / run_name)
         
         @self.app.route('/api/projects/<project_name>/runs/<run_name>/artifacts')
         def get_artifacts(project_name, run_name):
@@ -114,6 +171,9 @@ class Dashboard:
             debug (bool): Whether to run in debug mode
             open_browser (bool): Whether to open the browser automatically
         """
+        if self.watcher is not None:
+            self.watcher.start()
+        
         if open_browser:
             import webbrowser
             url = f"http://{self.host}:{self.port}"
@@ -130,6 +190,8 @@ class Dashboard:
     
     def stop(self):
         """Stop the dashboard server."""
+        if self.watcher is not None:
+            self.watcher.stop()
         # This is a bit hacky but works for development purposes
         import requests
         try:
@@ -1,20 +1,450 @@
-import matplotlib.pyplot as plt
-import numpy as np
 import io
+import multiprocessing
 import os
-from PIL import Image
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from ..storage.local import LocalStorage
+from .render_cache import get_render_cache, render_key
+from ..utils.downsample import lttb_indices, minmax_indices
+from ..utils.encoding import to_columns
+from ..utils.metrics_query import select_keys
+from ..utils.smoothing import smooth
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool(max_workers=None):
+    """
+    Get the thread pool shared by every Plotter that has no executor of its own.
+
+    Plots are drawn with matplotlib's object-oriented API on their own Figure,
+    never through pyplot, so they can be rendered in threads of the caller's
+    process. Use `process_render_pool` to render in worker processes instead.
+
+    Args:
+        max_workers (int, optional): Number of threads when the pool is created.
+            Defaults to min(4, CPU count).
+
+    Returns:
+        ThreadPoolExecutor: The shared pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1),
+                                       thread_name_prefix="mltracker-render")
+        return _pool
+
+
+def process_render_pool(max_workers=None):
+    """
+    Create a process pool for rendering, to pass as a Plotter's `executor`.
+
+    Workers are started with 'forkserver' (or 'spawn') rather than forked from
+    a training process that may hold threads and locks. Both re-import the main
+    module in every worker, so the script creating the pool must keep its
+    top-level code under `if __name__ == "__main__":`.
+
+    Args:
+        max_workers (int, optional): Number of worker processes. Defaults to
+            min(4, CPU count).
+
+    Returns:
+        ProcessPoolExecutor: A new pool; shut it down when done
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1), mp_context=context)
+
+
+def _encode(fig, fmt, dpi):
+    """Render a figure with the Agg canvas and return the encoded bytes."""
+    FigureCanvasAgg(fig)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi)
+    return buf.getvalue()
+
+
+def render_line_plot(series, x=None, title=None, xlabel=None, ylabel=None, fmt='png', dpi=100):
+    """
+    Render a line plot without touching pyplot's global state.
+
+    Args:
+        series (dict): Mapping of label to y values
+        x (array, optional): Shared x values. Defaults to 0, 1, 2, ...
+        title (str, optional): Plot title
+        xlabel (str, optional): x-axis label
+        ylabel (str, optional): y-axis label
+        fmt (str): Image format
+        dpi (int): Resolution
+
+    Returns:
+        bytes: Encoded image
+    """
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+
+    for label, values in series.items():
+        values = np.asarray(values)
+        xs = np.arange(len(values)) if x is None else x
+        ax.plot(xs, values, label=label)
+
+    if title:
+        ax.set_title(title)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+
+    ax.legend()
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return _encode(fig, fmt, dpi)
+
+
+def render_series_plot(series, title=None, xlabel=None, ylabel=None, fmt='png', dpi=100):
+    """
+    Render curves that each have their own x values.
+
+    Args:
+        series (list): (label, x, y, raw_y) tuples; `raw_y` is the unsmoothed curve
+            drawn faintly behind the smoothed one, or None
+        title (str, optional): Plot title
+        xlabel (str, optional): x-axis label
+        ylabel (str, optional): y-axis label
+        fmt (str): Image format
+        dpi (int): Resolution
+
+    Returns:
+        bytes: Encoded image
+    """
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+
+    for label, x, y, raw_y in series:
+        line, = ax.plot(x, y, label=label, linewidth=1.5)
+        if raw_y is not None:
+            ax.plot(x, raw_y, color=line.get_color(), alpha=0.25, linewidth=1.0)
+
+    if title:
+        ax.set_title(title)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+
+    if series:
+        ax.legend()
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return _encode(fig, fmt, dpi)
+
+
+def prepare_series(columns, x='step', smoothing=None, smoothing_method='ema', max_points=None, downsample='lttb'):
+    """
+    Turn a metric's columns into plot-ready arrays.
+
+    Non-numeric points are dropped, the values are smoothed over the full
+    resolution and then both curves are downsampled with the same indices.
+
+    Args:
+        columns (dict): 'step', 'value' and 'timestamp' arrays
+        x (str): 'step', 'timestamp', or 'time' (seconds since the first point)
+        smoothing (float, optional): EMA weight or rolling window size
+        smoothing_method (str): 'ema' or 'rolling'
+        max_points (int, optional): Maximum number of points kept
+        downsample (str): 'lttb' or 'minmax'
+
+    Returns:
+        tuple: (x, smoothed y, raw y or None if not smoothed)
+    """
+    values = columns['value']
+    xs = columns['step' if x == 'step' else 'timestamp'].astype(np.float64)
+    keep = np.isfinite(values) & np.isfinite(xs)
+    xs, values = xs[keep], values[keep]
+    if x == 'time' and len(xs):
+        xs = xs - xs[0]
+
+    raw = None
+    if smoothing:
+        raw = values
+        values = smooth(values, smoothing_method, smoothing)
+
+    if max_points and len(xs) > max_points:
+        if downsample == 'minmax':
+            indices = minmax_indices(values, max_points)
+        else:
+            indices = lttb_indices(xs, values, max_points)
+        xs, values = xs[indices], values[indices]
+        raw = raw[indices] if raw is not None else None
+
+    return xs, values, raw
+
+
+def normalize_confusion_matrix(cm):
+    """
+    Divide each row of a confusion matrix by its total; rows without samples stay zero.
+
+    Args:
+        cm (np.ndarray): Confusion matrix
+
+    Returns:
+        np.ndarray: Row-normalized float matrix
+    """
+    totals = cm.sum(axis=1, keepdims=True)
+    return np.divide(cm, totals, out=np.zeros(cm.shape, dtype=np.float64), where=totals != 0)
+
+
+def pool_matrix(matrix, max_size, reduce='sum'):
+    """
+    Shrink a matrix by aggregating square blocks of cells.
+
+    Args:
+        matrix (np.ndarray): 2-D matrix
+        max_size (int): Maximum number of rows and columns of the result
+        reduce (str): 'sum' for counts, 'mean' for rates
+
+    Returns:
+        tuple: (pooled matrix, block size)
+    """
+    block = -(-max(matrix.shape) // max_size)
+    if block <= 1:
+        return matrix, 1
+
+    rows, cols = -(-matrix.shape[0] // block), -(-matrix.shape[1] // block)
+    padded = np.full((rows * block, cols * block), np.nan)
+    padded[:matrix.shape[0], :matrix.shape[1]] = matrix
+    blocks = padded.reshape(rows, block, cols, block)
+    pooled = np.nansum(blocks, axis=(1, 3)) if reduce == 'sum' else np.nanmean(blocks, axis=(1, 3))
+    return pooled, block
+
+
+def top_confused_pairs(cm, k=10, classes=None):
+    """
+    Find the most frequent off-diagonal entries of a confusion matrix.
+
+    Args:
+        cm (np.ndarray): Confusion matrix of counts
+        k (int): Number of pairs
+        classes (list, optional): Class names
+
+    Returns:
+        list: Dicts with 'true', 'predicted', 'count' and 'rate' (share of the true class),
+            most confused first
+    """
+    cm = np.asarray(cm)
+    off_diagonal = cm.astype(np.float64, copy=True)
+    np.fill_diagonal(off_diagonal, -np.inf)
+    flat = off_diagonal.ravel()
+    k = min(k, flat.size - min(cm.shape))
+    if k <= 0:
+        return []
+
+    candidates = np.argpartition(flat, -k)[-k:]
+    candidates = candidates[np.argsort(flat[candidates])[::-1]]
+    totals = cm.sum(axis=1)
+
+    pairs = []
+    for index in candidates:
+        i, j = np.unravel_index(index, cm.shape)
+        if flat[index] <= 0:
+            break
+        pairs.append({
+            'true': classes[i] if classes else int(i),
+            'predicted': classes[j] if classes else int(j),
+            'count': cm[i, j].item(),
+            'rate': float(cm[i, j] / totals[i]) if totals[i] else 0.0,
+        })
+    return pairs
+
+
+def encode_confusion_matrix(cm, classes=None, block_size=1):
+    """
+    Serialize a confusion matrix to a compressed .npz archive for later re-rendering.
+
+    Args:
+        cm (np.ndarray): Confusion matrix of counts, possibly pooled into blocks
+        classes (list, optional): Class names
+        block_size (int): Number of classes pooled into each row and column of `cm`
+
+    Returns:
+        bytes: Archive with a 'matrix' array, a 'block_size' scalar and, if given,
+            a 'classes' array
+    """
+    arrays = {'matrix': cm, 'block_size': np.int64(block_size)}
+    if classes:
+        arrays['classes'] = np.asarray(classes, dtype=str)
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **arrays)
+    return buf.getvalue()
+
+
+def render_confusion_matrix(cm, classes=None, normalize=False, title='Confusion Matrix', fmt='png', dpi=100,
+                            n_classes=None, annotate_max=30, labels_max=50):
+    """
+    Render a confusion matrix without touching pyplot's global state.
+
+    The matrix is drawn as one raster image. Cells are annotated only when there
+    are at most `annotate_max` classes, so large matrices cost no text artists.
+
+    Args:
+        cm (np.ndarray): Confusion matrix, possibly pooled into blocks
+        classes (list, optional): Class names
+        normalize (bool): Whether `cm` holds row-normalized rates
+        title (str): Plot title
+        fmt (str): Image format
+        dpi (int): Resolution
+        n_classes (int, optional): Number of classes before pooling. Defaults to the size of `cm`.
+        annotate_max (int): Largest number of classes whose cells get value labels
+        labels_max (int): Largest number of classes whose names are used as tick labels
+
+    Returns:
+        bytes: Encoded image
+    """
+    n_classes = n_classes or cm.shape[0]
+    pooled = cm.shape[0] != n_classes
+
+    fig = Figure(figsize=(10, 8))
+    ax = fig.add_subplot()
+    # The extent keeps axes in class units when blocks of classes are pooled into one pixel
+    extent = (-0.5, n_classes - 0.5, n_classes - 0.5, -0.5)
+    image = ax.imshow(cm, interpolation='nearest', cmap='Blues', extent=extent, aspect='auto' if pooled else 'equal')
+    ax.set_title(title)
+    fig.colorbar(image, ax=ax)
+
+    if classes and n_classes <= labels_max:
+        tick_marks = np.arange(len(classes))
+        ax.set_xticks(tick_marks)
+        ax.set_xticklabels(classes, rotation=45)
+        ax.set_yticks(tick_marks)
+        ax.set_yticklabels(classes)
+
+    if not pooled and n_classes <= annotate_max:
+        value_fmt = '.2f' if normalize or cm.dtype.kind == 'f' else 'd'
+        thresh = cm.max() / 2.
+        for i in range(cm.shape[0]):
+            for j in range(cm.shape[1]):
+                ax.text(j, i, format(cm[i, j], value_fmt),
+                        horizontalalignment="center",
+                        color="white" if cm[i, j] > thresh else "black")
+
+    ax.set_ylabel('True label')
+    ax.set_xlabel('Predicted label')
+    fig.tight_layout()
+    return _encode(fig, fmt, dpi)
+
 
 class Plotter:
-    """Utility for creating and logging plots."""
+    """
+    Utility for creating and logging plots.
+
+    Plots are rendered in a background pool with matplotlib's object-oriented
+    API, so plotting is thread-safe and never blocks the caller.
+    Every plotting method returns a `concurrent.futures.Future` that resolves to
+    the path of the logged artifact once the image is written.
+    """
     
-    def __init__(self, experiment):
+    def __init__(self, experiment, executor=None, cache=None):
         """
         Initialize plotter.
         
         Args:
             experiment: The experiment to log plots to
+            executor (Executor, optional): Executor rendering the plots. Defaults to a
+                thread pool shared by all plotters; see `process_render_pool` to render
+                in worker processes.
+            cache (RenderCache, optional): Cache of rendered images keyed by a hash of the
+                plot inputs. Defaults to a per-user cache shared by all plotters; False
+                renders every plot.
         """
         self.experiment = experiment
+        self.executor = executor
+        self.cache = cache
+        self._pending = set()
+        self._lock = threading.Lock()
+    
+    def _get_cache(self):
+        if self.cache is False:
+            return None
+        return self.cache or get_render_cache()
+    
+    def _submit(self, render, args, kwargs, name, metadata, fmt='png'):
+        """
+        Call `render(*args, **kwargs)` in the background and log the returned bytes as
+        the artifact `plot_<name>`, saved as `<name>.<fmt>`.
+        """
+        result = Future()
+        artifact_name = f"plot_{name}"
+        cache = self._get_cache()
+        key = None
+        
+        if cache is not None:
+            key = render_key(render, args, kwargs)
+            metadata = dict(metadata, render_key=key)
+            
+            # The same plot was already logged under this name: keep the artifact as is
+            existing = self.experiment.artifacts.get(artifact_name)
+            if existing and existing['metadata'].get('render_key') == key and os.path.exists(existing['path']):
+                result.set_result(existing['path'])
+                return result
+            
+            data = cache.get(key)
+            if data is not None:
+                try:
+                    result.set_result(self._log(artifact_name, data, name, fmt, metadata))
+                except Exception as e:
+                    result.set_exception(e)
+                return result
+        
+        executor = self.executor or get_render_pool()
+        rendered = executor.submit(render, *args, **kwargs)
+        
+        with self._lock:
+            self._pending.add(result)
+        result.add_done_callback(self._discard)
+        
+        def log(rendered):
+            try:
+                data = rendered.result()
+                path = self._log(artifact_name, data, name, fmt, metadata)
+                if key is not None:
+                    cache.put(key, data)
+            except BaseException as e:
+                result.set_exception(e)
+            else:
+                result.set_result(path)
+        
+        rendered.add_done_callback(log)
+        return result
+    
+    def _log(self, artifact_name, data, name, fmt, metadata):
+        return self.experiment.log_artifact_bytes(
+            name=artifact_name,
+            data=data,
+            filename=f"{name}.{fmt}",
+            metadata=dict(metadata, format=fmt)
+        )
+    
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+    
+    def wait(self, timeout=None):
+        """
+        Wait until every submitted plot has been logged.
+        
+        Args:
+            timeout (float, optional): Maximum seconds to wait
+        
+        Returns:
+            bool: True if no plot is pending any more
+        """
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
     
     def line_plot(self, data, x=None, y=None, title=None, xlabel=None, ylabel=None, name="plot"):
         """
@@ -22,7 +452,7 @@ class Plotter:
         
         Args:
             data: DataFrame or dictionary of data
-            x: x-axis column/key
+            x: x-axis column/key, or the x values themselves
             y: y-axis column/key or list of columns/keys
             title: Plot title
             xlabel: x-axis label
@@ -30,126 +460,130 @@ class Plotter:
             name: Name for the saved plot
         
         Returns:
-            str: Path to the saved plot
+            Future: Resolves to the path of the saved plot
         """
-        plt.figure(figsize=(10, 6))
-        
         if hasattr(data, 'plot'):  # DataFrame
-            if y is None:
-                data.plot(x=x)
-            else:
-                if isinstance(y, (list, tuple)):
-                    data.plot(x=x, y=y)
-                else:
-                    data.plot(x=x, y=y)
+            x_values = data.index.to_numpy() if x is None else data[x].to_numpy()
+            columns = [c for c in data.columns if c != x] if y is None else \
+                list(y) if isinstance(y, (list, tuple)) else [y]
+            series = {str(c): data[c].to_numpy() for c in columns}
+            if xlabel is None and x is not None:
+                xlabel = str(x)
         else:  # Dictionary
-            if x is None:
-                x = list(range(len(next(iter(data.values())))))
-            
+            if isinstance(x, str) and x in data:
+                x_values = np.asarray(data[x])
+            else:
+                x_values = None if x is None else np.asarray(x)
+        
             if y is None:
-                y = list(data.keys())
+                # Only a key names a series to leave out; x may also be the values themselves
+                y = [key for key in data if not (isinstance(x, str) and key == x)]
             elif not isinstance(y, (list, tuple)):
                 y = [y]
-            
-            for key in y:
-                if key in data:
-                    plt.plot(x, data[key], label=key)
-        
-        if title:
-            plt.title(title)
-        if xlabel:
-            plt.xlabel(xlabel)
-        if ylabel:
-            plt.ylabel(ylabel)
-        
-        plt.legend()
-        plt.grid(True, linestyle='--', alpha=0.7)
-        
-        # Save plot to a temporary file
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100)
-        buf.seek(0)
-        
-        # Create a temporary file
-        tmp_dir = os.path.join(self.experiment.run_dir, "plots")
-        os.makedirs(tmp_dir, exist_ok=True)
-        tmp_path = os.path.join(tmp_dir, f"{name}.png")
-        
-        # Save the image
-        img = Image.open(buf)
-        img.save(tmp_path)
-        
-        # Log the plot as an artifact
-        artifact_path = self.experiment.log_artifact(
-            name=f"plot_{name}",
-            file_path=tmp_path,
-            metadata={
-                'type': 'plot',
-                'format': 'png'
-            }
-        )
+            series = {key: np.asarray(data[key]) for key in y if key in data}
         
-        plt.close()
+        return self._submit(render_line_plot, (series,),
+                            {'x': x_values, 'title': title, 'xlabel': xlabel, 'ylabel': ylabel, 'fmt': 'png'},
+                            name, {'type': 'plot'})
+    
+    def _metric_columns(self, run_name, keys):
+        """Read a run's selected metrics as columns, from memory for the experiment's own run."""
+        if run_name == self.experiment.run_name:
+            # A snapshot keeps concurrent log() calls from changing the lists mid-read
+            snapshot = getattr(self.experiment, 'metrics_snapshot', None)
+            if snapshot is not None:
+                return to_columns(snapshot(keys))
+            metrics = dict(self.experiment.metrics)
+            return to_columns({key: list(metrics[key]) for key in select_keys(list(metrics), keys)})
         
-        return artifact_path
+        storage = LocalStorage(self.experiment.storage_dir)
+        return storage.load_metric_columns(self.experiment.project_name, run_name, keys) or {}
     
-    def confusion_matrix(self, cm, classes=None, normalize=False, title='Confusion Matrix', name="confusion_matrix"):
+    def plot_metrics(self, keys, runs=None, smoothing=None, smoothing_method='ema', max_points=1000,
+                     downsample='lttb', x='step', title=None, ylabel=None, name="metrics"):
+        """
+        Plot logged metrics of one or more runs.
+        
+        Metrics are read as NumPy columns, smoothed and downsampled with vectorized
+        code, and only the few points that are drawn are sent to the renderer.
+        
+        Args:
+            keys: Metric name or glob pattern, or a list of them
+            runs: Run names of the experiment's project to overlay. Defaults to the
+                experiment's own run.
+            smoothing: EMA weight in [0, 1) for 'ema', or window size for 'rolling'.
+                The raw curve is drawn faintly behind the smoothed one.
+            smoothing_method: 'ema' or 'rolling'
+            max_points: Maximum number of points drawn per curve
+            downsample: 'lttb' or 'minmax'
+            x: 'step', 'timestamp', or 'time' (seconds since the run's first point)
+            title: Plot title
+            ylabel: y-axis label
+            name: Name for the saved plot
+        
+        Returns:
+            Future: Resolves to the path of the saved plot
+        """
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        runs = [self.experiment.run_name] if runs is None else [runs] if isinstance(runs, str) else list(runs)
+        
+        series = []
+        for run_name in runs:
+            for key, columns in sorted(self._metric_columns(run_name, keys).items()):
+                xs, ys, raw = prepare_series(columns, x, smoothing, smoothing_method, max_points, downsample)
+                if len(xs):
+                    label = f"{run_name}/{key}" if len(runs) > 1 else key
+                    series.append((label, xs, ys, raw))
+        
+        xlabel = {'step': 'Step', 'timestamp': 'Timestamp', 'time': 'Seconds'}.get(x, x)
+        return self._submit(render_series_plot, (series,),
+                            {'title': title, 'xlabel': xlabel, 'ylabel': ylabel, 'fmt': 'png'},
+                            name, {'type': 'plot', 'plot_type': 'metrics', 'keys': keys, 'runs': runs})
+    
+    def confusion_matrix(self, cm, classes=None, normalize=False, title='Confusion Matrix', name="confusion_matrix",
+                         top_k=10, save_matrix=True, max_pixels=1000, annotate_max=30):
         """
         Create and log a confusion matrix plot.
         
+        Matrices with more than `max_pixels` classes are pooled into blocks before
+        rendering, so thousands of classes render as quickly as a few hundred.
+        
         Args:
             cm: Confusion matrix array
             classes: List of class names
             normalize: Whether to normalize the confusion matrix
             title: Plot title
             name: Name for the saved plot
+            top_k: Number of most confused (true, predicted) pairs recorded in the
+                plot's metadata under 'top_confused'; 0 disables it
+            save_matrix: Also log the matrix of counts as a compressed .npz artifact
+                `plot_<name>_matrix`, to re-render it later; pooled the same way as the
+                plot when it has more than `max_pixels` classes
+            max_pixels: Largest number of rows and columns drawn without pooling
+            annotate_max: Largest number of classes whose cells get value labels
         
         Returns:
-            str: Path to the saved plot
+            Future: Resolves to the path of the saved plot
         """
-        if normalize:
-            cm = cm.astype('float') / cm.sum(axis=1)[:, np.newaxis]
-        
-        plt.figure(figsize=(10, 8))
-        plt.imshow(cm, interpolation='nearest', cmap=plt.cm.Blues)
-        plt.title(title)
-        plt.colorbar()
-        
-        if classes:
-            tick_marks = np.arange(len(classes))
-            plt.xticks(tick_marks, classes, rotation=45)
-            plt.yticks(tick_marks, classes)
+        cm = np.asarray(cm)
+        classes = list(classes) if classes is not None and len(classes) else None
+        metadata = {'type': 'plot', 'plot_type': 'confusion_matrix', 'num_classes': int(cm.shape[0])}
+        if top_k:
+            metadata['top_confused'] = top_confused_pairs(cm, top_k, classes)
         
-        fmt = '.2f' if normalize else 'd'
-        thresh = cm.max() / 2.
-        for i in range(cm.shape[0]):
-            for j in range(cm.shape[1]):
-                plt.text(j, i, format(cm[i, j], fmt),
-                        horizontalalignment="center",
-                        color="white" if cm[i, j] > thresh else "black")
-        
-        plt.tight_layout()
-        plt.ylabel('True label')
-        plt.xlabel('Predicted label')
-        
-        # Save plot to a temporary file
-        tmp_dir = os.path.join(self.experiment.run_dir, "plots")
-        os.makedirs(tmp_dir, exist_ok=True)
-        tmp_path = os.path.join(tmp_dir, f"{name}.png")
-        
-        plt.savefig(tmp_path, format='png', dpi=100)
-        
-        # Log the plot as an artifact
-        artifact_path = self.experiment.log_artifact(
-            name=f"plot_{name}",
-            file_path=tmp_path,
-            metadata={
-                'type': 'plot',
-                'format': 'png',
-                'plot_type': 'confusion_matrix'
-            }
-        )
+        # Matrices are pooled here, so only arrays of at most max_pixels x max_pixels are
+        # hashed for the render cache or pickled to a process pool, never a huge raw matrix
+        if save_matrix:
+            counts, block = pool_matrix(cm, max_pixels, reduce='sum')
+            self._submit(encode_confusion_matrix, (counts,), {'classes': classes, 'block_size': block},
+                         f"{name}_matrix", {'type': 'data', 'plot_type': 'confusion_matrix'}, fmt='npz')
         
-        plt.close()
+        values = normalize_confusion_matrix(cm) if normalize else cm
+        values, block = pool_matrix(values, max_pixels, reduce='mean' if normalize else 'sum')
+        if block > 1:
+            metadata['block_size'] = block
         
-        return artifact_path
+        return self._submit(render_confusion_matrix, (values,),
+                            {'classes': classes, 'normalize': normalize, 'title': title,
+                             'n_classes': cm.shape[0], 'annotate_max': annotate_max, 'fmt': 'png'},
+                            name, metadata)
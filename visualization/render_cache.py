@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+import numpy as np
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def _update(digest, value):
+    """Feed a value into a hash, walking nested containers."""
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update(f"nd:{array.dtype.str}:{array.shape}:".encode('utf-8'))
+        if array.dtype.kind == 'O':
+            for item in array.ravel():
+                _update(digest, item)
+        else:
+            digest.update(memoryview(array).cast('B'))
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)}:".encode('utf-8'))
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)}:".encode('utf-8'))
+        for item in value:
+            _update(digest, item)
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode('utf-8'))
+
+
+def render_key(render, args, kwargs):
+    """
+    Hash a render call: the function, its input arrays and its parameters.
+
+    Args:
+        render (callable): Render function
+        args (tuple): Positional arguments
+        kwargs (dict): Keyword arguments
+
+    Returns:
+        str: Hex digest
+    """
+    import matplotlib
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{render.__module__}.{render.__qualname__}:{matplotlib.__version__}:".encode('utf-8'))
+    _update(digest, tuple(args))
+    _update(digest, dict(kwargs))
+    return digest.hexdigest()
+
+
+def default_cache_dir():
+    """Per-user directory of the shared render cache."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pypmltracker', 'renders')
+
+
+class RenderCache:
+    """
+    On-disk cache of rendered plots keyed by `render_key`.
+
+    Entries are evicted least recently used first once their total size exceeds
+    `max_bytes`. Several processes can share a directory; each keeps its own
+    view of the sizes and tolerates entries removed by the others.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=256 * 1024 * 1024):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir (str, optional): Cache directory. Defaults to a per-user cache directory.
+            max_bytes (int): Maximum total size of cached images
+        """
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # key -> (last use, size); last use is the file's mtime, refreshed on every hit
+        self._entries = {}
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.bin'):
+                st = entry.stat()
+                self._entries[entry.name[:-4]] = (st.st_mtime, st.st_size)
+        self._size = sum(size for _, size in self._entries.values())
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.bin"
+
+    def get(self, key):
+        """
+        Look up a rendered image.
+
+        Args:
+            key (str): Render key
+
+        Returns:
+            bytes: Encoded image, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._size -= entry[1]
+            return None
+
+        with self._lock:
+            self.hits += 1
+            previous = self._entries.get(key)
+            self._size += len(data) - (previous[1] if previous else 0)
+            self._entries[key] = (time.time(), len(data))
+        return data
+
+    def put(self, key, data):
+        """
+        Store a rendered image, evicting least recently used entries if needed.
+
+        Args:
+            key (str): Render key
+            data (bytes): Encoded image
+        """
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        with self._lock:
+            previous = self._entries.get(key)
+            self._size += len(data) - (previous[1] if previous else 0)
+            self._entries[key] = (time.time(), len(data))
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits. Must hold the lock."""
+        for key, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._entries[key]
+            self._size -= size
+
+    def size(self):
+        """Get the total size of cached images in bytes."""
+        with self._lock:
+            return self._size
+
+    def __contains__(self, key):
+        return self._path(key).exists()
+
+
+def get_render_cache():
+    """
+    Get the render cache shared by every Plotter that has no cache of its own.
+
+    Returns:
+        RenderCache: The shared cache
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = RenderCache()
+        return _default_cache